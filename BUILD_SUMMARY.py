@@ -4,402 +4,107 @@ AgentSpawn Framework - Build Summary
 
 This file provides a visual overview of the complete AgentSpawn framework.
 Run this to see what has been created.
+
+The summary text lives in BUILD_SUMMARY.txt next to this script and is
+memory-mapped on demand rather than baked into the module source.
 """
 
-def print_summary():
-    """Print build summary."""
+import functools
+import mmap
+import sys
+from pathlib import Path
+from typing import Dict, Final, Iterable, Iterator, Optional
+
+_SUMMARY_PATH: Final[Path] = Path(__file__).with_name("BUILD_SUMMARY.txt")
+
+# Section names in display order, mapped to the text that opens each section.
+# HEADER (the banner box) starts at the top of the file.
+_SECTION_MARKERS: Final[Dict[str, str]] = {
+    "HEADER": "",
+    "OVERVIEW": "📦 PROJECT OVERVIEW\n",
+    "STATS": "📊 BUILD STATISTICS\n",
+    "STRUCTURE": "📁 PROJECT STRUCTURE\n",
+    "FEATURES": "🎯 KEY FEATURES IMPLEMENTED\n",
+    "TECH_STACK": "🔧 TECHNOLOGY STACK\n",
+    "DOCS": "📚 DOCUMENTATION PROVIDED\n",
+    "QUICK_START": "🚀 QUICK START\n",
+    "LEARNING_PATH": "🎓 LEARNING PATH\n",
+    "WORKFLOW": "🔄 ARCHITECTURE WORKFLOW\n",
+    "HIGHLIGHTS": "✨ HIGHLIGHTS\n",
+    "CUSTOMIZATION": "📋 CUSTOMIZATION POINTS\n",
+    "WHAT_YOU_GET": "🎁 WHAT YOU GET\n",
+    "SUPPORT": "📞 SUPPORT RESOURCES\n",
+    "STATUS": "═" * 79 + "\n\n✅ STATUS",
+}
+
+
+@functools.lru_cache(maxsize=1)
+def _section_bytes() -> Dict[str, bytes]:
+    """Split the memory-mapped summary file into UTF-8 encoded sections."""
+    with _SUMMARY_PATH.open("rb") as f, \
+            mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        starts = []
+        position = 0
+        for marker in _SECTION_MARKERS.values():
+            position = mm.find(marker.encode("utf-8"), position)
+            if position < 0:
+                raise ValueError(f"Section marker {marker!r} not found in {_SUMMARY_PATH.name}")
+            starts.append(position)
+        ends = starts[1:] + [len(mm)]
+        return {
+            name: mm[start:end]
+            for name, start, end in zip(_SECTION_MARKERS, starts, ends)
+        }
+
+
+def _selected_sections(sections: Optional[Iterable[str]]) -> Iterator[str]:
+    """Yield the names of the selected sections in display order."""
+    wanted = None if sections is None else {name.upper() for name in sections}
+    for name in _SECTION_MARKERS:
+        if wanted is None or name in wanted:
+            yield name
+
+
+def iter_summary(sections: Optional[Iterable[str]] = None) -> Iterator[str]:
+    """
+    Yield build summary sections in display order.
     
-    summary = """
-╔══════════════════════════════════════════════════════════════════════════════╗
-║                                                                              ║
-║               🚀 AgentSpawn Framework - Project Complete! 🚀               ║
-║                                                                              ║
-║                  Dynamic Multi-Agent Orchestration Framework                ║
-║                          Built on LangGraph & LLMs                          ║
-║                                                                              ║
-╚══════════════════════════════════════════════════════════════════════════════╝
-
-📦 PROJECT OVERVIEW
-══════════════════════════════════════════════════════════════════════════════
-
-Location: d:\Framework\agentic_spawn
-
-Status: ✅ PRODUCTION READY
-
-Version: 0.1.0
-
-Created: October 23, 2025
-
-
-📊 BUILD STATISTICS
-══════════════════════════════════════════════════════════════════════════════
-
-Total Files:           25
-├─ Python Files:      16
-├─ Documentation:      7
-├─ Configuration:      2
-└─ Other:              0
-
-Lines of Code:         ~2,650
-Classes:               20+
-Functions/Methods:     70+
-Unit Tests:            27+
-Code Coverage:         100% (core modules)
-
-
-📁 PROJECT STRUCTURE
-══════════════════════════════════════════════════════════════════════════════
-
-agentic_spawn/
-├── src/                          # Core Framework (7 modules)
-│   ├── __init__.py              # Package initialization
-│   ├── orchestrator.py          # Main orchestration engine (380+ lines)
-│   ├── agent_registry.py        # Agent management system (230+ lines)
-│   ├── state.py                 # State management (130+ lines)
-│   ├── utils.py                 # Utilities & algorithms (250+ lines)
-│   ├── tool_registry.py         # Tool management system (150+ lines)
-│   ├── tools.py                 # Tool implementations (200+ lines)
-│   └── agents/                  # Specialized Agents (4 types)
-│       ├── __init__.py
-│       ├── data_analyst.py      # Statistical analysis specialist with tools
-│       ├── researcher.py        # Research specialist
-│       ├── code_generator.py    # Code generation specialist
-│       └── meta_learner.py      # Meta-learning agent for dynamic skills
-│
-├── tests/                        # Test Suite (27+ tests)
-│   └── test_framework.py        # Comprehensive unit tests
-│
-├── examples/                     # Working Examples (7 demos)
-│   ├── getting_started.py       # Interactive getting started
-│   ├── example1_simple_task.py  # Simple task demo
-│   ├── example2_complex_task.py # Multi-agent demo
-│   ├── example3_direct_agents.py# Direct agent usage
-│   ├── example4_tool_integration.py # Tool integration demo
-│   ├── example5_memory_integration.py # Memory integration demo
-│   └── example6_meta_learning.py # Meta-learning agent demo
-│
-├── requirements.txt              # Python dependencies (8 packages)
-├── .env.example                  # Environment template
-├── .gitignore                    # Git ignore rules
-│
-└── Documentation (7 files)
-    ├── README.md                 # Comprehensive guide
-    ├── SETUP.md                  # Installation & configuration
-    ├── QUICK_REFERENCE.md        # Quick lookup guide
-    ├── PROJECT_SUMMARY.md        # Project overview
-    ├── IMPLEMENTATION_CHECKLIST.md # Feature checklist
-    ├── INDEX.md                  # Complete index
-    └── COMPLETION_REPORT.md      # This report
-
-
-🎯 KEY FEATURES IMPLEMENTED
-══════════════════════════════════════════════════════════════════════════════
-
-✅ Orchestration Engine
-   • LangGraph 5-node workflow
-   • Complexity assessment
-   • Dynamic agent spawning
-   • Result aggregation
-   • Error handling
-
-✅ Tool Integration System
-   • 5 external tool types (web search, code execution, database, file system, API)
-   • Security controls (path restrictions, timeouts, operation whitelisting)
-   • Tool registry with configuration management
-   • Intelligent tool selection by agents
-   • Graceful degradation for missing dependencies
-
-✅ Complexity Assessment
-   • Keyword detection (40+ keywords)
-   • Pattern matching
-   • Multi-factor scoring
-   • Three complexity levels
-
-✅ Agent Registry
-   • Template-based management
-   • Three pre-configured agents
-   • Capability lookup
-   • Extensible design
-
-✅ Specialized Agents
-   • Data Analyst: Statistical analysis, metrics, insights + tool integration
-   • Researcher: Information gathering, comparative analysis
-   • Code Generator: Multi-language code, architecture
-   • Meta-Learning Agent: Dynamic skill acquisition, few-shot learning
-
-✅ State Management
-   • Task tracking
-   • Agent lifecycle management
-   • Workflow status tracking
-   • Tool usage tracking
-   • Error logging
-
-✅ Full Test Coverage
-   • 25+ unit tests
-   • 100% core module coverage
-   • Edge case handling
-   • Error condition testing
-
-
-🔧 TECHNOLOGY STACK
-══════════════════════════════════════════════════════════════════════════════
-
-• LangGraph 0.1.0          → Graph-based workflow orchestration
-• LangChain 0.1.14         → LLM framework and utilities
-• LangChain-OpenAI 0.1.1   → OpenAI integration
-• LangChain-Core 0.1.33    → Core LLM utilities
-• Pydantic 2.5.0           → Data validation
-• Python-dotenv 1.0.0      → Environment management
-• Requests 2.31.0          → HTTP client for API tools
-• SQLite3 (built-in)       → Database operations
-• Subprocess (built-in)    → Code execution tools
-• Python 3.9+              → Modern Python
-
-
-📚 DOCUMENTATION PROVIDED
-══════════════════════════════════════════════════════════════════════════════
-
-1. README.md (Comprehensive)
-   • Project overview
-   • Architecture explanation
-   • Installation guide
-   • API reference
-   • Usage examples
-   • Troubleshooting
-
-2. QUICK_REFERENCE.md (Developer Cheat Sheet)
-   • Installation checklist
-   • Usage patterns (4 common patterns)
-   • Complexity reference
-   • Agent types reference
-   • Common tasks
-   • FAQ & troubleshooting
-
-3. SETUP.md (Setup Guide)
-   • Prerequisites
-   • Step-by-step installation
-   • Configuration options
-   • Testing instructions
-   • Troubleshooting
-
-4. PROJECT_SUMMARY.md (Overview)
-   • Component descriptions
-   • Architecture details
-   • Statistics
-
-5. IMPLEMENTATION_CHECKLIST.md (Verification)
-   • Feature checklist
-   • Component list
-   • Status indicators
-
-6. INDEX.md (Complete Index)
-   • File directory
-   • Component summary
-   • Learning resources
-
-7. COMPLETION_REPORT.md (This Report)
-   • Final delivery summary
-
-
-🚀 QUICK START
-══════════════════════════════════════════════════════════════════════════════
-
-1. Install Dependencies
-   pip install -r requirements.txt
-
-2. Configure Environment
-   cp .env.example .env
-   # Edit .env with your OPENAI_API_KEY
-
-3. Run Tests
-   python -m pytest tests/ -v
-
-4. Try Examples
-   python examples/getting_started.py
-
-5. Use in Your Code
-   from src.orchestrator import Orchestrator
-   orchestrator = Orchestrator(model_name="gpt-4")
-   result = orchestrator.process_task("Your task here")
-   print(result['final_response'])
-
-
-🎓 LEARNING PATH
-══════════════════════════════════════════════════════════════════════════════
-
-1. Read PROJECT_SUMMARY.md (5 min overview)
-2. Run examples/getting_started.py (10 min demo)
-3. Read README.md (20 min detailed docs)
-4. Review src/ code (30 min study)
-5. Run tests (5 min verification)
-6. Explore examples (15 min)
-
-Total Learning Time: ~85 minutes
-
-
-🔄 ARCHITECTURE WORKFLOW
-══════════════════════════════════════════════════════════════════════════════
-
-Input Task
-    ↓
-[assess_complexity] → Extract keywords, determine complexity level
-    ↓
-[decide_agents] → Make agent spawning decisions
-    ↓
-[spawn_agents] → Create and execute specialized agents
-    ↓
-[aggregate_results] → Synthesize results into final response
-    ↓
-Final Output
-
-
-✨ HIGHLIGHTS
-══════════════════════════════════════════════════════════════════════════════
-
-✅ Production Ready
-   • Clean code architecture
-   • Full error handling
-   • Comprehensive tests
-   • Complete documentation
-
-✅ Tool-Enhanced Intelligence
-   • Agents can use external tools (web search, code execution, databases)
-   • Intelligent tool selection based on task analysis
-   • Security controls for safe tool execution
-   • Graceful degradation when tools unavailable
-
-✅ Intelligent Design
-   • Code-based + LLM reasoning hybrid
-   • Only spawns agents when needed
-   • Cost-efficient architecture
-
-✅ Extensible
-   • Easy custom agent creation
-   • Pluggable registry system
-   • Customizable keywords
-   • Modular design
-   • Tool integration framework
-
-✅ Well Documented
-   • 7 documentation files
-   • Multiple working examples
-   • Comprehensive API reference
-   • Code comments throughout
-
-✅ Thoroughly Tested
-   • 25+ unit tests
-   • Edge case coverage
-   • Error handling tests
-   • Singleton pattern verified
-
-
-📋 CUSTOMIZATION POINTS
-══════════════════════════════════════════════════════════════════════════════
-
-1. Complexity Keywords (src/utils.py)
-   • Add/modify keywords
-   • Adjust scoring
-
-2. Agent Keywords (src/utils.py)
-   • Add/modify for agent detection
-   • Create new specializations
-
-3. Tool Integration (src/tools.py, src/tool_registry.py)
-   • Add new tool types
-   • Configure tool security settings
-   • Customize tool selection logic
-
-4. Custom Agents
-   • Create new agent class
-   • Register in registry
-   • Add to keyword mappings
-   • Integrate with tools
-
-5. LLM Configuration
-   • Change temperature
-   • Switch model
-   • Modify system prompts
-
-6. Workflow Logic
-   • Add custom nodes
-   • Modify edge conditions
-   • Add branching
-
-
-🎁 WHAT YOU GET
-══════════════════════════════════════════════════════════════════════════════
-
-✅ Complete Framework
-   • Fully functional multi-agent system
-   • Production-ready code
-   • Comprehensive documentation
-
-✅ Tool Integration System
-   • 5 pre-built external tools
-   • Security controls and configuration
-   • Intelligent tool selection
-   • Extensible tool framework
-
-✅ Extensible Architecture
-   • Easy to customize
-   • Pluggable components
-   • Clear API
-
-✅ Developer Tools
-   • Full test suite
-   • Working examples
-   • Documentation guides
-
-✅ Ready to Use
-   • Works out of the box
-   • Simple integration
-   • Clear instructions
-
-
-📞 SUPPORT RESOURCES
-══════════════════════════════════════════════════════════════════════════════
-
-• README.md          → Full documentation
-• QUICK_REFERENCE.md → Quick lookup
-• SETUP.md          → Installation help
-• examples/         → Working code
-• tests/            → Implementation examples
-• Source code       → Comments & docstrings
-
-
-═══════════════════════════════════════════════════════════════════════════════
-
-✅ STATUS: PRODUCTION READY WITH TOOL INTEGRATION
-
-All features implemented ✅
-Tool integration complete ✅
-Comprehensive tests passing ✅
-Full documentation complete ✅
-Working examples provided ✅
-Error handling implemented ✅
-Type hints throughout ✅
-Code quality verified ✅
-
-═══════════════════════════════════════════════════════════════════════════════
-
-🚀 READY TO USE WITH TOOLS!
-
-Start with: python examples/getting_started.py
-
-For tool integration: python examples/example4_tool_integration.py
-
-For detailed information, see: README.md
-
-═══════════════════════════════════════════════════════════════════════════════
+    Args:
+        sections: Optional section names to include (default: all)
+    
+    Returns:
+        Iterator over the selected section texts
+    """
+    section_bytes = _section_bytes()
+    for name in _selected_sections(sections):
+        yield section_bytes[name].decode("utf-8")
 
-Framework Version: 0.1.0 (with Tool Integration)
-Build Date: October 23, 2025
-Status: Complete - Production Ready ✅
 
-"""
+def print_summary(sections: Optional[Iterable[str]] = None) -> None:
+    """
+    Print build summary.
+    
+    Args:
+        sections: Optional section names to print (default: all)
+    """
+    
+    # Streams without a binary buffer (e.g. IDLE) only accept text
+    buffer = getattr(sys.stdout, "buffer", None)
+    if buffer is None:
+        sys.stdout.writelines(iter_summary(sections))
+        return
     
-    print(summary)
+    sys.stdout.flush()
+    if sections is None:
+        # Hand the whole mapped file to the stream without copying it first
+        with _SUMMARY_PATH.open("rb") as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            buffer.write(mm)
+    else:
+        section_bytes = _section_bytes()
+        buffer.write(b"".join(section_bytes[name] for name in _selected_sections(sections)))
+    buffer.flush()
 
 
 if __name__ == "__main__":
-    print_summary()
+    print_summary(sys.argv[1:] or None)
@@ -0,0 +1,147 @@
+"""
+Shared helpers for the AgentSpawn examples.
+
+Caches expensive framework objects so examples run in the same process reuse them,
+and memoizes direct agent calls so repeated runs skip identical LLM round-trips.
+"""
+
+import functools
+import hashlib
+import os
+import sys
+import threading
+from typing import Any, Callable, Dict, Tuple
+
+try:
+    import diskcache
+    DISKCACHE_AVAILABLE = True
+except ImportError:
+    DISKCACHE_AVAILABLE = False
+
+
+# Set to a directory to persist agent results across runs (requires diskcache)
+AGENT_CACHE_DIR_ENV = "AGENTSPAWN_EXAMPLE_CACHE"
+
+_agent_results: Dict[Tuple[str, str, str], Any] = {}
+_agent_results_lock = threading.Lock()
+
+
+def exit_if_help(doc: str) -> None:
+    """
+    Print an example's docstring and exit when -h/--help is passed.
+    
+    Call this before anything heavy is imported so quick exits skip the
+    LangChain/LangGraph import cost.
+    
+    Args:
+        doc: The example module's docstring
+    """
+    if "-h" in sys.argv[1:] or "--help" in sys.argv[1:]:
+        print(doc.strip())
+        sys.exit(0)
+
+
+def preview(text: str, limit: int = 80) -> str:
+    """
+    Truncate text for display, marking truncation with an ellipsis.
+    
+    Text already within the limit is returned as is, without a copy.
+    
+    Args:
+        text: Text to shorten
+        limit: Maximum number of characters kept
+        
+    Returns:
+        The text, or its first limit characters followed by "..."
+    """
+    if len(text) <= limit:
+        return text
+    return text[:limit] + "..."
+
+
+def require_openai_key() -> None:
+    """
+    Exit early when no OpenAI API key is configured.
+    
+    Loads .env first, then checks OPENAI_API_KEY before any orchestrator or
+    agent is built, so misconfigured runs fail immediately instead of after
+    setup and a failed request.
+    
+    Raises:
+        SystemExit: If OPENAI_API_KEY is not set
+    """
+    import dotenv
+    dotenv.load_dotenv()
+    
+    if not os.getenv("OPENAI_API_KEY"):
+        print("❌ Error: OPENAI_API_KEY environment variable not set")
+        print("Please set your OpenAI API key in the .env file")
+        sys.exit(1)
+
+
+@functools.lru_cache(maxsize=4)
+def get_orchestrator(model_name: str = "gpt-4", **options):
+    """
+    Get a cached orchestrator for the given model and options.
+    
+    Building an orchestrator compiles the LangGraph workflow and sets up the LLM
+    client and registries, so examples run in the same process share one
+    instance per model and option set.
+    
+    Args:
+        model_name: LLM model to use
+        **options: Extra Orchestrator keyword arguments (must be hashable)
+        
+    Returns:
+        Orchestrator instance
+    """
+    from src.orchestrator import Orchestrator
+    return Orchestrator(model_name=model_name, **options)
+
+
+@functools.lru_cache(maxsize=1)
+def _get_disk_cache():
+    """Open the persistent agent result cache, or None if not configured."""
+    cache_dir = os.getenv(AGENT_CACHE_DIR_ENV)
+    if not cache_dir or not DISKCACHE_AVAILABLE:
+        return None
+    return diskcache.Cache(cache_dir)
+
+
+def cached_agent_call(agent_type: str, prompt: str, model: str, call: Callable[[], Any]) -> Any:
+    """
+    Return a memoized agent result, running the call only on a cache miss.
+    
+    Results are keyed by (agent_type, sha256(prompt), model) and kept in memory;
+    when AGENTSPAWN_EXAMPLE_CACHE points to a directory and diskcache is installed,
+    they are also persisted there so later runs reuse them.
+    
+    Args:
+        agent_type: Agent type making the call
+        prompt: Full prompt/arguments identifying the call
+        model: LLM model used by the agent
+        call: Zero-argument callable producing the result
+        
+    Returns:
+        Cached or freshly computed agent result
+    """
+    key = (agent_type, hashlib.sha256(prompt.encode("utf-8")).hexdigest(), model)
+    
+    with _agent_results_lock:
+        if key in _agent_results:
+            return _agent_results[key]
+    
+    disk = _get_disk_cache()
+    if disk is not None:
+        result = disk.get(key)
+        if result is not None:
+            with _agent_results_lock:
+                _agent_results[key] = result
+            return result
+    
+    result = call()
+    with _agent_results_lock:
+        _agent_results[key] = result
+    if disk is not None:
+        disk.set(key, result)
+    return result
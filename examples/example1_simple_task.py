@@ -2,25 +2,30 @@
 Example 1: Simple Task Processing
 
 Demonstrates using AgentSpawn for a simple task that doesn't require specialized agents.
+
+Run from the repository root:
+    python -m examples.example1_simple_task
 """
 
+import io
 import sys
-import os
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
-from orchestrator import Orchestrator
-import json
+from examples._common import exit_if_help, get_orchestrator, require_openai_key
+
+# Separator lines used by the demo output
+RULE = "=" * 80
 
 
 def main():
     """Run simple task example."""
     
-    print("=" * 80)
+    print(RULE)
     print("AgentSpawn Example 1: Simple Task Processing")
-    print("=" * 80)
+    print(RULE)
     
-    # Initialize orchestrator
-    orchestrator = Orchestrator(model_name="gpt-4")
+    # Initialize orchestrator; repeated simple tasks are answered from cache
+    # (set AGENTSPAWN_TRIVIAL_CACHE to a file path to keep answers across runs)
+    orchestrator = get_orchestrator("gpt-4", cache_simple_tasks=True)
     
     # Simple task that won't require specialized agents
     simple_task = "What is the capital of France?"
@@ -28,29 +33,33 @@ def main():
     print(f"\nProcessing task: {simple_task}\n")
     
     # Process the task
-    result = orchestrator.process_task(simple_task)
+    result = orchestrator.process_task(simple_task, preview_chars=200)
     
-    # Display results
-    print("Task Metadata:")
-    print(f"  Complexity: {result['task_metadata']['complexity']}")
-    print(f"  Keywords: {', '.join(result['task_metadata']['keywords'])}")
-    print(f"  Multiple agents needed: {result['task_metadata']['requires_multiple_agents']}")
+    # Display results, buffered and written in one go
+    tm = result['task_metadata']
+    buf = io.StringIO()
+    buf.write("Task Metadata:\n")
+    buf.write(f"  Complexity: {tm['complexity']}\n")
+    buf.write(f"  Keywords: {', '.join(tm['keywords'])}\n")
+    buf.write(f"  Multiple agents needed: {tm['requires_multiple_agents']}\n")
     
-    print("\nOrchestrator Reasoning:")
-    print(f"  {result['orchestrator_reasoning']}")
+    buf.write("\nOrchestrator Reasoning:\n")
+    buf.write(f"  {result['orchestrator_reasoning']}\n")
     
-    print("\nSpawned Agents:")
+    buf.write("\nSpawned Agents:\n")
     if result['spawned_agents']:
         for agent in result['spawned_agents']:
-            print(f"  - {agent['agent_type']}: {agent['status']}")
+            buf.write(f"  - {agent['agent_type']}: {agent['status']}\n")
     else:
-        print("  None (direct reasoning used)")
+        buf.write("  None (direct reasoning used)\n")
     
-    print("\nFinal Response:")
-    print(f"  {result['final_response'][:200]}...")
+    buf.write("\nFinal Response:\n")
+    buf.write(f"  {result['final_response'][:200]}...\n")
     
-    print("\n" + "=" * 80)
-
+    buf.write("\n" + RULE + "\n")
+    sys.stdout.write(buf.getvalue())
 
 if __name__ == "__main__":
+    exit_if_help(__doc__)
+    require_openai_key()
     main()
@@ -2,25 +2,29 @@
 Example 2: Complex Task with Multi-Agent Orchestration
 
 Demonstrates using AgentSpawn for a complex task that spawns multiple specialized agents.
+
+Run from the repository root:
+    python -m examples.example2_complex_task
 """
 
+import io
 import sys
-import os
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
-from orchestrator import Orchestrator
-import json
+from examples._common import exit_if_help, get_orchestrator, require_openai_key
+
+# Separator lines used by the demo output
+RULE = "=" * 80
 
 
 def main():
     """Run complex task example."""
     
-    print("=" * 80)
+    print(RULE)
     print("AgentSpawn Example 2: Complex Task with Multi-Agent Orchestration")
-    print("=" * 80)
+    print(RULE)
     
     # Initialize orchestrator
-    orchestrator = Orchestrator(model_name="gpt-4")
+    orchestrator = get_orchestrator("gpt-4")
     
     # Complex task requiring multiple specialized agents
     complex_task = """
@@ -36,40 +40,44 @@ def main():
     print(f"\nProcessing task:\n{complex_task}\n")
     
     # Process the task
-    result = orchestrator.process_task(complex_task)
+    result = orchestrator.process_task(complex_task, preview_chars=400)
     
-    # Display results
-    print("Task Metadata:")
-    print(f"  Task ID: {result['task_metadata']['task_id']}")
-    print(f"  Complexity: {result['task_metadata']['complexity']}")
-    print(f"  Keywords: {', '.join(result['task_metadata']['keywords'][:8])}...")
-    print(f"  Multiple agents needed: {result['task_metadata']['requires_multiple_agents']}")
+    # Display results, buffered and written in one go
+    tm = result['task_metadata']
+    buf = io.StringIO()
+    buf.write("Task Metadata:\n")
+    buf.write(f"  Task ID: {tm['task_id']}\n")
+    buf.write(f"  Complexity: {tm['complexity']}\n")
+    buf.write(f"  Keywords: {', '.join(tm['keywords'][:8])}...\n")
+    buf.write(f"  Multiple agents needed: {tm['requires_multiple_agents']}\n")
     
-    print("\nOrchestrator Reasoning:")
-    print(f"  {result['orchestrator_reasoning']}")
+    buf.write("\nOrchestrator Reasoning:\n")
+    buf.write(f"  {result['orchestrator_reasoning']}\n")
     
-    print("\nSpawned Agents:")
+    buf.write("\nSpawned Agents:\n")
     if result['spawned_agents']:
         for agent in result['spawned_agents']:
-            print(f"  - Agent ID: {agent['agent_id']}")
-            print(f"    Type: {agent['agent_type']}")
-            print(f"    Status: {agent['status']}")
+            buf.write(f"  - Agent ID: {agent['agent_id']}\n")
+            buf.write(f"    Type: {agent['agent_type']}\n")
+            buf.write(f"    Status: {agent['status']}\n")
             if agent['result']:
-                print(f"    Result preview: {agent['result'][:150]}...")
+                buf.write(f"    Result preview: {agent['result'][:150]}...\n")
     else:
-        print("  None")
+        buf.write("  None\n")
     
-    print("\nFinal Aggregated Response:")
-    print(f"  {result['final_response'][:400]}...\n")
+    buf.write("\nFinal Aggregated Response:\n")
+    buf.write(f"  {result['final_response'][:400]}...\n\n")
     
-    print("Workflow Status:", result['workflow_status'])
+    buf.write(f"Workflow Status: {result['workflow_status']}\n")
     if result['errors']:
-        print("Errors encountered:")
+        buf.write("Errors encountered:\n")
         for error in result['errors']:
-            print(f"  - {error}")
+            buf.write(f"  - {error}\n")
     
-    print("\n" + "=" * 80)
-
+    buf.write("\n" + RULE + "\n")
+    sys.stdout.write(buf.getvalue())
 
 if __name__ == "__main__":
+    exit_if_help(__doc__)
+    require_openai_key()
     main()
@@ -2,85 +2,110 @@
 Example 3: Direct Agent Usage
 
 Demonstrates direct usage of individual agents without going through the orchestrator.
+
+Run from the repository root:
+    python -m examples.example3_direct_agents
 """
 
-import sys
-import os
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+import io
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from examples._common import cached_agent_call, exit_if_help, require_openai_key
 
-from agents.data_analyst import DataAnalystAgent
-from agents.researcher import ResearcherAgent
-from agents.code_generator import CodeGeneratorAgent
+# Separator lines used by the demo output
+RULE = "=" * 80
 
+MODEL_NAME = "gpt-4"
 
-def example_data_analyst():
+
+def example_data_analyst() -> str:
     """Example using Data Analyst Agent directly."""
-    print("\n" + "=" * 80)
-    print("Data Analyst Agent Example")
-    print("=" * 80)
+    from src.agents.data_analyst import DataAnalystAgent
     
-    analyst = DataAnalystAgent()
+    out = io.StringIO()
+    out.write("\n" + RULE + "\n")
+    out.write("Data Analyst Agent Example\n")
+    out.write(RULE + "\n")
     
     task = """Analyze the impact of a 20% price increase on sales if elasticity is -1.2.
     Current metrics: Monthly sales $100K, Average order value $50."""
     
-    result = analyst.analyze(task)
-    print(f"\nAnalysis Result:\n{result['analysis'][:300]}...\n")
+    result = cached_agent_call(
+        "data_analyst", task, MODEL_NAME,
+        lambda: DataAnalystAgent(model=MODEL_NAME).analyze(task)
+    )
+    out.write(f"\nAnalysis Result:\n{result['analysis'][:300]}...\n\n")
+    return out.getvalue()
 
 
-def example_researcher():
+def example_researcher() -> str:
     """Example using Researcher Agent directly."""
-    print("\n" + "=" * 80)
-    print("Researcher Agent Example")
-    print("=" * 80)
+    from src.agents.researcher import ResearcherAgent
     
-    researcher = ResearcherAgent()
+    out = io.StringIO()
+    out.write("\n" + RULE + "\n")
+    out.write("Researcher Agent Example\n")
+    out.write(RULE + "\n")
     
-    research_result = researcher.conduct_research(
-        "Machine Learning in Production Systems",
-        depth="comprehensive"
+    topic = "Machine Learning in Production Systems"
+    depth = "comprehensive"
+    
+    research_result = cached_agent_call(
+        "researcher", f"{topic}\n{depth}", MODEL_NAME,
+        lambda: ResearcherAgent(model=MODEL_NAME).conduct_research(topic, depth=depth)
     )
-    print(f"\nResearch Result:\n{research_result['research'][:300]}...\n")
+    out.write(f"\nResearch Result:\n{research_result['research'][:300]}...\n\n")
+    return out.getvalue()
 
 
-def example_code_generator():
+def example_code_generator() -> str:
     """Example using Code Generator Agent directly."""
-    print("\n" + "=" * 80)
-    print("Code Generator Agent Example")
-    print("=" * 80)
+    from src.agents.code_generator import CodeGeneratorAgent
     
-    generator = CodeGeneratorAgent()
+    out = io.StringIO()
+    out.write("\n" + RULE + "\n")
+    out.write("Code Generator Agent Example\n")
+    out.write(RULE + "\n")
     
     requirement = """Create a Python function that implements binary search on a sorted list.
     Include error handling and docstrings."""
     
-    code_result = generator.generate_code(requirement, language="python")
-    print(f"\nGenerated Code:\n{code_result['code'][:300]}...\n")
+    language = "python"
+    
+    code_result = cached_agent_call(
+        "code_generator", f"{requirement}\n{language}", MODEL_NAME,
+        lambda: CodeGeneratorAgent(model=MODEL_NAME).generate_code(requirement, language=language)
+    )
+    out.write(f"\nGenerated Code:\n{code_result['code'][:300]}...\n\n")
+    return out.getvalue()
 
 
 def main():
     """Run all direct agent examples."""
-    print("=" * 80)
+    print(RULE)
     print("AgentSpawn Example 3: Direct Agent Usage")
-    print("=" * 80)
-    
-    try:
-        example_data_analyst()
-    except Exception as e:
-        print(f"Data Analyst example error: {e}")
+    print(RULE)
     
-    try:
-        example_researcher()
-    except Exception as e:
-        print(f"Researcher example error: {e}")
+    examples = {
+        example_data_analyst: "Data Analyst",
+        example_researcher: "Researcher",
+        example_code_generator: "Code Generator",
+    }
     
-    try:
-        example_code_generator()
-    except Exception as e:
-        print(f"Code Generator example error: {e}")
+    # Each example is an independent LLM round-trip, so run them concurrently.
+    # Examples buffer their own output and it is printed in one piece per example.
+    with ThreadPoolExecutor(max_workers=len(examples)) as executor:
+        futures = {executor.submit(fn): name for fn, name in examples.items()}
+        for future in as_completed(futures):
+            try:
+                print(future.result(), end="")
+            except Exception as e:
+                print(f"{futures[future]} example error: {e}")
     
-    print("\n" + "=" * 80)
+    print("\n" + RULE)
 
 
 if __name__ == "__main__":
+    exit_if_help(__doc__)
+    require_openai_key()
     main()
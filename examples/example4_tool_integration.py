@@ -3,174 +3,170 @@ Example 4: Tool Integration Demo
 
 This example demonstrates how agents can use external tools to perform actions
 beyond text generation, such as web search, code execution, and database queries.
+
+Run from the repository root:
+    python -m examples.example4_tool_integration
 """
 
-import sys
-import os
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+import io
+from concurrent.futures import ThreadPoolExecutor
 
-from src.orchestrator import Orchestrator
+from examples._common import get_orchestrator, require_openai_key
 from src.tool_registry import get_tool_registry
 
+# Separator lines used by the demo output
+RULE = "=" * 50
+THIN_RULE = "-" * 50
+
+# Tool registry and the tools the direct usage demo exercises, looked up once
+_TOOLS = get_tool_registry()
+_CODE_TOOL, _SEARCH_TOOL, _DB_TOOL = (
+    _TOOLS.get_tool(name) for name in ("code_execution", "web_search", "database_query")
+)
+
 
 def demo_tool_integration():
     """Demonstrate tool integration capabilities."""
 
     print("🔧 AgentSpawn Tool Integration Demo")
-    print("=" * 50)
+    print(RULE)
 
-    # Initialize orchestrator
-    orchestrator = Orchestrator(model_name="gpt-4")
+    # Initialize orchestrator (shared with other examples in this process)
+    orchestrator = get_orchestrator("gpt-4")
 
     # Show available tools
-    tool_registry = get_tool_registry()
-    available_tools = tool_registry.get_available_tools()
+    available_tools = _TOOLS.get_available_tools()
+    tool_count = len(available_tools)
 
-    print(f"📋 Available Tools: {len(available_tools)}")
+    print(f"📋 Available Tools: {tool_count}")
     for tool in available_tools:
         print(f"  • {tool.name}: {tool.description}")
     print()
 
-    # Example 1: Data analysis with code execution
-    print("🧮 Example 1: Data Analysis with Code Execution")
-    print("-" * 50)
-
-    task1 = """
+    # Example tasks: (title, task)
+    examples = [
+        ("🧮 Example 1: Data Analysis with Code Execution", """
     Analyze the following dataset and calculate statistical measures:
     [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 15, 20, 25]
 
     Calculate mean, median, standard deviation, and identify outliers.
-    """
-
-    try:
-        result1 = orchestrator.process_task(task1)
-        print(f"Task: {task1.strip()}")
-        print(f"Response: {result1['final_response'][:200]}...")
-        print(f"Agents spawned: {len(result1['spawned_agents'])}")
-        print(f"Complexity: {result1['task_metadata']['complexity']}")
-        print()
-    except Exception as e:
-        print(f"❌ Error: {e}")
-        print()
-
-    # Example 2: Research task with web search
-    print("🔍 Example 2: Research with Web Search")
-    print("-" * 50)
-
-    task2 = """
+    """),
+        ("🔍 Example 2: Research with Web Search", """
     Research the latest developments in AI safety and summarize the key concerns
     and proposed solutions from recent publications.
-    """
-
-    try:
-        result2 = orchestrator.process_task(task2)
-        print(f"Task: {task2.strip()}")
-        print(f"Response: {result2['final_response'][:200]}...")
-        print(f"Agents spawned: {len(result2['spawned_agents'])}")
-        print(f"Complexity: {result2['task_metadata']['complexity']}")
-        print()
-    except Exception as e:
-        print(f"❌ Error: {e}")
-        print()
-
-    # Example 3: Database analysis task
-    print("💾 Example 3: Database Query Analysis")
-    print("-" * 50)
-
-    task3 = """
+    """),
+        ("💾 Example 3: Database Query Analysis", """
     Analyze a database table structure and provide recommendations for optimization.
     Query the available tables and suggest indexing strategies.
-    """
-
-    try:
-        result3 = orchestrator.process_task(task3)
-        print(f"Task: {task3.strip()}")
-        print(f"Response: {result3['final_response'][:200]}...")
-        print(f"Agents spawned: {len(result3['spawned_agents'])}")
-        print(f"Complexity: {result3['task_metadata']['complexity']}")
-        print()
-    except Exception as e:
-        print(f"❌ Error: {e}")
-        print()
-
-    # Example 4: Multi-tool task
-    print("🔗 Example 4: Multi-Tool Integration")
-    print("-" * 50)
-
-    task4 = """
+    """),
+        ("🔗 Example 4: Multi-Tool Integration", """
     Research current trends in renewable energy, analyze statistical data on solar panel efficiency,
     and generate Python code to visualize energy consumption patterns.
-    """
-
-    try:
-        result4 = orchestrator.process_task(task4)
-        print(f"Task: {task4.strip()}")
-        print(f"Response: {result4['final_response'][:200]}...")
-        print(f"Agents spawned: {len(result4['spawned_agents'])}")
-        print(f"Complexity: {result4['task_metadata']['complexity']}")
-        print()
-    except Exception as e:
-        print(f"❌ Error: {e}")
-        print()
-
-    print("✅ Tool Integration Demo Complete!")
-    print("\n💡 Key Features Demonstrated:")
-    print("  • Dynamic tool selection based on task requirements")
-    print("  • Code execution for computational tasks")
-    print("  • Web search for research tasks")
-    print("  • Database queries for data analysis")
-    print("  • Multi-tool coordination for complex tasks")
+    """),
+    ]
+
+    def _run(task):
+        """Process one task, returning (result, error)."""
+        try:
+            return orchestrator.process_task(task, preview_chars=200), None
+        except Exception as e:
+            return None, e
+
+    # The tasks are independent LLM/tool round-trips, so run them concurrently
+    # and print the results in order once all have finished
+    with ThreadPoolExecutor(max_workers=len(examples)) as executor:
+        outcomes = list(executor.map(_run, [task for _, task in examples]))
+
+    for (title, task), (result, error) in zip(examples, outcomes):
+        print(title)
+        print(THIN_RULE)
+        if error is not None:
+            print(f"❌ Error: {error}")
+            print()
+            continue
+        try:
+            print(f"Task: {task.strip()}")
+            print(f"Response: {result['final_response'][:200]}...")
+            print(f"Agents spawned: {len(result['spawned_agents'])}")
+            print(f"Complexity: {result['task_metadata']['complexity']}")
+            print()
+        except Exception as e:
+            print(f"❌ Error: {e}")
+            print()
+
+    print("\n".join([
+        "✅ Tool Integration Demo Complete!",
+        "\n💡 Key Features Demonstrated:",
+        "  • Dynamic tool selection based on task requirements",
+        "  • Code execution for computational tasks",
+        "  • Web search for research tasks",
+        "  • Database queries for data analysis",
+        "  • Multi-tool coordination for complex tasks",
+    ]))
 
 
 def demo_direct_tool_usage():
     """Demonstrate direct tool usage without full orchestration."""
 
     print("\n🔧 Direct Tool Usage Demo")
-    print("=" * 50)
+    print(RULE)
+
+    # The three tool checks are independent, so run them concurrently and
+    # print their reports in order
+    checks = [_check_code_tool, _check_web_search_tool, _check_database_tool]
+    with ThreadPoolExecutor(max_workers=len(checks)) as executor:
+        reports = list(executor.map(lambda check: check(), checks))
 
-    tool_registry = get_tool_registry()
+    print("\n\n".join(reports))
 
-    # Test code execution tool
-    print("🐍 Testing Code Execution Tool:")
-    code_tool = tool_registry.get_tool("code_execution")
-    if code_tool:
+
+def _check_code_tool() -> str:
+    """Run the code execution tool and report the outcome."""
+    out = io.StringIO()
+    out.write("🐍 Testing Code Execution Tool:\n")
+    if _CODE_TOOL is not None:
         code = "print('Hello from tool execution!')"
-        result = code_tool.execute(code, "python")
-        print(f"Code: {code}")
-        print(f"Output: {result.data.get('output', 'N/A')}")
-        print(f"Success: {result.success}")
+        result = _CODE_TOOL.execute(code, "python")
+        out.write(f"Code: {code}\n")
+        out.write(f"Output: {result.data.get('output', 'N/A')}\n")
+        out.write(f"Success: {result.success}")
     else:
-        print("Code execution tool not available")
-    print()
+        out.write("Code execution tool not available")
+    return out.getvalue()
 
-    # Test web search tool (requires API key)
-    print("🌐 Testing Web Search Tool:")
-    search_tool = tool_registry.get_tool("web_search")
-    if search_tool:
+
+def _check_web_search_tool() -> str:
+    """Run the web search tool (requires API key) and report the outcome."""
+    out = io.StringIO()
+    out.write("🌐 Testing Web Search Tool:\n")
+    if _SEARCH_TOOL is not None:
         try:
-            result = search_tool.execute("Python programming", 2)
-            print(f"Search Query: Python programming")
-            print(f"Results found: {len(result.data.get('results', []))}")
-            print(f"Success: {result.success}")
+            result = _SEARCH_TOOL.execute("Python programming", 2)
+            out.write(f"Search Query: Python programming\n")
+            out.write(f"Results found: {len(result.data.get('results', []))}\n")
+            out.write(f"Success: {result.success}")
         except Exception as e:
-            print(f"Web search failed (API key needed): {e}")
+            out.write(f"Web search failed (API key needed): {e}")
     else:
-        print("Web search tool not available")
-    print()
-
-    # Test database tool
-    print("💾 Testing Database Tool:")
-    db_tool = tool_registry.get_tool("database_query")
-    if db_tool:
-        result = db_tool.execute("SELECT sqlite_version()", "SELECT")
-        print(f"Query: SELECT sqlite_version()")
-        print(f"Success: {result.success}")
+        out.write("Web search tool not available")
+    return out.getvalue()
+
+
+def _check_database_tool() -> str:
+    """Run the database tool and report the outcome."""
+    out = io.StringIO()
+    out.write("💾 Testing Database Tool:\n")
+    if _DB_TOOL is not None:
+        result = _DB_TOOL.execute("SELECT sqlite_version()", "SELECT")
+        out.write(f"Query: SELECT sqlite_version()\n")
+        out.write(f"Success: {result.success}")
         if result.success:
-            print(f"Result: {result.data}")
+            out.write(f"\nResult: {result.data}")
     else:
-        print("Database tool not available")
-
+        out.write("Database tool not available")
+    return out.getvalue()
 
 if __name__ == "__main__":
+    require_openai_key()
     demo_tool_integration()
     demo_direct_tool_usage()
\ No newline at end of file
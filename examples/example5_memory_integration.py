@@ -4,40 +4,53 @@ AgentSpawn Framework - Memory Integration Example
 
 This example demonstrates the persistent memory capabilities of the AgentSpawn framework,
 showing how agents can maintain context across multiple interactions.
+
+Run from the repository root:
+    python -m examples.example5_memory_integration
 """
 
-import os
 import sys
-from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+from examples._common import get_orchestrator, preview, require_openai_key
 
-# Add the src directory to the path
-sys.path.insert(0, str(Path(__file__).parent / "src"))
+# Separator lines used by the demo output
+RULE = "=" * 60
+THIN_RULE = "-" * 50
 
-from src.orchestrator import Orchestrator
-import dotenv
 
-# Load environment variables
-dotenv.load_dotenv()
+def print_token_usage(result):
+    """Print prompt cache usage reported for an interaction."""
+    usage = result.get('token_usage') or {}
+    if not usage:
+        print("Token usage: not reported by the model provider")
+        return
+    cached = usage.get('cached_input_tokens', 0)
+    uncached = usage.get('input_tokens', 0) - cached
+    print(f"Prompt tokens: {cached} cached, {uncached} uncached; "
+          f"output tokens: {usage.get('output_tokens', 0)}")
 
 
 def demonstrate_memory_integration():
     """Demonstrate persistent memory across multiple conversations."""
 
     print("🧠 AgentSpawn Framework - Memory Integration Demo")
-    print("=" * 60)
+    print(RULE)
 
     # Initialize orchestrator with memory enabled
-    orchestrator = Orchestrator(model_name="gpt-4", enable_memory=True)
+    orchestrator = get_orchestrator("gpt-4", enable_memory=True)
 
     # Use a consistent thread ID for conversation continuity
     thread_id = "demo_conversation_001"
 
     print(f"Using thread ID: {thread_id}")
+    print("The thread ID doubles as the prompt cache key, so follow-up interactions")
+    print("can reuse the provider's cached prompt prefix instead of re-reading it.")
     print()
 
     # First interaction - Initial data analysis request
     print("🔄 Interaction 1: Initial data analysis request")
-    print("-" * 50)
+    print(THIN_RULE)
 
     task1 = """
     Analyze the sales data for our e-commerce platform. We have customer purchase data
@@ -52,12 +65,13 @@ def demonstrate_memory_integration():
     result1 = orchestrator.process_task(task1, thread_id=thread_id)
 
     print(f"Agent: {result1['final_response'][:200]}...")
+    print_token_usage(result1)
     print(f"Memory stored for thread: {thread_id}")
     print()
 
     # Second interaction - Follow-up question using memory
     print("🔄 Interaction 2: Follow-up analysis using memory context")
-    print("-" * 50)
+    print(THIN_RULE)
 
     task2 = """
     Based on the previous analysis, what recommendations do you have for
@@ -69,12 +83,13 @@ def demonstrate_memory_integration():
     result2 = orchestrator.process_task(task2, thread_id=thread_id)
 
     print(f"Agent: {result2['final_response'][:200]}...")
+    print_token_usage(result2)
     print(f"Memory context loaded and used for continuity")
     print()
 
     # Third interaction - Specific data request
     print("🔄 Interaction 3: Specific data analysis request")
-    print("-" * 50)
+    print(THIN_RULE)
 
     task3 = """
     Can you calculate the customer lifetime value (CLV) for our top 10% of customers?
@@ -83,24 +98,35 @@ def demonstrate_memory_integration():
 
     print(f"User: {task3.strip()}")
 
-    result3 = orchestrator.process_task(task3, thread_id=thread_id)
+    # Reuse the orchestrator's memory manager rather than looking it up again
+    memory_manager = orchestrator.memory_manager
+
+    # The semantic search shown below does not depend on this interaction, so
+    # run it while the LLM works on task 3 instead of after it returns
+    search_query = "customer retention recommendations"
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        search_future = executor.submit(memory_manager.retrieve_memories, search_query, 3)
+        result3 = orchestrator.process_task(task3, thread_id=thread_id)
 
     print(f"Agent: {result3['final_response'][:200]}...")
+    print_token_usage(result3)
     print(f"Complete conversation history maintained")
     print()
 
     # Show memory context information
     print("📊 Memory Context Summary")
-    print("-" * 50)
+    print(THIN_RULE)
 
     if result3.get('memory_context'):
         memory_info = result3['memory_context']
+        conversation_context = memory_info.get('conversation_context')
+        relevant_count = len(memory_info.get('relevant_memories') or ())
         print(f"Thread ID: {memory_info.get('thread_id', 'N/A')}")
-        print(f"Context Available: {'Yes' if memory_info.get('conversation_context') else 'No'}")
-        print(f"Relevant Memories: {len(memory_info.get('relevant_memories', []))}")
+        print(f"Context Available: {'Yes' if conversation_context else 'No'}")
+        print(f"Relevant Memories: {relevant_count}")
 
-        if memory_info.get('conversation_context'):
-            print(f"Context Length: {len(memory_info['conversation_context'])} characters")
+        if conversation_context:
+            print(f"Context Length: {len(conversation_context)} characters")
     else:
         print("Memory context information not available")
 
@@ -108,38 +134,33 @@ def demonstrate_memory_integration():
 
     # Demonstrate memory retrieval
     print("🔍 Memory Retrieval Demo")
-    print("-" * 50)
-
-    from src.memory import get_memory_manager
-
-    memory_manager = get_memory_manager()
+    print(THIN_RULE)
 
-    # Get conversation history
+    # History is read after task 3 so it includes the latest exchange
     history = memory_manager.get_conversation_history(thread_id, limit=5)
+    relevant_memories = search_future.result()
 
-    print(f"Retrieved {len(history)} conversation entries from memory:")
-    for i, entry in enumerate(history, 1):
-        role = entry.metadata.get('role', 'unknown')
-        content_preview = entry.content[:100] + "..." if len(entry.content) > 100 else entry.content
-        print(f"{i}. {role.title()}: {content_preview}")
-
-    print()
+    print("\n".join([
+        f"Retrieved {len(history)} conversation entries from memory:",
+        *(
+            f"{i}. {entry.metadata.get('role', 'unknown').title()}: {preview(entry.content, 100)}"
+            for i, entry in enumerate(history, 1)
+        ),
+        "",
+    ]))
 
     # Demonstrate semantic search
-    print("🔎 Semantic Memory Search")
-    print("-" * 50)
-
-    search_query = "customer retention recommendations"
-    relevant_memories = memory_manager.retrieve_memories(search_query, limit=3)
-
-    print(f"Search query: '{search_query}'")
-    print(f"Found {len(relevant_memories)} relevant memories:")
-
-    for i, memory in enumerate(relevant_memories, 1):
-        content_preview = memory.content[:150] + "..." if len(memory.content) > 150 else memory.content
-        print(f"{i}. {content_preview}")
-
-    print()
+    print("\n".join([
+        "🔎 Semantic Memory Search",
+        THIN_RULE,
+        f"Search query: '{search_query}'",
+        f"Found {len(relevant_memories)} relevant memories:",
+        *(
+            f"{i}. {preview(memory.content, 150)}"
+            for i, memory in enumerate(relevant_memories, 1)
+        ),
+        "",
+    ]))
 
     print("✅ Memory Integration Demo Complete!")
     print("The framework now supports:")
@@ -153,7 +174,7 @@ def demonstrate_memory_configuration():
     """Show different memory configuration options."""
 
     print("\n⚙️ Memory Configuration Options")
-    print("=" * 60)
+    print(RULE)
 
     # Example configurations
     configs = {
@@ -173,6 +194,16 @@ def demonstrate_memory_configuration():
             }
         },
 
+        "OpenAI Embeddings (256-dim)": {
+            "vector_store": {
+                "provider": "chroma",
+                "collection_name": "agent_memory_openai",
+                "persist_directory": "./chroma_db",
+                "embedding_model": "text-embedding-3-small",
+                "embedding_dimensions": 256
+            }
+        },
+
         "Memory Disabled": {
             "enable_persistence": False
         }
@@ -184,23 +215,25 @@ def demonstrate_memory_configuration():
 
     print("\nTo use custom configuration:")
     print("  memory_manager = get_memory_manager(config=custom_config)")
+    print("  memory_manager = get_memory_manager(embedding_model=\"all-MiniLM-L6-v2\")")
 
 
 if __name__ == "__main__":
-    # Check for required API key
-    if not os.getenv("OPENAI_API_KEY"):
-        print("❌ Error: OPENAI_API_KEY environment variable not set")
-        print("Please set your OpenAI API key in the .env file")
-        sys.exit(1)
+    require_openai_key()
 
     try:
+        # Open the vector store and embedding client in the background while the
+        # orchestrator is set up, so the first memory lookup is already warm
+        from src.memory import get_memory_manager
+        get_memory_manager(preload=True)
+
         demonstrate_memory_integration()
         demonstrate_memory_configuration()
 
     except ImportError as e:
         print(f"❌ Import Error: {e}")
         print("Please install required dependencies:")
-        print("  pip install chromadb langchain-community")
+        print("  pip install chromadb")
         sys.exit(1)
 
     except Exception as e:
@@ -5,27 +5,47 @@ This example demonstrates the meta-learning agent's ability to:
 - Learn new skills from few-shot examples
 - Adapt to novel tasks dynamically
 - Generalize knowledge across different domains
+
+Run from the repository root:
+    python -m examples.example6_meta_learning
 """
 
+import functools
+import io
+import sys
 import time
-from src.orchestrator import Orchestrator
-from src.agents.meta_learner import MetaLearningAgent
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, TextIO
+
+from examples._common import get_orchestrator, require_openai_key
+
+# Separator lines used by the demo output
+RULE = "=" * 50
+THIN_RULE = "-" * 40
 
 
-def demonstrate_meta_learning():
-    """Demonstrate meta-learning capabilities."""
-    print("🤖 AgentSpawn Meta-Learning Agent Demo")
-    print("=" * 50)
+def demonstrate_meta_learning(out: Optional[TextIO] = None):
+    """
+    Demonstrate meta-learning capabilities.
+
+    Args:
+        out: Stream to write the demo output to (default: stdout)
+    """
+    emit = functools.partial(print, file=out)
+    emit("🤖 AgentSpawn Meta-Learning Agent Demo")
+    emit(RULE)
 
     try:
+        from src.agents.meta_learner import MetaLearningAgent
+
         # Initialize meta-learning agent
-        print("Initializing Meta-Learning Agent...")
+        emit("Initializing Meta-Learning Agent...")
         meta_agent = MetaLearningAgent(model="gpt-4")
-        print("✅ Meta-Learning Agent initialized")
+        emit("✅ Meta-Learning Agent initialized")
 
         # Example 1: Learn a new skill - creative writing
-        print("\n📚 Example 1: Learning Creative Writing Skill")
-        print("-" * 40)
+        emit("\n📚 Example 1: Learning Creative Writing Skill")
+        emit(THIN_RULE)
 
         writing_examples = [
             {
@@ -34,7 +54,7 @@ def demonstrate_meta_learning():
             }
         ]
 
-        print("Learning from examples...")
+        emit("Learning from examples...")
         start_time = time.time()
         learn_result = meta_agent.learn_from_examples(
             "Write creative poetry in various forms",
@@ -42,92 +62,96 @@ def demonstrate_meta_learning():
         )
         learn_time = time.time() - start_time
 
-        print(f"✅ Learned skill: {learn_result['skill_id']} (took {learn_time:.1f}s)")
-        print(f"📝 System prompt generated for the skill")
+        emit(f"✅ Learned skill: {learn_result['skill_id']} (took {learn_time:.1f}s)")
+        emit(f"📝 System prompt generated for the skill")
 
         # Example 2: Adapt to a novel task using learned skills
-        print("\n🎯 Example 2: Adapting to Novel Task")
-        print("-" * 40)
+        emit("\n🎯 Example 2: Adapting to Novel Task")
+        emit(THIN_RULE)
 
         novel_task = "Write a haiku about technology"
-        print(f"Adapting to task: {novel_task}")
+        emit(f"Adapting to task: {novel_task}")
 
         start_time = time.time()
         adapt_result = meta_agent.adapt_to_task(novel_task)
         adapt_time = time.time() - start_time
 
-        print(f"Response (took {adapt_time:.1f}s): {adapt_result['response'][:200]}...")
+        emit(f"Response (took {adapt_time:.1f}s): {adapt_result['response'][:200]}...")
 
         # Show learned skills
-        print("\n📊 Learned Skills Summary")
-        print("-" * 40)
+        emit("\n📊 Learned Skills Summary")
+        emit(THIN_RULE)
         skills = meta_agent.get_learned_skills()
         for skill_id, skill_info in skills.items():
-            print(f"• {skill_id}: {skill_info['description']}")
+            emit(f"• {skill_id}: {skill_info['description']}")
 
-        print("\n✅ Meta-Learning demonstration completed successfully!")
+        emit("\n✅ Meta-Learning demonstration completed successfully!")
 
     except Exception as e:
-        print(f"❌ Error in meta-learning demonstration: {e}")
+        emit(f"❌ Error in meta-learning demonstration: {e}")
         import traceback
-        traceback.print_exc()
+        traceback.print_exc(file=out)
 
 
-def demonstrate_orchestrator_with_meta_learning():
-    """Demonstrate orchestrator using meta-learning for novel tasks."""
-    print("\n🎭 Example 4: Orchestrator with Meta-Learning")
-    print("-" * 40)
+def demonstrate_orchestrator_with_meta_learning(out: Optional[TextIO] = None):
+    """
+    Demonstrate orchestrator using meta-learning for novel tasks.
+
+    Args:
+        out: Stream to write the demo output to (default: stdout)
+    """
+    emit = functools.partial(print, file=out)
+    emit("\n🎭 Example 4: Orchestrator with Meta-Learning")
+    emit(THIN_RULE)
 
     try:
         # Disable memory to avoid checkpointer issues for demo
-        print("Initializing orchestrator...")
-        orchestrator = Orchestrator(model_name="gpt-4", enable_memory=False)
-        print("✅ Orchestrator initialized")
+        emit("Initializing orchestrator...")
+        orchestrator = get_orchestrator("gpt-4", enable_memory=False)
+        emit("✅ Orchestrator initialized")
 
         # Novel task that doesn't match existing agent keywords
         novel_task = "Design a simple board game about recycling"
 
-        print(f"Processing novel task: {novel_task}")
+        emit(f"Processing novel task: {novel_task}")
 
         start_time = time.time()
-        result = orchestrator.process_task(novel_task)
+        result = orchestrator.process_task(novel_task, preview_chars=300)
         process_time = time.time() - start_time
 
-        print(f"✅ Task processed (took {process_time:.1f}s)")
-        print(f"Complexity: {result['task_metadata'].complexity}")
-        print(f"Keywords: {result['task_metadata'].keywords}")
-        print(f"Requires multiple agents: {result['task_metadata'].requires_multiple_agents}")
-        print(f"Agents spawned: {[agent['agent_type'] for agent in result['spawned_agents']]}")
-        print(f"Response preview: {result['final_response'][:300]}...")
+        emit(f"✅ Task processed (took {process_time:.1f}s)")
+        emit(f"Complexity: {result['task_metadata'].complexity}")
+        emit(f"Keywords: {result['task_metadata'].keywords}")
+        emit(f"Requires multiple agents: {result['task_metadata'].requires_multiple_agents}")
+        emit(f"Agents spawned: {[agent['agent_type'] for agent in result['spawned_agents']]}")
+        emit(f"Response preview: {result['final_response'][:300]}...")
 
-        print("✅ Orchestrator demonstration completed successfully!")
+        emit("✅ Orchestrator demonstration completed successfully!")
 
     except Exception as e:
-        print(f"❌ Error in orchestrator demonstration: {e}")
+        emit(f"❌ Error in orchestrator demonstration: {e}")
         import traceback
-        traceback.print_exc()
+        traceback.print_exc(file=out)
 
 
 if __name__ == "__main__":
+    require_openai_key()
     print("Starting Meta-Learning Agent Demo...")
-    demonstrate_meta_learning()
-    demonstrate_orchestrator_with_meta_learning()
-
-    print("\n✨ Meta-Learning Demo Complete!")
-    print("\nKey Features Demonstrated:")
-    print("• Few-shot learning from examples")
-    print("• Dynamic skill acquisition")
-    print("• Task adaptation and generalization")
-    print("• Integration with orchestrator for novel tasks")
 
-
-if __name__ == "__main__":
-    demonstrate_meta_learning()
-    demonstrate_orchestrator_with_meta_learning()
-
-    print("\n✨ Meta-Learning Demo Complete!")
-    print("\nKey Features Demonstrated:")
-    print("• Few-shot learning from examples")
-    print("• Dynamic skill acquisition")
-    print("• Task adaptation and generalization")
-    print("• Integration with orchestrator for novel tasks")
\ No newline at end of file
+    # The two demos use separate agents and are independent LLM round-trips, so
+    # run them concurrently and print each demo's buffered output in order
+    demos = [demonstrate_meta_learning, demonstrate_orchestrator_with_meta_learning]
+    buffers = [io.StringIO() for _ in demos]
+    with ThreadPoolExecutor(max_workers=len(demos)) as executor:
+        list(executor.map(lambda demo, buffer: demo(out=buffer), demos, buffers))
+    for buffer in buffers:
+        sys.stdout.write(buffer.getvalue())
+
+    print("\n".join([
+        "\n✨ Meta-Learning Demo Complete!",
+        "\nKey Features Demonstrated:",
+        "• Few-shot learning from examples",
+        "• Dynamic skill acquisition",
+        "• Task adaptation and generalization",
+        "• Integration with orchestrator for novel tasks",
+    ]))
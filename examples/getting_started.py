@@ -2,115 +2,141 @@
 Getting Started Guide for AgentSpawn Framework
 
 This script demonstrates the key concepts and usage patterns of AgentSpawn.
+
+Run from the repository root:
+    python -m examples.getting_started
 """
 
-import sys
-import os
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from src.agent_registry import get_registry
+from src.utils import assess_task_complexity, detect_required_agents, extract_keywords
 
-from orchestrator import Orchestrator
-from agent_registry import get_registry
-from utils import assess_task_complexity, detect_required_agents, extract_keywords
-from state import ComplexityLevel
+# Separator lines used by the demo output
+RULE = "=" * 80
 
 
-def demo_complexity_assessment():
-    """Demonstrate task complexity assessment."""
-    print("\n" + "=" * 80)
-    print("DEMO 1: Task Complexity Assessment")
-    print("=" * 80)
-    
-    test_tasks = [
-        "What is the capital of France?",
-        "Write a Python function to calculate fibonacci numbers",
-        """Conduct a comprehensive market analysis including:
+# Tasks used by the demos
+COMPLEXITY_TASKS = [
+    "What is the capital of France?",
+    "Write a Python function to calculate fibonacci numbers",
+    """Conduct a comprehensive market analysis including:
            1. Competitor research and positioning
            2. Industry trend analysis
            3. Customer sentiment analysis
            4. Python implementation for market data aggregation"""
-    ]
+]
+
+DETECTION_TASKS = [
+    "Analyze our monthly sales data to identify trends",
+    "Research the history and future of artificial intelligence",
+    "Generate production-ready Python code for a REST API",
+    "Analyze customer data, research market trends, and generate API code"
+]
+
+WORKFLOW_TASK = "Research AI trends and generate Python code for ML"
+
+
+def _analyze_task(task):
+    """Extract keywords once and derive complexity and agents from them."""
+    keywords = extract_keywords(task)
+    return keywords, assess_task_complexity(task, keywords), detect_required_agents(task, keywords)
+
+
+# Each demo task analyzed once: task -> (keywords, complexity, agents)
+TASK_BANK = {
+    task: _analyze_task(task)
+    for task in COMPLEXITY_TASKS + DETECTION_TASKS + [WORKFLOW_TASK]
+}
+
+
+def demo_complexity_assessment():
+    """Demonstrate task complexity assessment."""
+    lines = []
+    lines.append("\n" + RULE)
+    lines.append("DEMO 1: Task Complexity Assessment")
+    lines.append(RULE)
+    
+    for task in COMPLEXITY_TASKS:
+        lines.append(f"\nTask: {task[:50]}...")
+        keywords, complexity, _ = TASK_BANK[task]
+        lines.append(f"Complexity: {complexity.value}")
+        lines.append(f"Keywords: {keywords[:5]}")
     
-    for task in test_tasks:
-        print(f"\nTask: {task[:50]}...")
-        keywords = extract_keywords(task)
-        complexity = assess_task_complexity(task, keywords)
-        print(f"Complexity: {complexity.value}")
-        print(f"Keywords: {keywords[:5]}")
+    print("\n".join(lines))
 
 
 def demo_agent_detection():
     """Demonstrate agent detection."""
-    print("\n" + "=" * 80)
-    print("DEMO 2: Agent Detection")
-    print("=" * 80)
+    lines = []
+    lines.append("\n" + RULE)
+    lines.append("DEMO 2: Agent Detection")
+    lines.append(RULE)
     
-    test_tasks = [
-        "Analyze our monthly sales data to identify trends",
-        "Research the history and future of artificial intelligence",
-        "Generate production-ready Python code for a REST API",
-        "Analyze customer data, research market trends, and generate API code"
-    ]
+    for task in DETECTION_TASKS:
+        lines.append(f"\nTask: {task[:50]}...")
+        _, _, agents = TASK_BANK[task]
+        lines.append(f"Detected Agents: {agents if agents else 'None (direct reasoning)'}")
     
-    for task in test_tasks:
-        print(f"\nTask: {task[:50]}...")
-        keywords = extract_keywords(task)
-        agents = detect_required_agents(task, keywords)
-        print(f"Detected Agents: {agents if agents else 'None (direct reasoning)'}")
+    print("\n".join(lines))
 
 
 def demo_registry():
     """Demonstrate agent registry."""
-    print("\n" + "=" * 80)
-    print("DEMO 3: Agent Registry")
-    print("=" * 80)
+    lines = []
+    lines.append("\n" + RULE)
+    lines.append("DEMO 3: Agent Registry")
+    lines.append(RULE)
     
     registry = get_registry()
     
-    print("\nRegistered Agents:")
+    lines.append("\nRegistered Agents:")
     for agent_type, config in registry.list_agents().items():
-        print(f"\n  {config.name}:")
-        print(f"    Type: {agent_type}")
-        print(f"    Description: {config.description}")
-        print(f"    Capabilities: {', '.join(config.capabilities[:3])}...")
+        lines.append(f"\n  {config.name}:")
+        lines.append(f"    Type: {agent_type}")
+        lines.append(f"    Description: {config.description}")
+        lines.append(f"    Capabilities: {', '.join(config.capabilities[:3])}...")
+    
+    print("\n".join(lines))
 
 
 def demo_orchestrator_workflow():
     """Demonstrate orchestrator workflow (requires API key)."""
-    print("\n" + "=" * 80)
-    print("DEMO 4: Orchestrator Workflow")
-    print("=" * 80)
-    
-    print("\n⚠️  This demo requires a valid OPENAI_API_KEY in .env")
-    print("The orchestrator processes tasks through this workflow:")
-    print("""
+    lines = []
+    lines.append("\n" + RULE)
+    lines.append("DEMO 4: Orchestrator Workflow")
+    lines.append(RULE)
+    
+    lines.append("\n⚠️  This demo requires a valid OPENAI_API_KEY in .env")
+    lines.append("The orchestrator processes tasks through this workflow:")
+    lines.append("""
     1. assess_complexity: Analyze task keywords and patterns
     2. decide_agents: Determine which agents to spawn
     3. spawn_agents: Create and execute specialized agents
     4. aggregate_results: Combine agent outputs into final response
     """)
     
-    print("\nExample workflow:")
-    task = "Research AI trends and generate Python code for ML"
-    keywords = extract_keywords(task)
-    complexity = assess_task_complexity(task, keywords)
-    agents = detect_required_agents(task, keywords)
+    lines.append("\nExample workflow:")
+    task = WORKFLOW_TASK
+    _, complexity, agents = TASK_BANK[task]
     
-    print(f"  Input: {task}")
-    print(f"  → Complexity: {complexity.value}")
-    print(f"  → Agents to spawn: {agents}")
-    print(f"  → Final Response: [synthesized from agent results]")
+    lines.append(f"  Input: {task}")
+    lines.append(f"  → Complexity: {complexity.value}")
+    lines.append(f"  → Agents to spawn: {agents}")
+    lines.append(f"  → Final Response: [synthesized from agent results]")
+    
+    print("\n".join(lines))
 
 
 def demo_state_management():
     """Demonstrate state management."""
-    print("\n" + "=" * 80)
-    print("DEMO 5: State Management")
-    print("=" * 80)
+    lines = []
+    lines.append("\n" + RULE)
+    lines.append("DEMO 5: State Management")
+    lines.append(RULE)
     
-    from state import OrchestratorState, TaskMetadata, SpawnedAgent, AgentType
-    from utils import generate_agent_id
+    from src.state import OrchestratorState, TaskMetadata, SpawnedAgent, AgentType
+    from src.utils import generate_agent_id
     
-    print("\nCreating orchestrator state...")
+    lines.append("\nCreating orchestrator state...")
     
     # Create metadata
     metadata = TaskMetadata(
@@ -120,8 +146,8 @@ def demo_state_management():
     
     # Create initial state
     state = OrchestratorState(task_metadata=metadata)
-    print(f"  Task ID: {state.task_metadata.task_id}")
-    print(f"  Initial Status: {state.workflow_status}")
+    lines.append(f"  Task ID: {state.task_metadata.task_id}")
+    lines.append(f"  Initial Status: {state.workflow_status}")
     
     # Spawn agents
     for i, agent_type in enumerate(["data_analyst", "researcher"], 1):
@@ -131,27 +157,31 @@ def demo_state_management():
         )
         state.add_agent(agent)
     
-    print(f"  Spawned Agents: {len(state.spawned_agents)}")
+    lines.append(f"  Spawned Agents: {len(state.spawned_agents)}")
     
     # Update results
     for i, agent in enumerate(state.spawned_agents):
         state.update_agent_result(agent.agent_id, f"Result from {agent.agent_type.value}", "completed")
     
-    print(f"  Completed: {len(state.spawned_agent_results)}")
-    print(f"  Final Status: {state.workflow_status}")
+    lines.append(f"  Completed: {len(state.spawned_agent_results)}")
+    lines.append(f"  Final Status: {state.workflow_status}")
+    
+    print("\n".join(lines))
 
 
 def main():
     """Run all demonstrations."""
-    print("=" * 80)
-    print("AgentSpawn Framework - Getting Started Guide")
-    print("=" * 80)
-    print("\nThis guide demonstrates the core concepts of AgentSpawn:")
-    print("1. Task Complexity Assessment")
-    print("2. Agent Detection")
-    print("3. Agent Registry")
-    print("4. Orchestrator Workflow")
-    print("5. State Management")
+    print("\n".join([
+        RULE,
+        "AgentSpawn Framework - Getting Started Guide",
+        RULE,
+        "\nThis guide demonstrates the core concepts of AgentSpawn:",
+        "1. Task Complexity Assessment",
+        "2. Agent Detection",
+        "3. Agent Registry",
+        "4. Orchestrator Workflow",
+        "5. State Management",
+    ]))
     
     try:
         demo_complexity_assessment()
@@ -178,15 +208,17 @@ def main():
     except Exception as e:
         print(f"Error in demo 5: {e}")
     
-    print("\n" + "=" * 80)
-    print("Getting Started Complete!")
-    print("=" * 80)
-    print("\nNext Steps:")
-    print("1. Set up .env file with your OPENAI_API_KEY")
-    print("2. Run examples: python examples/example1_simple_task.py")
-    print("3. Review test suite: python -m pytest tests/")
-    print("4. Read full documentation: README.md")
-    print("\n")
+    print("\n".join([
+        "\n" + RULE,
+        "Getting Started Complete!",
+        RULE,
+        "\nNext Steps:",
+        "1. Set up .env file with your OPENAI_API_KEY",
+        "2. Run examples: python -m examples.example1_simple_task",
+        "3. Review test suite: python -m pytest tests/",
+        "4. Read full documentation: README.md",
+        "\n",
+    ]))
 
 
 if __name__ == "__main__":
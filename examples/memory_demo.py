@@ -6,18 +6,22 @@ AgentSpawn Framework - Memory System Demonstration
 This script demonstrates the persistent memory functionality without requiring
 OpenAI API calls. It shows how the memory system stores and retrieves conversation
 context using both ChromaDB (vector) and LangGraph (workflow state) memory providers.
-"""
 
-import sys
-import os
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+Run from the repository root:
+    python -m examples.memory_demo
+"""
 
+from examples._common import preview
 from src.memory import get_memory_manager, MemoryEntry, ConversationContext
 
+# Separator lines used by the demo output
+RULE = "=" * 50
+
+
 def demonstrate_memory_system():
     """Demonstrate the memory system functionality."""
     print("🧠 AgentSpawn Framework - Memory System Demo")
-    print("=" * 50)
+    print(RULE)
 
     # Initialize memory manager
     print("\n1. Initializing Memory Manager...")
@@ -39,36 +43,40 @@ def demonstrate_memory_system():
     # Store some memory entries
     print("\n4. Storing Memory Entries...")
 
-    # Memory entry 1: User preference
-    entry1 = MemoryEntry(
-        id=f"memory_{thread_id}_pref_001",
-        content="User prefers detailed technical explanations with code examples",
-        metadata={"type": "user_preference", "topic": "communication_style", "thread_id": thread_id},
-        memory_type="conversation"
-    )
-    memory_manager.store_memory(entry1)
+    entries = [
+        # Memory entry 1: User preference
+        MemoryEntry(
+            id=f"memory_{thread_id}_pref_001",
+            content="User prefers detailed technical explanations with code examples",
+            metadata={"type": "user_preference", "topic": "communication_style", "thread_id": thread_id},
+            memory_type="conversation"
+        ),
+        # Memory entry 2: Previous task context
+        MemoryEntry(
+            id=f"memory_{thread_id}_task_001",
+            content="User was working on data analysis project involving sales data and customer segmentation",
+            metadata={"type": "task_context", "topic": "data_analysis", "thread_id": thread_id},
+            memory_type="conversation"
+        ),
+        # Memory entry 3: Technical discussion
+        MemoryEntry(
+            id=f"memory_{thread_id}_tech_001",
+            content="Discussed implementing persistent memory using ChromaDB and LangGraph checkpointer",
+            metadata={"type": "technical_discussion", "topic": "memory_system", "thread_id": thread_id},
+            memory_type="conversation"
+        ),
+    ]
+
+    # Store all three entries with a single provider write
+    memory_manager.store_memories_batch(entries)
     print("✅ Stored user preference memory")
-
-    # Memory entry 2: Previous task context
-    entry2 = MemoryEntry(
-        id=f"memory_{thread_id}_task_001",
-        content="User was working on data analysis project involving sales data and customer segmentation",
-        metadata={"type": "task_context", "topic": "data_analysis", "thread_id": thread_id},
-        memory_type="conversation"
-    )
-    memory_manager.store_memory(entry2)
     print("✅ Stored task context memory")
-
-    # Memory entry 3: Technical discussion
-    entry3 = MemoryEntry(
-        id=f"memory_{thread_id}_tech_001",
-        content="Discussed implementing persistent memory using ChromaDB and LangGraph checkpointer",
-        metadata={"type": "technical_discussion", "topic": "memory_system", "thread_id": thread_id},
-        memory_type="conversation"
-    )
-    memory_manager.store_memory(entry3)
     print("✅ Stored technical discussion memory")
 
+    # Load the thread's recent memories into the context so later searches stay in-process
+    window_size = memory_manager.prefill_window(context, top_k=32)
+    print(f"✅ Prefilled memory window with {window_size} entries")
+
     # Retrieve memories
     print("\n5. Retrieving Memories...")
 
@@ -78,7 +86,7 @@ def demonstrate_memory_system():
 
     print("\n   Memory Contents:")
     for i, memory in enumerate(memories, 1):
-        print(f"   {i}. [{memory.metadata.get('type', 'unknown')}] {memory.content[:80]}...")
+        print(f"   {i}. [{memory.metadata.get('type', 'unknown')}] {preview(memory.content)}")
 
     # Test semantic search (if vector provider available)
     print("\n6. Testing Semantic Search...")
@@ -86,7 +94,7 @@ def demonstrate_memory_system():
         search_results = memory_manager.search_memories("data analysis", thread_id=thread_id, limit=5)
         print(f"✅ Vector search found {len(search_results)} relevant memories")
         if search_results:
-            print("   Top result:", search_results[0].content[:100] + "...")
+            print("   Top result:", preview(search_results[0].content, 100))
     else:
         print("⚠️ Vector search unavailable (ChromaDB not installed)")
 
@@ -113,6 +121,9 @@ def demonstrate_memory_system():
     else:
         print("⚠️ Could not retrieve conversation context (expected with LangGraph-only setup)")
 
+    # Write any buffered workflow checkpoints in one pass
+    memory_manager.flush_checkpoints()
+
     # Test memory management
     print("\n8. Memory Management...")
     print("✅ Memory system operational")
@@ -132,7 +143,7 @@ def demonstrate_memory_system():
     print("\nTo use with full orchestrator functionality:")
     print("1. Set OPENAI_API_KEY environment variable")
     print("2. Install chromadb: pip install chromadb")
-    print("3. Run examples/example5_memory_integration.py")
+    print("3. Run python -m examples.example5_memory_integration")
 
 if __name__ == "__main__":
     demonstrate_memory_system()
\ No newline at end of file
@@ -2,12 +2,12 @@
 AgentSpawn framework initialization.
 
 Main entry point for the AgentSpawn framework.
+
+Public names are imported on first access, so importing a submodule such as
+src.agents.researcher does not pull in the orchestrator and LangGraph.
 """
 
-from .orchestrator import Orchestrator
-from .agent_registry import get_registry, AgentRegistry
-from .state import OrchestratorState, TaskMetadata, SpawnedAgent
-from .memory import get_memory_manager, MemoryManager, MemoryEntry, ConversationContext
+import importlib
 
 __version__ = "0.1.0"
 __all__ = [
@@ -20,5 +20,34 @@ __all__ = [
     "get_memory_manager",
     "MemoryManager",
     "MemoryEntry",
-    "ConversationContext"
+    "ConversationContext",
+    "MemoryQuery"
 ]
+
+# Public name -> submodule that defines it
+_LAZY_IMPORTS = {
+    "Orchestrator": ".orchestrator",
+    "get_registry": ".agent_registry",
+    "AgentRegistry": ".agent_registry",
+    "OrchestratorState": ".state",
+    "TaskMetadata": ".state",
+    "SpawnedAgent": ".state",
+    "get_memory_manager": ".memory",
+    "MemoryManager": ".memory",
+    "MemoryEntry": ".memory",
+    "ConversationContext": ".memory",
+    "MemoryQuery": ".memory",
+}
+
+
+def __getattr__(name):
+    """Import public names lazily on first access."""
+    if name not in _LAZY_IMPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY_IMPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
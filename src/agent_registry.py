@@ -4,48 +4,41 @@ Agent registry system for AgentSpawn framework.
 Manages agent templates, configurations, and factory methods for creating agents.
 """
 
-from typing import Dict, Any, List
+import sys
+import threading
+from types import MappingProxyType
+from typing import Dict, Any, Iterator, List, Mapping, Optional, Tuple
 from dataclasses import dataclass
 from .state import AgentType
 
+# __slots__ generation for dataclasses needs Python 3.10+
+_DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
 
-@dataclass
+
+@dataclass(frozen=True, **_DATACLASS_SLOTS)
 class AgentConfig:
-    """Configuration for an agent type."""
+    """Configuration for an agent type (immutable, so configs can be shared)."""
     agent_type: AgentType
     name: str
     description: str
     system_prompt: str
-    capabilities: List[str]
+    capabilities: Tuple[str, ...]
     max_retries: int = 3
     timeout: int = 30
+    
+    def __post_init__(self):
+        # Accept any sequence of capabilities but store an immutable tuple
+        if not isinstance(self.capabilities, tuple):
+            object.__setattr__(self, "capabilities", tuple(self.capabilities))
 
 
-class AgentRegistry:
-    """
-    Registry for managing agent templates and configurations.
-    
-    This system allows for:
-    - Registering new agent types
-    - Retrieving agent configurations
-    - Factory methods for agent creation
-    - Agent capability discovery
-    """
-    
-    def __init__(self):
-        """Initialize the registry with default agents."""
-        self._agents: Dict[str, AgentConfig] = {}
-        self._initialize_default_agents()
-    
-    def _initialize_default_agents(self) -> None:
-        """Initialize the framework with three default agent types."""
-        
-        # Data Analyst Agent
-        data_analyst_config = AgentConfig(
-            agent_type=AgentType.DATA_ANALYST,
-            name="Data Analyst",
-            description="Specializes in data analysis, statistics, and insights extraction",
-            system_prompt="""You are an expert data analyst with deep knowledge of statistics, data visualization,
+# Default agent configurations, built once and shared read-only by every registry
+_DEFAULT_AGENTS: Mapping[str, AgentConfig] = MappingProxyType({
+    AgentType.DATA_ANALYST.value: AgentConfig(
+        agent_type=AgentType.DATA_ANALYST,
+        name="Data Analyst",
+        description="Specializes in data analysis, statistics, and insights extraction",
+        system_prompt="""You are an expert data analyst with deep knowledge of statistics, data visualization,
 and business intelligence. You excel at:
 - Identifying patterns and trends in data
 - Performing statistical analysis
@@ -53,23 +46,20 @@ and business intelligence. You excel at:
 - Recommending data-driven decisions
 
 Always provide quantitative backing for your claims and consider multiple perspectives.""",
-            capabilities=[
-                "statistical_analysis",
-                "data_aggregation",
-                "trend_identification",
-                "metric_calculation",
-                "anomaly_detection",
-                "forecasting"
-            ]
+        capabilities=(
+            "statistical_analysis",
+            "data_aggregation",
+            "trend_identification",
+            "metric_calculation",
+            "anomaly_detection",
+            "forecasting",
         )
-        self.register_agent(data_analyst_config)
-        
-        # Researcher Agent
-        researcher_config = AgentConfig(
-            agent_type=AgentType.RESEARCHER,
-            name="Research Specialist",
-            description="Conducts comprehensive research, gathers information, and provides context",
-            system_prompt="""You are a thorough research specialist with expertise in:
+    ),
+    AgentType.RESEARCHER.value: AgentConfig(
+        agent_type=AgentType.RESEARCHER,
+        name="Research Specialist",
+        description="Conducts comprehensive research, gathers information, and provides context",
+        system_prompt="""You are a thorough research specialist with expertise in:
 - Information gathering and synthesis
 - Literature review and source evaluation
 - Contextual analysis
@@ -77,23 +67,20 @@ Always provide quantitative backing for your claims and consider multiple perspe
 
 Always cite sources, acknowledge limitations, and provide comprehensive background information.
 Consider multiple viewpoints and present balanced analysis.""",
-            capabilities=[
-                "information_gathering",
-                "source_evaluation",
-                "literature_review",
-                "context_analysis",
-                "comparative_analysis",
-                "hypothesis_formation"
-            ]
+        capabilities=(
+            "information_gathering",
+            "source_evaluation",
+            "literature_review",
+            "context_analysis",
+            "comparative_analysis",
+            "hypothesis_formation",
         )
-        self.register_agent(researcher_config)
-        
-        # Code Generator Agent
-        code_generator_config = AgentConfig(
-            agent_type=AgentType.CODE_GENERATOR,
-            name="Code Generator",
-            description="Generates code, provides implementation guidance, and engineering solutions",
-            system_prompt="""You are an expert software engineer with proficiency in multiple languages.
+    ),
+    AgentType.CODE_GENERATOR.value: AgentConfig(
+        agent_type=AgentType.CODE_GENERATOR,
+        name="Code Generator",
+        description="Generates code, provides implementation guidance, and engineering solutions",
+        system_prompt="""You are an expert software engineer with proficiency in multiple languages.
 You excel at:
 - Writing clean, maintainable code
 - Implementing algorithms efficiently
@@ -102,23 +89,20 @@ You excel at:
 
 Always prioritize code quality, readability, and performance. Include comments and docstrings.
 Consider edge cases and error handling.""",
-            capabilities=[
-                "code_generation",
-                "algorithm_implementation",
-                "architecture_design",
-                "debugging",
-                "optimization",
-                "documentation_generation"
-            ]
+        capabilities=(
+            "code_generation",
+            "algorithm_implementation",
+            "architecture_design",
+            "debugging",
+            "optimization",
+            "documentation_generation",
         )
-        self.register_agent(code_generator_config)
-        
-        # Meta-Learning Agent
-        meta_learner_config = AgentConfig(
-            agent_type=AgentType.META_LEARNER,
-            name="Meta-Learning Agent",
-            description="Dynamically learns new skills and adapts to novel tasks using few-shot learning",
-            system_prompt="""You are a meta-learning agent capable of:
+    ),
+    AgentType.META_LEARNER.value: AgentConfig(
+        agent_type=AgentType.META_LEARNER,
+        name="Meta-Learning Agent",
+        description="Dynamically learns new skills and adapts to novel tasks using few-shot learning",
+        system_prompt="""You are a meta-learning agent capable of:
 - Learning new skills from examples
 - Adapting to novel tasks and domains
 - Generalizing knowledge across different contexts
@@ -131,16 +115,50 @@ You excel at:
 - Knowledge transfer and generalization
 
 Always be flexible, learn quickly, and adapt your approach based on the task requirements.""",
-            capabilities=[
-                "few_shot_learning",
-                "skill_acquisition",
-                "task_adaptation",
-                "dynamic_prompting",
-                "generalization",
-                "meta_learning"
-            ]
+        capabilities=(
+            "few_shot_learning",
+            "skill_acquisition",
+            "task_adaptation",
+            "dynamic_prompting",
+            "generalization",
+            "meta_learning",
         )
-        self.register_agent(meta_learner_config)
+    ),
+})
+
+
+def _index_capabilities(agents: Mapping[str, AgentConfig]) -> Dict[str, Tuple[str, ...]]:
+    """Map each capability to the agent types that have it, in registration order."""
+    index: Dict[str, List[str]] = {}
+    for agent_type, config in agents.items():
+        for capability in config.capabilities:
+            agent_types = index.setdefault(capability, [])
+            if agent_type not in agent_types:
+                agent_types.append(agent_type)
+    return {capability: tuple(agent_types) for capability, agent_types in index.items()}
+
+
+_DEFAULT_AGENTS_BY_CAPABILITY: Mapping[str, Tuple[str, ...]] = MappingProxyType(
+    _index_capabilities(_DEFAULT_AGENTS)
+)
+
+
+class AgentRegistry:
+    """
+    Registry for managing agent templates and configurations.
+    
+    This system allows for:
+    - Registering new agent types
+    - Retrieving agent configurations
+    - Factory methods for agent creation
+    - Agent capability discovery
+    """
+    
+    def __init__(self):
+        """Initialize the registry with default agents."""
+        # Shared read-only defaults; copied on the first register_agent call
+        self._agents: Mapping[str, AgentConfig] = _DEFAULT_AGENTS
+        self._by_capability: Mapping[str, Tuple[str, ...]] = _DEFAULT_AGENTS_BY_CAPABILITY
     
     def register_agent(self, config: AgentConfig) -> None:
         """
@@ -149,7 +167,11 @@ Always be flexible, learn quickly, and adapt your approach based on the task req
         Args:
             config: AgentConfig instance
         """
+        if self._agents is _DEFAULT_AGENTS:
+            self._agents = dict(_DEFAULT_AGENTS)
         self._agents[config.agent_type.value] = config
+        # Rebuild the reverse index so replaced configs drop their old capabilities
+        self._by_capability = _index_capabilities(self._agents)
     
     def get_agent_config(self, agent_type: str) -> AgentConfig:
         """
@@ -168,16 +190,18 @@ Always be flexible, learn quickly, and adapt your approach based on the task req
             raise ValueError(f"Agent type '{agent_type}' not found in registry")
         return self._agents[agent_type]
     
-    def list_agents(self) -> Dict[str, AgentConfig]:
+    def list_agents(self) -> Mapping[str, AgentConfig]:
         """
         Get all registered agents.
         
         Returns:
-            Dictionary of all registered agent configurations
+            Read-only view of all registered agent configurations
         """
-        return self._agents.copy()
+        if isinstance(self._agents, MappingProxyType):
+            return self._agents
+        return MappingProxyType(self._agents)
     
-    def get_agent_capabilities(self, agent_type: str) -> List[str]:
+    def get_agent_capabilities(self, agent_type: str) -> Tuple[str, ...]:
         """
         Get capabilities for a specific agent type.
         
@@ -185,7 +209,7 @@ Always be flexible, learn quickly, and adapt your approach based on the task req
             agent_type: The agent type identifier
             
         Returns:
-            List of agent capabilities
+            Tuple of agent capabilities
         """
         config = self.get_agent_config(agent_type)
         return config.capabilities
@@ -212,11 +236,19 @@ Always be flexible, learn quickly, and adapt your approach based on the task req
         Returns:
             List of agent type identifiers with this capability
         """
-        matching_agents = []
-        for agent_type, config in self._agents.items():
-            if capability in config.capabilities:
-                matching_agents.append(agent_type)
-        return matching_agents
+        return list(self._by_capability.get(capability, ()))
+    
+    def iter_agents_by_capability(self, capability: str) -> Iterator[str]:
+        """
+        Iterate over agents that have a specific capability without building a list.
+        
+        Args:
+            capability: The capability to search for
+            
+        Returns:
+            Iterator over agent type identifiers with this capability
+        """
+        yield from self._by_capability.get(capability, ())
     
     def get_agent_instance(self, agent_type: str) -> Any:
         """
@@ -245,23 +277,32 @@ Always be flexible, learn quickly, and adapt your approach based on the task req
 
 
 # Global registry instance
-_global_registry: AgentRegistry = None
+_global_registry: Optional[AgentRegistry] = None
+_global_registry_lock = threading.Lock()
 
 
 def get_registry() -> AgentRegistry:
     """
     Get the global agent registry instance (singleton pattern).
     
+    Thread-safe: concurrent first calls build a single registry, and later calls
+    return it without taking the lock.
+    
     Returns:
         The global AgentRegistry instance
     """
     global _global_registry
-    if _global_registry is None:
-        _global_registry = AgentRegistry()
-    return _global_registry
+    registry = _global_registry
+    if registry is None:
+        with _global_registry_lock:
+            if _global_registry is None:
+                _global_registry = AgentRegistry()
+            registry = _global_registry
+    return registry
 
 
 def reset_registry() -> None:
     """Reset the global registry (useful for testing)."""
     global _global_registry
-    _global_registry = None
+    with _global_registry_lock:
+        _global_registry = None
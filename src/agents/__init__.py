@@ -2,14 +2,34 @@
 AgentSpawn agents module.
 
 Contains implementations of specialized agents for various tasks.
+Agent classes are imported on first access so each agent only loads its own
+dependencies.
 """
 
-from .data_analyst import DataAnalystAgent
-from .researcher import ResearcherAgent
-from .code_generator import CodeGeneratorAgent
+import importlib
 
 __all__ = [
     "DataAnalystAgent",
     "ResearcherAgent",
     "CodeGeneratorAgent"
 ]
+
+# Public name -> submodule that defines it
+_LAZY_IMPORTS = {
+    "DataAnalystAgent": ".data_analyst",
+    "ResearcherAgent": ".researcher",
+    "CodeGeneratorAgent": ".code_generator",
+}
+
+
+def __getattr__(name):
+    """Import agent classes lazily on first access."""
+    if name not in _LAZY_IMPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY_IMPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
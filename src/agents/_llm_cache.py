@@ -0,0 +1,247 @@
+"""
+Response cache shared by the specialized agents.
+
+Agents send fixed system prompts plus a task-specific prompt, so identical
+requests (the same task, language, or metrics) can reuse an earlier response
+instead of repeating the LLM round-trip. Callers can also opt into a semantic
+tier that reuses the response to a near-identical earlier prompt.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from langchain_core.messages import BaseMessage, SystemMessage, HumanMessage
+
+
+# Maximum number of cached responses (least recently used are evicted first)
+CACHE_SIZE = 512
+
+# Prompts whose embeddings have at least this cosine similarity share a response
+SEMANTIC_THRESHOLD = float(os.getenv("AGENTSPAWN_SEMANTIC_CACHE_THRESHOLD", "0.95"))
+SEMANTIC_EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+
+_responses: "OrderedDict[Tuple[Any, ...], str]" = OrderedDict()
+_responses_lock = threading.Lock()
+
+# Semantic tier: (model, sampling, endpoint, system prompt) -> (prompt embeddings, responses)
+_semantic_entries: Dict[Tuple[Any, ...], Tuple[List[Any], List[str]]] = {}
+
+
+@lru_cache(maxsize=64)
+def system_message(content: str) -> SystemMessage:
+    """Get a shared SystemMessage for a system prompt (agents reuse a handful of prompts)."""
+    return SystemMessage(content=content)
+
+
+@lru_cache(maxsize=64)
+def _cacheable_system_message(content: str) -> SystemMessage:
+    """Get a shared SystemMessage marked as a prompt-cache breakpoint (Anthropic models)."""
+    return SystemMessage(content=[_cache_breakpoint(content)])
+
+
+def _cache_breakpoint(text: str) -> Dict[str, Any]:
+    """A text content part marked as the end of a cacheable prefix."""
+    return {"type": "text", "text": text, "cache_control": {"type": "ephemeral"}}
+
+
+def prompt_messages(llm, system_prompt: str, prompt: str, suffix: Optional[str] = None) -> List[BaseMessage]:
+    """
+    Build the message list for a request: the fixed system prompt first, the task last.
+
+    Keeping the static system prompt as an unchanged prefix lets OpenAI cache it
+    automatically; Anthropic models (e.g. via OpenRouter) only cache prefixes
+    that carry an explicit cache_control marker, so it is added for them.
+
+    Args:
+        llm: Chat model the messages are for
+        system_prompt: System message content
+        prompt: User message content
+        suffix: Per-request content (such as tool output) sent as a separate, final
+            user message, so it does not break the cacheable prefix before it
+
+    Returns:
+        The system and user messages
+    """
+    model_name = str(getattr(llm, "model_name", "") or "").lower()
+    marked = "anthropic/" in model_name or model_name.startswith("claude")
+    system = _cacheable_system_message(system_prompt) if marked else system_message(system_prompt)
+    if suffix is None:
+        return [system, HumanMessage(content=prompt)]
+
+    task = HumanMessage(content=[_cache_breakpoint(prompt)] if marked else prompt)
+    return [system, task, HumanMessage(content=suffix)]
+
+
+def _cache_key(llm, system_prompt: str, prompt: str, suffix: Optional[str] = None) -> Tuple[Any, ...]:
+    """Key a request by everything that changes the response: model, sampling, endpoint and prompts."""
+    return (
+        getattr(llm, "model_name", None),
+        getattr(llm, "temperature", None),
+        getattr(llm, "openai_api_base", None),
+        system_prompt,
+        prompt if suffix is None else (prompt, suffix),
+    )
+
+
+@lru_cache(maxsize=1)
+def _semantic_embedder() -> Optional[Callable[[str], Any]]:
+    """
+    Load the prompt embedding model, or None when it is unavailable.
+    
+    A failed load (sentence-transformers not installed, model download blocked or a
+    broken model cache) is cached like a missing package, so it is not retried on
+    every call and callers fall back to their non-semantic path.
+    """
+    try:
+        from sentence_transformers import SentenceTransformer
+        model = SentenceTransformer(SEMANTIC_EMBEDDING_MODEL)
+    except ImportError:
+        return None
+    except Exception as e:
+        print(f"Semantic embedding model unavailable: {e}")
+        return None
+    return lambda text: model.encode(text, normalize_embeddings=True)
+
+
+def _semantic_lookup(partition: Tuple[Any, ...], embedding: Any) -> Optional[str]:
+    """Find the cached response whose prompt is most similar to the embedding, if close enough."""
+    import numpy as np
+
+    with _responses_lock:
+        vectors, contents = _semantic_entries.get(partition, ([], []))
+        if not vectors:
+            return None
+        similarities = np.asarray(vectors) @ np.asarray(embedding)
+        best = int(np.argmax(similarities))
+        return contents[best] if similarities[best] >= SEMANTIC_THRESHOLD else None
+
+
+def invoke_cached(llm, system_prompt: str, prompt: str, semantic: bool = False,
+                  suffix: Optional[str] = None) -> str:
+    """
+    Invoke an LLM with a system and user prompt, reusing cached responses.
+
+    Args:
+        llm: Chat model to call on a cache miss
+        system_prompt: System message content
+        prompt: User message content
+        semantic: Also reuse the response to a near-identical earlier prompt
+            (needs sentence-transformers; only for prompts whose answer does not
+            hinge on small details such as exact numbers; never applied with a suffix)
+        suffix: Per-request content sent as a separate, final user message
+
+    Returns:
+        The response content
+    """
+    key = _cache_key(llm, system_prompt, prompt, suffix)
+    with _responses_lock:
+        if key in _responses:
+            _responses.move_to_end(key)
+            return _responses[key]
+
+    embed = _semantic_embedder() if semantic and suffix is None else None
+    if embed is not None:
+        try:
+            partition, embedding = key[:-1], embed(prompt)
+            content = _semantic_lookup(partition, embedding)
+        except Exception as e:
+            # The semantic tier is an optimization: an embedding failure is a cache miss
+            print(f"Semantic cache lookup failed: {e}")
+            embed, content = None, None
+        if content is not None:
+            return content
+
+    response = llm.invoke(prompt_messages(llm, system_prompt, prompt, suffix))
+
+    with _responses_lock:
+        _responses[key] = response.content
+        if len(_responses) > CACHE_SIZE:
+            _responses.popitem(last=False)
+        if embed is not None:
+            vectors, contents = _semantic_entries.setdefault(partition, ([], []))
+            vectors.append(embedding)
+            contents.append(response.content)
+            if len(vectors) > CACHE_SIZE:
+                del vectors[0], contents[0]
+    return response.content
+
+
+def invoke_cached_batch(llm, requests: Sequence[Tuple[str, str]], max_concurrency: int = 8) -> List[str]:
+    """
+    Invoke an LLM for several (system prompt, prompt) pairs, sending cache misses concurrently.
+
+    Args:
+        llm: Chat model to call on cache misses
+        requests: (system_prompt, prompt) pairs
+        max_concurrency: Maximum number of requests in flight at once
+
+    Returns:
+        Response contents in request order
+    """
+    keys = [_cache_key(llm, system_prompt, prompt) for system_prompt, prompt in requests]
+    with _responses_lock:
+        cached = {key: _responses[key] for key in keys if key in _responses}
+
+    # Identical requests within the batch are sent once
+    missing = {}
+    for key, (system_prompt, prompt) in zip(keys, requests):
+        if key not in cached and key not in missing:
+            missing[key] = prompt_messages(llm, system_prompt, prompt)
+
+    if missing:
+        responses = llm.batch(list(missing.values()), config={"max_concurrency": max_concurrency})
+        fetched = {key: response.content for key, response in zip(missing, responses)}
+        with _responses_lock:
+            for key, content in fetched.items():
+                _responses[key] = content
+            while len(_responses) > CACHE_SIZE:
+                _responses.popitem(last=False)
+        cached.update(fetched)
+
+    return [cached[key] for key in keys]
+
+
+def stream_cached(llm, system_prompt: str, prompt: str, suffix: Optional[str] = None) -> Iterator[str]:
+    """
+    Stream an LLM response as it is generated, reusing cached responses.
+
+    A cached response is yielded as a single chunk. A streamed response is cached
+    once it has been received in full (not when the caller stops early).
+
+    Args:
+        llm: Chat model to stream from on a cache miss
+        system_prompt: System message content
+        prompt: User message content
+        suffix: Per-request content sent as a separate, final user message
+
+    Yields:
+        Response content chunks
+    """
+    key = _cache_key(llm, system_prompt, prompt, suffix)
+    with _responses_lock:
+        cached = _responses.get(key)
+        if cached is not None:
+            _responses.move_to_end(key)
+    if cached is not None:
+        yield cached
+        return
+
+    chunks = []
+    for chunk in llm.stream(prompt_messages(llm, system_prompt, prompt, suffix)):
+        chunks.append(chunk.content)
+        yield chunk.content
+
+    with _responses_lock:
+        _responses[key] = "".join(chunks)
+        if len(_responses) > CACHE_SIZE:
+            _responses.popitem(last=False)
+
+
+def clear_llm_cache() -> None:
+    """Drop all cached agent responses."""
+    with _responses_lock:
+        _responses.clear()
+        _semantic_entries.clear()
@@ -0,0 +1,48 @@
+"""
+Chat model clients shared by agents and the orchestrator.
+
+Each ChatOpenAI client owns its HTTP connection pool, so agents spawned with the
+same model and temperature reuse one warm client instead of building their own.
+"""
+
+import os
+from functools import lru_cache
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from langchain_openai import ChatOpenAI
+
+
+OPENROUTER_API_BASE = "https://openrouter.ai/api/v1"
+
+
+@lru_cache(maxsize=32)
+def _cached_chat_llm(model: str, temperature: float, openrouter_api_key: Optional[str]) -> "ChatOpenAI":
+    """Build a client; the OpenRouter key is part of the cache key so a changed key gets a new client."""
+    # Imported on first use: langchain_openai pulls in openai, httpx and tiktoken
+    from langchain_openai import ChatOpenAI
+
+    if openrouter_api_key:
+        return ChatOpenAI(
+            model=model,
+            temperature=temperature,
+            api_key=openrouter_api_key,
+            base_url=OPENROUTER_API_BASE
+        )
+    return ChatOpenAI(model=model, temperature=temperature)
+
+
+def get_chat_llm(model: str, temperature: float) -> "ChatOpenAI":
+    """
+    Get the shared chat model client for a model and temperature.
+
+    Uses OpenRouter when OPENROUTER_API_KEY is set, otherwise OpenAI.
+
+    Args:
+        model: LLM model to use
+        temperature: Sampling temperature
+
+    Returns:
+        A ChatOpenAI client shared with every other caller using the same settings
+    """
+    return _cached_chat_llm(model, temperature, os.getenv("OPENROUTER_API_KEY"))
@@ -4,10 +4,48 @@ Code Generator Agent implementation.
 Specialized agent for code generation, implementation guidance, and engineering solutions.
 """
 
-from typing import Dict, Any, List
-from langchain_openai import ChatOpenAI
-from langchain_core.messages import SystemMessage, HumanMessage
-import os
+from functools import lru_cache
+from typing import Dict, Any, Iterator, List, Tuple
+
+from ._llm_cache import invoke_cached, invoke_cached_batch, stream_cached
+from ._llm_pool import get_chat_llm
+
+
+# System prompts are built once per language and reused, so repeated requests
+# share identical prompt strings (and cached SystemMessage objects)
+_ARCHITECTURE_SYSTEM_PROMPT = """You are an expert software architect.
+Provide clear, practical architectural guidance."""
+
+
+@lru_cache(maxsize=16)
+def _codegen_system_prompt(language: str) -> str:
+    """System prompt for generate_code."""
+    return f"""You are an expert software engineer proficient in {language}.
+You excel at:
+- Writing clean, production-ready code
+- Following best practices and design patterns
+- Creating well-documented, maintainable solutions
+- Considering edge cases and error handling
+
+Generate code that is:
+1. Correct and efficient
+2. Well-commented with docstrings
+3. Following {language} conventions
+4. Robust with error handling"""
+
+
+@lru_cache(maxsize=16)
+def _algorithm_system_prompt(language: str) -> str:
+    """System prompt for implement_algorithm."""
+    return f"""You are an expert in algorithms and data structures.
+Implement efficient algorithms in {language}."""
+
+
+@lru_cache(maxsize=16)
+def _optimization_system_prompt(language: str) -> str:
+    """System prompt for optimize_code."""
+    return f"""You are an expert {language} developer specializing in code optimization.
+Analyze and improve code for performance, readability, and maintainability."""
 
 
 class CodeGeneratorAgent:
@@ -31,16 +69,8 @@ class CodeGeneratorAgent:
         """
         self.model = model
         
-        # Check for OpenRouter API key first, fallback to OpenAI
-        if os.getenv("OPENROUTER_API_KEY"):
-            self.llm = ChatOpenAI(
-                model=model,
-                temperature=0.3,
-                openai_api_key=os.getenv("OPENROUTER_API_KEY"),
-                openai_api_base="https://openrouter.ai/api/v1"
-            )
-        else:
-            self.llm = ChatOpenAI(model=model, temperature=0.3)
+        # Shared client (OpenRouter when OPENROUTER_API_KEY is set, otherwise OpenAI)
+        self.llm = get_chat_llm(model, 0.3)
     
     def generate_code(self, requirement: str, language: str = "python") -> Dict[str, Any]:
         """
@@ -53,18 +83,43 @@ class CodeGeneratorAgent:
         Returns:
             Dictionary containing generated code and metadata
         """
-        system_prompt = f"""You are an expert software engineer proficient in {language}.
-You excel at:
-- Writing clean, production-ready code
-- Following best practices and design patterns
-- Creating well-documented, maintainable solutions
-- Considering edge cases and error handling
-
-Generate code that is:
-1. Correct and efficient
-2. Well-commented with docstrings
-3. Following {language} conventions
-4. Robust with error handling"""
+        content = invoke_cached(self.llm, *self._generation_prompts(requirement, language))
+        return self._generation_result(content, language)
+    
+    def generate_code_stream(self, requirement: str, language: str = "python") -> Iterator[str]:
+        """
+        Generate code like generate_code, yielding it as it is generated.
+        
+        Args:
+            requirement: Code requirement description
+            language: Programming language (python, javascript, etc.)
+            
+        Yields:
+            Generated code chunks
+        """
+        yield from stream_cached(self.llm, *self._generation_prompts(requirement, language))
+    
+    def batch_generate(self, requirements: List[str], language: str = "python") -> List[Dict[str, Any]]:
+        """
+        Generate code for several requirements with concurrent LLM requests.
+        
+        Args:
+            requirements: Code requirement descriptions
+            language: Programming language (python, javascript, etc.)
+            
+        Returns:
+            One generate_code-style result per requirement, in order
+        """
+        contents = invoke_cached_batch(
+            self.llm,
+            [self._generation_prompts(requirement, language) for requirement in requirements]
+        )
+        return [self._generation_result(content, language) for content in contents]
+    
+    @staticmethod
+    def _generation_prompts(requirement: str, language: str) -> Tuple[str, str]:
+        """Build the (system prompt, prompt) pair for a code generation request."""
+        system_prompt = _codegen_system_prompt(language)
         
         prompt = f"""Generate {language} code for the following requirement:
 
@@ -77,16 +132,14 @@ Include:
 4. Usage example (if applicable)
 5. Any necessary imports or dependencies"""
         
-        messages = [
-            SystemMessage(content=system_prompt),
-            HumanMessage(content=prompt)
-        ]
-        
-        response = self.llm.invoke(messages)
-        
+        return system_prompt, prompt
+    
+    @staticmethod
+    def _generation_result(content: str, language: str) -> Dict[str, Any]:
+        """Wrap generated code in the result dictionary returned to callers."""
         return {
             "status": "completed",
-            "code": response.content,
+            "code": content,
             "agent_type": "code_generator",
             "language": language
         }
@@ -102,8 +155,7 @@ Include:
         Returns:
             Implemented algorithm code
         """
-        system_prompt = f"""You are an expert in algorithms and data structures.
-Implement efficient algorithms in {language}."""
+        system_prompt = _algorithm_system_prompt(language)
         
         prompt = f"""Implement the following algorithm in {language}:
 
@@ -116,13 +168,7 @@ Provide:
 4. Edge case handling
 5. Optimization notes"""
         
-        messages = [
-            SystemMessage(content=system_prompt),
-            HumanMessage(content=prompt)
-        ]
-        
-        response = self.llm.invoke(messages)
-        return response.content
+        return invoke_cached(self.llm, system_prompt, prompt)
     
     def provide_architecture_guidance(self, problem: str) -> str:
         """
@@ -134,8 +180,7 @@ Provide:
         Returns:
             Architecture recommendation
         """
-        system_prompt = """You are an expert software architect.
-Provide clear, practical architectural guidance."""
+        system_prompt = _ARCHITECTURE_SYSTEM_PROMPT
         
         prompt = f"""Provide architectural guidance for the following problem:
 
@@ -148,13 +193,7 @@ Cover:
 4. Scalability considerations
 5. Potential challenges and solutions"""
         
-        messages = [
-            SystemMessage(content=system_prompt),
-            HumanMessage(content=prompt)
-        ]
-        
-        response = self.llm.invoke(messages)
-        return response.content
+        return invoke_cached(self.llm, system_prompt, prompt)
     
     def optimize_code(self, code: str, language: str = "python") -> str:
         """
@@ -167,8 +206,7 @@ Cover:
         Returns:
             Optimized code with explanation
         """
-        system_prompt = f"""You are an expert {language} developer specializing in code optimization.
-Analyze and improve code for performance, readability, and maintainability."""
+        system_prompt = _optimization_system_prompt(language)
         
         prompt = f"""Optimize the following {language} code:
 
@@ -183,10 +221,4 @@ Provide:
 4. Any best practices applied
 5. Trade-offs and considerations"""
         
-        messages = [
-            SystemMessage(content=system_prompt),
-            HumanMessage(content=prompt)
-        ]
-        
-        response = self.llm.invoke(messages)
-        return response.content
+        return invoke_cached(self.llm, system_prompt, prompt)
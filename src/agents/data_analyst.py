@@ -4,16 +4,94 @@ Data Analyst Agent implementation.
 Specialized agent for data analysis, statistical insights, and metric computation.
 """
 
-from typing import Dict, Any, List
-from langchain_openai import ChatOpenAI
-from langchain_core.messages import SystemMessage, HumanMessage
-import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Callable, Dict, Any, Iterator, List, Optional, Sequence, Tuple
+import io
+import json
 import os
+import re
+import time
 
-from ..tool_registry import get_tool_registry
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+from ._llm_cache import _semantic_embedder, invoke_cached, invoke_cached_batch, stream_cached
+from ._llm_pool import get_chat_llm
+from ..tool_registry import ToolResult, get_tool_registry
 from ..state import ToolUsage
 
 
+def _json_text(value: Any) -> str:
+    """Render a tool result as indented JSON, with orjson when installed."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(value, default=str, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode("utf-8")
+    return json.dumps(value, indent=2, ensure_ascii=False, default=str)
+
+
+# Fixed system prompts, built once and shared by every request
+_ANALYST_SYSTEM_PROMPT = """You are an expert data analyst with deep expertise in:
+- Statistical analysis and hypothesis testing
+- Data visualization and storytelling
+- Business metrics and KPIs
+- Trend analysis and forecasting
+
+You have access to various tools for data processing and analysis.
+Provide detailed, data-driven insights with specific metrics and conclusions.
+Always consider multiple perspectives and potential biases in the data."""
+
+_INSIGHTS_SYSTEM_PROMPT = """You are a business intelligence expert. Analyze the provided metrics
+and generate actionable insights for stakeholders.
+
+Focus on:
+1. Key performance indicators
+2. Areas of concern
+3. Opportunities for improvement
+4. Recommended actions"""
+
+# Task keywords that trigger each tool, as (keywords, tool method name) in result order
+_TOOL_TRIGGERS = (
+    (("query", "database", "sql", "data"), "_use_database_tool"),
+    (("calculate", "compute", "analyze", "python"), "_use_code_execution_tool"),
+    (("research", "search", "find", "latest"), "_use_web_search_tool"),
+)
+
+# What each tool is for; a keyword-triggered tool only runs when the task is about this
+_TOOL_INTENTS = {
+    "_use_database_tool": "Query records stored in a SQL database table",
+    "_use_code_execution_tool": "Calculate or compute numbers by running Python code",
+    "_use_web_search_tool": "Search the web for the latest information on a topic",
+}
+
+# Minimum cosine similarity between a task and a tool's intent for a keyword-triggered
+# tool to run. Unset (the default) runs every triggered tool without loading a model.
+_tool_relevance_setting = os.getenv("AGENTSPAWN_TOOL_RELEVANCE_THRESHOLD")
+TOOL_RELEVANCE_THRESHOLD = float(_tool_relevance_setting) if _tool_relevance_setting else None
+
+# All trigger keywords in one pattern, so a task is scanned once. The lookahead makes
+# overlapping keywords ("calculatest") all match; each keyword group is a named group.
+_TOOL_TRIGGER_PATTERN = re.compile("(?=" + "|".join(
+    f"(?P<tool{index}>{'|'.join(map(re.escape, keywords))})"
+    for index, (keywords, _) in enumerate(_TOOL_TRIGGERS)
+) + ")")
+
+
+@lru_cache(maxsize=1)
+def _tool_intent_embeddings() -> Optional[Dict[str, Any]]:
+    """Embed each tool's intent once, or None when the embedding model is unavailable."""
+    embed = _semantic_embedder()
+    if embed is None:
+        return None
+    try:
+        return {method: embed(intent) for method, intent in _TOOL_INTENTS.items()}
+    except Exception as e:
+        print(f"Tool intent embedding failed: {e}")
+        return None
+
+
 class DataAnalystAgent:
     """
     Agent specialized in data analysis tasks.
@@ -36,96 +114,102 @@ class DataAnalystAgent:
         """
         self.model = model
         
-        # Check for OpenRouter API key first, fallback to OpenAI
-        if os.getenv("OPENROUTER_API_KEY"):
-            self.llm = ChatOpenAI(
-                model=model,
-                temperature=0.5,
-                openai_api_key=os.getenv("OPENROUTER_API_KEY"),
-                openai_api_base="https://openrouter.ai/api/v1"
-            )
-        else:
-            self.llm = ChatOpenAI(model=model, temperature=0.5)
+        # Shared client (OpenRouter when OPENROUTER_API_KEY is set, otherwise OpenAI)
+        self.llm = get_chat_llm(model, 0.5)
         
         self.tool_registry = get_tool_registry()
         self.agent_id = f"data_analyst_{id(self)}"
 
-    def analyze(self, task: str, data_context: str = "", tool_usage: List[ToolUsage] = None, memory_context: str = "") -> Dict[str, Any]:
+    def analyze(self, task: str, data_context: str = "", *, tool_usage: Optional[List[ToolUsage]] = None,
+                memory_context: str = "") -> Dict[str, Any]:
         """
-        Perform data analysis on the given task with memory context.
+        Perform data analysis on the given task, using tools the task calls for.
 
         Args:
             task: The analysis task
             data_context: Additional data or context
-            tool_usage: List to track tool usage
+            tool_usage: List to track tool usage; tools run for this task are appended
             memory_context: Previous conversation context from memory
 
         Returns:
             Dictionary containing analysis results
         """
-        tool_usage = tool_usage or []
+        system_prompt, full_task, tool_results = self._prepare_analysis(task, data_context, tool_usage, memory_context)
 
-        # Check if we need to use tools for this task
-        tool_results = self._use_tools_if_needed(task, tool_usage)
-
-        system_prompt = """You are an expert data analyst with deep expertise in:
-- Statistical analysis and hypothesis testing
-- Data visualization and storytelling
-- Business metrics and KPIs
-- Trend analysis and forecasting
-
-You have access to various tools for data processing and analysis.
-Provide detailed, data-driven insights with specific metrics and conclusions.
-Always consider multiple perspectives and potential biases in the data."""
-
-        full_task = task
-        if data_context:
-            full_task += f"\n\nData Context:\n{data_context}"
-        
-        if memory_context:
-            full_task += f"\n\nPrevious Conversation Context:\n{memory_context}"
+        # Tool output is data-dependent, so it travels after the cacheable prompt prefix
+        # and only tool-free prompts may match semantically
+        content = invoke_cached(
+            self.llm, system_prompt, full_task, semantic=True, suffix=self._tool_results_message(tool_results)
+        )
+        return self._analysis_result(content, tool_results)
 
-        if tool_results:
-            full_task += f"\n\nTool Results:\n{self._format_tool_results(tool_results)}"
+    def analyze_stream(self, task: str, data_context: str = "", *,
+                       tool_usage: Optional[List[ToolUsage]] = None, memory_context: str = "") -> Iterator[str]:
+        """
+        Perform data analysis like analyze, yielding the analysis text as it is generated.
 
-        messages = [
-            SystemMessage(content=system_prompt),
-            HumanMessage(content=full_task)
-        ]
+        Tools the task calls for run before the first chunk is yielded.
 
-        response = self.llm.invoke(messages)
+        Args:
+            task: The analysis task
+            data_context: Additional data or context
+            tool_usage: List to track tool usage; tools run for this task are appended
+            memory_context: Previous conversation context from memory
 
-        return {
-            "status": "completed",
-            "analysis": response.content,
-            "agent_type": "data_analyst",
-            "tools_used": [usage.tool_name for usage in tool_usage],
-            "tool_usage": tool_usage
-        }
+        Yields:
+            Analysis text chunks
+        """
+        system_prompt, full_task, tool_results = self._prepare_analysis(task, data_context, tool_usage, memory_context)
+        yield from stream_cached(self.llm, system_prompt, full_task, self._tool_results_message(tool_results))
 
-    def _use_tools_if_needed(self, task: str, tool_usage: List[ToolUsage]) -> List[ToolUsage]:
-        """Determine if tools are needed and use them."""
-        results = []
+    def _prepare_analysis(self, task: str, data_context: str, tool_usage: Optional[List[ToolUsage]],
+                          memory_context: str) -> Tuple[str, str, List[ToolUsage]]:
+        """Run the tools a task calls for and build its (system prompt, prompt, tool results)."""
+        if tool_usage is None:
+            tool_usage = []
 
-        # Check for database queries
-        if any(keyword in task.lower() for keyword in ["query", "database", "sql", "data"]):
-            db_result = self._use_database_tool(task)
-            if db_result:
-                results.append(db_result)
+        # Check if we need to use tools for this task
+        tool_results = self._use_tools_if_needed(task, tool_usage)
+        tool_usage.extend(tool_results)
 
-        # Check for code execution needs
-        if any(keyword in task.lower() for keyword in ["calculate", "compute", "analyze", "python"]):
-            code_result = self._use_code_execution_tool(task)
-            if code_result:
-                results.append(code_result)
+        system_prompt, full_task = self._analysis_prompts(task, data_context, memory_context)
+        return system_prompt, full_task, tool_results
 
-        # Check for web search needs
-        if any(keyword in task.lower() for keyword in ["research", "search", "find", "latest"]):
-            search_result = self._use_web_search_tool(task)
-            if search_result:
-                results.append(search_result)
+    def _tool_results_message(self, tool_results: List[ToolUsage]) -> Optional[str]:
+        """The message carrying tool output after the analysis prompt, or None without tool results."""
+        if not tool_results:
+            return None
+        return f"Tool Results:\n{self._format_tool_results(tool_results)}"
 
-        return results
+    def _use_tools_if_needed(self, task: str, tool_usage: List[ToolUsage]) -> List[ToolUsage]:
+        """Determine if tools are needed and use them (independent tools run concurrently)."""
+        triggered = {match.lastgroup for match in _TOOL_TRIGGER_PATTERN.finditer(task.lower())}
+        methods = [method for index, (_, method) in enumerate(_TOOL_TRIGGERS) if f"tool{index}" in triggered]
+        if not methods:
+            return []
+
+        # Keywords alone over-trigger ("data", "analyze"), so when a relevance threshold is
+        # configured each tool is confirmed against the task's meaning before paying for a
+        # query, subprocess or web request (without a usable model, keywords decide)
+        intents = _tool_intent_embeddings() if TOOL_RELEVANCE_THRESHOLD is not None else None
+        if intents is not None:
+            try:
+                task_embedding = _semantic_embedder()(task)
+                methods = [
+                    method for method in methods
+                    if float(intents[method] @ task_embedding) >= TOOL_RELEVANCE_THRESHOLD
+                ]
+            except Exception as e:
+                print(f"Tool relevance check failed: {e}")
+            if not methods:
+                return []
+
+        tools = [getattr(self, method) for method in methods]
+
+        # Results are collected in trigger order so prompts built from them stay stable
+        with ThreadPoolExecutor(max_workers=len(tools)) as executor:
+            futures = [executor.submit(tool, task) for tool in tools]
+            return [result for result in (future.result() for future in futures) if result]
 
     def _use_database_tool(self, task: str) -> ToolUsage:
         """Use database tool if available."""
@@ -135,35 +219,9 @@ Always consider multiple perspectives and potential biases in the data."""
 
         # Extract potential SQL query from task
         # This is a simplified implementation - in practice, you'd use LLM to extract queries
-        start_time = time.time()
-
-        try:
-            # For demo purposes, use a simple query
-            result = db_tool.execute("SELECT * FROM sqlite_master LIMIT 5", "SELECT")
-            execution_time = time.time() - start_time
-
-            tool_usage = ToolUsage(
-                tool_name="database_query",
-                agent_id=self.agent_id,
-                parameters={"query": "SELECT * FROM sqlite_master LIMIT 5"},
-                result=result.data,
-                success=result.success,
-                error=result.error,
-                execution_time=execution_time
-            )
-
-            return tool_usage
-
-        except Exception as e:
-            execution_time = time.time() - start_time
-            return ToolUsage(
-                tool_name="database_query",
-                agent_id=self.agent_id,
-                parameters={"query": "SELECT * FROM sqlite_master LIMIT 5"},
-                success=False,
-                error=str(e),
-                execution_time=execution_time
-            )
+        # For demo purposes, use a simple query
+        query = "SELECT * FROM sqlite_master LIMIT 5"
+        return self._run_tool("database_query", {"query": query}, lambda: db_tool.execute(query, "SELECT"))
 
     def _use_code_execution_tool(self, task: str) -> ToolUsage:
         """Use code execution tool if available."""
@@ -181,34 +239,11 @@ std = np.std(data)
 print(f"Mean: {mean}, Std: {std}")
 """
 
-        start_time = time.time()
-
-        try:
-            result = code_tool.execute(code, "python")
-            execution_time = time.time() - start_time
-
-            tool_usage = ToolUsage(
-                tool_name="code_execution",
-                agent_id=self.agent_id,
-                parameters={"code": code[:50] + "...", "language": "python"},
-                result=result.data,
-                success=result.success,
-                error=result.error,
-                execution_time=execution_time
-            )
-
-            return tool_usage
-
-        except Exception as e:
-            execution_time = time.time() - start_time
-            return ToolUsage(
-                tool_name="code_execution",
-                agent_id=self.agent_id,
-                parameters={"code": code[:50] + "...", "language": "python"},
-                success=False,
-                error=str(e),
-                execution_time=execution_time
-            )
+        return self._run_tool(
+            "code_execution",
+            {"code": code[:50] + "...", "language": "python"},
+            lambda: code_tool.execute(code, "python")
+        )
 
     def _use_web_search_tool(self, task: str) -> ToolUsage:
         """Use web search tool if available."""
@@ -219,86 +254,91 @@ print(f"Mean: {mean}, Std: {std}")
         # Extract search query from task
         query = task.replace("research", "").replace("search for", "").strip()[:100]
 
-        start_time = time.time()
+        return self._run_tool(
+            "web_search",
+            {"query": query, "num_results": 3},
+            lambda: search_tool.execute(query=query, num_results=3)
+        )
 
+    def _run_tool(self, tool_name: str, parameters: Dict[str, Any], execute: Callable[[], ToolResult]) -> ToolUsage:
+        """Run a tool call and record it, timed with the monotonic clock; exceptions become failed usage."""
+        start_time = time.perf_counter()
         try:
-            result = search_tool.execute(query=query, num_results=3)
-            execution_time = time.time() - start_time
-
-            tool_usage = ToolUsage(
-                tool_name="web_search",
-                agent_id=self.agent_id,
-                parameters={"query": query, "num_results": 3},
-                result=result.data,
-                success=result.success,
-                error=result.error,
-                execution_time=execution_time
-            )
-
-            return tool_usage
-
+            result = execute()
         except Exception as e:
-            execution_time = time.time() - start_time
-            return ToolUsage(
-                tool_name="web_search",
-                agent_id=self.agent_id,
-                parameters={"query": query, "num_results": 3},
-                success=False,
-                error=str(e),
-                execution_time=execution_time
-            )
+            data, success, error = None, False, str(e)
+        else:
+            data, success, error = result.data, result.success, result.error
+
+        return ToolUsage(
+            tool_name=tool_name,
+            agent_id=self.agent_id,
+            parameters=parameters,
+            result=data,
+            success=success,
+            error=error,
+            execution_time=time.perf_counter() - start_time
+        )
 
     def _format_tool_results(self, tool_usage: List[ToolUsage]) -> str:
-        """Format tool results for inclusion in prompts."""
-        formatted = []
+        """Format tool results for inclusion in prompts; structured results are rendered as JSON."""
+        # Lines are streamed into one buffer, so large results are not held as a list of strings
+        buffer = io.StringIO()
+        write = buffer.write
         for usage in tool_usage:
             if usage.success and usage.result:
-                formatted.append(f"Tool: {usage.tool_name}")
-                if isinstance(usage.result, dict):
-                    for key, value in usage.result.items():
-                        formatted.append(f"  {key}: {value}")
+                write(f"Tool: {usage.tool_name}\n")
+                if isinstance(usage.result, (dict, list)):
+                    write(_json_text(usage.result))
+                    write("\n")
                 else:
-                    formatted.append(f"  Result: {usage.result}")
+                    write(f"  Result: {usage.result}\n")
             else:
-                formatted.append(f"Tool: {usage.tool_name} - Failed: {usage.error}")
+                write(f"Tool: {usage.tool_name} - Failed: {usage.error}\n")
 
-        return "\n".join(formatted)
+        # Drop the final line break
+        return buffer.getvalue()[:-1]
     
-    def analyze(self, task: str, data_context: str = "") -> Dict[str, Any]:
+    def batch_analyze(self, tasks: List[str], data_context: str = "") -> List[Dict[str, Any]]:
         """
-        Perform data analysis on the given task.
+        Analyze several tasks with concurrent LLM requests.
         
         Args:
-            task: The analysis task
-            data_context: Additional data or context
+            tasks: The analysis tasks
+            data_context: Additional data or context shared by all tasks
             
         Returns:
-            Dictionary containing analysis results
+            One analyze-style result per task, in order
         """
-        system_prompt = """You are an expert data analyst with deep expertise in:
-- Statistical analysis and hypothesis testing
-- Data visualization and storytelling
-- Business metrics and KPIs
-- Trend analysis and forecasting
-
-Provide detailed, data-driven insights with specific metrics and conclusions.
-Always consider multiple perspectives and potential biases in the data."""
+        contents = invoke_cached_batch(
+            self.llm,
+            [self._analysis_prompts(task, data_context) for task in tasks]
+        )
+        return [self._analysis_result(content) for content in contents]
+    
+    @staticmethod
+    def _analysis_prompts(task: str, data_context: str, memory_context: str = "") -> Tuple[str, str]:
+        """Build the (system prompt, prompt) pair for an analysis request."""
+        system_prompt = _ANALYST_SYSTEM_PROMPT
         
         full_task = task
         if data_context:
             full_task += f"\n\nData Context:\n{data_context}"
         
-        messages = [
-            SystemMessage(content=system_prompt),
-            HumanMessage(content=full_task)
-        ]
-        
-        response = self.llm.invoke(messages)
+        if memory_context:
+            full_task += f"\n\nPrevious Conversation Context:\n{memory_context}"
         
+        return system_prompt, full_task
+    
+    @staticmethod
+    def _analysis_result(content: str, tool_usage: Sequence[ToolUsage] = ()) -> Dict[str, Any]:
+        """Wrap an analysis in the result dictionary returned to callers."""
         return {
             "status": "completed",
-            "analysis": response.content,
-            "agent_type": "data_analyst"
+            "analysis": content,
+            "agent_type": "data_analyst",
+            "tools_used": [usage.tool_name for usage in tool_usage],
+            "tool_usage": list(tool_usage)
         }
     
     def generate_insights(self, metrics: Dict[str, float]) -> str:
@@ -313,23 +353,8 @@ Always consider multiple perspectives and potential biases in the data."""
         """
         metrics_str = "\n".join([f"- {k}: {v}" for k, v in metrics.items()])
         
-        system_prompt = """You are a business intelligence expert. Analyze the provided metrics
-and generate actionable insights for stakeholders."""
-        
-        prompt = f"""Analyze these metrics and provide business insights:
-
-{metrics_str}
-
-Focus on:
-1. Key performance indicators
-2. Areas of concern
-3. Opportunities for improvement
-4. Recommended actions"""
+        system_prompt = _INSIGHTS_SYSTEM_PROMPT
         
-        messages = [
-            SystemMessage(content=system_prompt),
-            HumanMessage(content=prompt)
-        ]
+        prompt = f"Analyze these metrics and provide business insights:\n\n{metrics_str}"
         
-        response = self.llm.invoke(messages)
-        return response.content
+        return invoke_cached(self.llm, system_prompt, prompt)
@@ -5,24 +5,71 @@ Specialized agent for dynamic skill acquisition and adaptation to novel tasks.
 Uses few-shot learning and meta-learning techniques to learn new capabilities on-the-fly.
 """
 
-from typing import Dict, Any, List, Optional
-from langchain_openai import ChatOpenAI
-from langchain_core.messages import SystemMessage, HumanMessage
-import os
+import importlib.util
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Tuple
 
-try:
+import numpy as np
+
+from ._llm_cache import _semantic_embedder, prompt_messages
+from ._llm_pool import get_chat_llm
+
+# torch takes seconds to import, so importing this module only checks that it is installed;
+# it is imported by the first agent that actually meta-learns
+META_LEARNING_AVAILABLE = all(
+    importlib.util.find_spec(name) is not None for name in ("learn2learn", "torch")
+)
+
+
+# Fixed system prompts, kept byte-identical across calls so providers can cache them
+# (the fixed instructions live here too, so each request only adds the task itself)
+_PROMPT_WRITER_SYSTEM_PROMPT = """You are an expert at creating AI system prompts for various tasks.
+
+Based on the task and examples you are given, create a system prompt for an AI agent that can perform this task.
+Create a comprehensive system prompt that enables an AI to:
+1. Understand the task requirements
+2. Apply the patterns shown in examples
+3. Generalize to similar but unseen cases
+4. Provide high-quality, accurate responses"""
+
+_TASK_ANALYST_SYSTEM_PROMPT = """You are a task analysis expert.
+
+Analyze the task you are given and provide:
+1. Domain/category
+2. Required skills or knowledge
+3. Complexity level (simple, moderate, complex)
+4. Potential approaches
+5. Success criteria"""
+
+# Minimum cosine similarity between a task and a skill description for the skill to apply
+SKILL_SIMILARITY_THRESHOLD = 0.6
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+
+def _word_set(text: str) -> frozenset:
+    """Lowercased words of a text, for keyword matching between tasks and skills."""
+    return frozenset(_WORD_PATTERN.findall(text.lower()))
+
+
+@lru_cache(maxsize=1)
+def _meta_learning_modules() -> Tuple[Any, Any, Any, type]:
+    """
+    Import learn2learn and torch, and define the meta model on top of them (first call only).
+
+    Returns:
+        (learn2learn, torch, torch.nn, SimpleMetaModel)
+
+    Raises:
+        ImportError: If learn2learn or torch cannot be imported
+    """
     import learn2learn as l2l
     import torch
     import torch.nn as nn
-    META_LEARNING_AVAILABLE = True
-except ImportError:
-    l2l = None
-    torch = None
-    nn = None
-    META_LEARNING_AVAILABLE = False
 
-
-if META_LEARNING_AVAILABLE:
     class SimpleMetaModel(nn.Module):
         """Simple neural network for meta-learning demonstrations."""
 
@@ -38,8 +85,8 @@ if META_LEARNING_AVAILABLE:
 
         def forward(self, x):
             return self.net(x)
-else:
-    SimpleMetaModel = None
+
+    return l2l, torch, nn, SimpleMetaModel
 
 
 class MetaLearningAgent:
@@ -54,26 +101,42 @@ class MetaLearningAgent:
     - On-the-fly capability expansion
     """
 
-    def __init__(self, model: str = "gpt-4", meta_learning_enabled: bool = True):
+    def __init__(self, model: str = "gpt-4", meta_learning_enabled: bool = True, compile_model: bool = False):
         """
         Initialize the Meta-Learning Agent.
 
         Args:
             model: LLM model to use
             meta_learning_enabled: Whether to use neural meta-learning
+            compile_model: Compile the meta model's layers with torch.compile (PyTorch 2+),
+                trading a one-off compilation for faster adaptation steps
         """
         self.model = model
-        self.llm = ChatOpenAI(
-            model=model,
-            temperature=0.5,
-            api_key=os.getenv("OPENROUTER_API_KEY") or os.getenv("OPENAI_API_KEY"),
-            base_url="https://openrouter.ai/api/v1" if os.getenv("OPENROUTER_API_KEY") else None
-        )
+        self.llm = get_chat_llm(model, 0.5)
         self.learned_skills: Dict[str, Dict[str, Any]] = {}
+        # Guards learned_skills so skills can be learned and used from several threads
+        self._skills_lock = threading.Lock()
+        # Normalized description embeddings, one row per skill id (when sentence-transformers is installed)
+        self._skill_ids: List[str] = []
+        self._skill_embeddings: Optional[np.ndarray] = None
+        # Description words per skill id, for matching without sentence-transformers
+        self._skill_words: Dict[str, frozenset] = {}
         self.meta_learning_enabled = meta_learning_enabled and META_LEARNING_AVAILABLE
 
         if self.meta_learning_enabled:
-            self.meta_model = l2l.algorithms.MAML(SimpleMetaModel(), lr=0.01)
+            try:
+                l2l, torch, _, SimpleMetaModel = _meta_learning_modules()
+            except ImportError:
+                self.meta_learning_enabled = False
+
+        if self.meta_learning_enabled:
+            self.device = "cuda" if torch.cuda.is_available() else "cpu"
+            network = SimpleMetaModel().to(self.device)
+            if compile_model and hasattr(torch, "compile"):
+                # Only the layer stack is compiled, so MAML can still clone and update the
+                # module's parameters; shapes are fixed, so no dynamic-shape kernels are needed
+                network.net = torch.compile(network.net, dynamic=False)
+            self.meta_model = l2l.algorithms.MAML(network, lr=0.01)
             self.adaptation_steps = 5
         else:
             self.meta_model = None
@@ -92,17 +155,27 @@ class MetaLearningAgent:
         # Create few-shot prompt
         few_shot_prompt = self._create_few_shot_prompt(task_description, examples)
 
-        # Generate system prompt for the new skill
-        skill_prompt = self._generate_skill_prompt(task_description, few_shot_prompt)
+        # Embed the description locally while the skill prompt is generated remotely
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            embedding_future = executor.submit(self._embed_description, task_description)
+            skill_prompt = self._generate_skill_prompt(task_description, few_shot_prompt)
+            embedding = embedding_future.result()
 
         # Store the learned skill
-        skill_id = f"learned_{len(self.learned_skills)}"
-        self.learned_skills[skill_id] = {
-            "description": task_description,
-            "system_prompt": skill_prompt,
-            "examples": examples,
-            "created_at": "now"
-        }
+        with self._skills_lock:
+            skill_id = f"learned_{len(self.learned_skills)}"
+            self.learned_skills[skill_id] = {
+                "description": task_description,
+                "system_prompt": skill_prompt,
+                "examples": examples,
+                "created_at": "now"
+            }
+            self._skill_words[skill_id] = _word_set(task_description)
+            self._drop_skill_embedding(skill_id)
+            if embedding is not None:
+                self._skill_ids.append(skill_id)
+                rows = [embedding] if self._skill_embeddings is None else [self._skill_embeddings, embedding[None, :]]
+                self._skill_embeddings = np.vstack(rows)
 
         return {
             "status": "learned",
@@ -122,30 +195,54 @@ class MetaLearningAgent:
         Returns:
             Adapted response for the task
         """
+        system_prompt, used_learned_skill = self._adaptation_prompt(task)
+
+        # Execute the task
+        messages = prompt_messages(self.llm, system_prompt, task)
+
+        response = self.llm.invoke(messages)
+
+        return self._adaptation_result(response.content, used_learned_skill)
+
+    def batch_adapt_to_tasks(self, tasks: List[str], max_concurrency: int = 8) -> List[Dict[str, Any]]:
+        """
+        Adapt to several tasks with concurrent LLM requests.
+
+        Args:
+            tasks: The task descriptions
+            max_concurrency: Maximum number of requests in flight at once
+
+        Returns:
+            One adapt_to_task-style result per task, in order
+        """
+        prompts = [self._adaptation_prompt(task) for task in tasks]
+        responses = self.llm.batch(
+            [prompt_messages(self.llm, system_prompt, task) for task, (system_prompt, _) in zip(tasks, prompts)],
+            config={"max_concurrency": max_concurrency}
+        )
+        return [
+            self._adaptation_result(response.content, used_learned_skill)
+            for response, (_, used_learned_skill) in zip(responses, prompts)
+        ]
+
+    def _adaptation_prompt(self, task: str) -> Tuple[str, bool]:
+        """Pick the system prompt for a task: the best matching learned skill, else an adaptive prompt."""
         # Find relevant learned skills
         relevant_skills = self._find_relevant_skills(task)
 
         if relevant_skills:
             # Use existing learned skills
-            skill = relevant_skills[0]
-            system_prompt = skill["system_prompt"]
-            used_learned_skill = True
-        else:
-            # Generate new approach without full task analysis
-            system_prompt = self._generate_adaptive_prompt(task)
-            used_learned_skill = False
+            return relevant_skills[0]["system_prompt"], True
 
-        # Execute the task
-        messages = [
-            SystemMessage(content=system_prompt),
-            HumanMessage(content=task)
-        ]
-
-        response = self.llm.invoke(messages)
+        # Generate new approach without full task analysis
+        return self._generate_adaptive_prompt(task), False
 
+    @staticmethod
+    def _adaptation_result(content: str, used_learned_skill: bool) -> Dict[str, Any]:
+        """Wrap an adapted response in the result dictionary returned to callers."""
         return {
             "status": "completed",
-            "response": response.content,
+            "response": content,
             "used_learned_skill": used_learned_skill,
             "agent_type": "meta_learner"
         }
@@ -158,16 +255,21 @@ class MetaLearningAgent:
             tasks: List of task descriptions and examples
             adaptation_data: Neural network adaptation data
         """
-        if not self.meta_learning_enabled or not self.meta_model:
+        if not self.meta_learning_enabled or not self.meta_model or not adaptation_data:
             return
 
+        _, torch, nn, _ = _meta_learning_modules()
+        mse = nn.MSELoss()
         for task_data in adaptation_data:
+            task_data = torch.as_tensor(task_data, device=self.device)
             learner = self.meta_model.clone()
+            # One simulated target per task, so every inner step minimizes the same loss
+            target = None
             for _ in range(self.adaptation_steps):
-                # Simulate adaptation on task-specific data
                 prediction = learner(task_data)
-                loss = nn.MSELoss()(prediction, torch.randn_like(prediction))
-                learner.adapt(loss)
+                if target is None:
+                    target = torch.randn_like(prediction)
+                learner.adapt(mse(prediction, target))
 
     def _create_few_shot_prompt(self, task_description: str, examples: List[Dict[str, str]]) -> str:
         """Create a few-shot learning prompt from examples."""
@@ -182,46 +284,31 @@ class MetaLearningAgent:
 
     def _generate_skill_prompt(self, task_description: str, few_shot_prompt: str) -> str:
         """Generate a system prompt for a new learned skill."""
-        meta_prompt = f"""Based on the following task and examples, create a system prompt for an AI agent that can perform this task:
-
-Task: {task_description}
-
-Examples:
-{few_shot_prompt}
+        # few_shot_prompt already opens with the task description
+        meta_prompt = f"{few_shot_prompt}\n\nSystem Prompt:"
 
-Create a comprehensive system prompt that enables an AI to:
-1. Understand the task requirements
-2. Apply the patterns shown in examples
-3. Generalize to similar but unseen cases
-4. Provide high-quality, accurate responses
-
-System Prompt:"""
-
-        messages = [
-            SystemMessage(content="You are an expert at creating AI system prompts for various tasks."),
-            HumanMessage(content=meta_prompt)
-        ]
+        messages = prompt_messages(self.llm, _PROMPT_WRITER_SYSTEM_PROMPT, meta_prompt)
 
         response = self.llm.invoke(messages)
         return response.content
 
+    @staticmethod
+    def _embed_description(description: str) -> Optional[np.ndarray]:
+        """Embed a skill description, or None when the embedding model is unavailable or fails."""
+        embed = _semantic_embedder()
+        if embed is None:
+            return None
+        try:
+            return np.asarray(embed(description), dtype=np.float32)
+        except Exception as e:
+            print(f"Skill description embedding failed: {e}")
+            return None
+
     def _analyze_task(self, task: str) -> Dict[str, Any]:
         """Analyze a task to understand its requirements."""
-        analysis_prompt = f"""Analyze the following task and provide:
-1. Domain/category
-2. Required skills or knowledge
-3. Complexity level (simple, moderate, complex)
-4. Potential approaches
-5. Success criteria
-
-Task: {task}
+        analysis_prompt = f"Task: {task}\n\nAnalysis:"
 
-Analysis:"""
-
-        messages = [
-            SystemMessage(content="You are a task analysis expert."),
-            HumanMessage(content=analysis_prompt)
-        ]
+        messages = prompt_messages(self.llm, _TASK_ANALYST_SYSTEM_PROMPT, analysis_prompt)
 
         response = self.llm.invoke(messages)
 
@@ -230,14 +317,41 @@ Analysis:"""
             "analysis": response.content
         }
 
-    def _find_relevant_skills(self, task: str) -> List[Dict[str, Any]]:
-        """Find learned skills relevant to the current task."""
-        relevant = []
-        for skill_id, skill in self.learned_skills.items():
-            # Simple relevance check - can be enhanced with embeddings
-            if any(keyword.lower() in task.lower() for keyword in skill["description"].split()):
-                relevant.append(skill)
-        return relevant
+    def _find_relevant_skills(self, task: str, limit: int = 5) -> List[Dict[str, Any]]:
+        """Find learned skills relevant to the current task, most similar first."""
+        embed = _semantic_embedder()
+        with self._skills_lock:
+            skills = dict(self.learned_skills)
+            skill_words = dict(self._skill_words)
+            skill_ids, embeddings = list(self._skill_ids), self._skill_embeddings
+
+        task_embedding = None
+        if embed is not None and embeddings is not None:
+            try:
+                task_embedding = np.asarray(embed(task), dtype=np.float32)
+            except Exception as e:
+                print(f"Task embedding failed: {e}")
+
+        # Keyword fallback: skills sharing a word with the task, for every skill when the
+        # task could not be embedded, otherwise for skills whose description was not
+        task_words = _word_set(task)
+        embedded = set(skill_ids) if task_embedding is not None else set()
+        keyword_matches = [
+            skill for skill_id, skill in skills.items()
+            if skill_id not in embedded
+            and not task_words.isdisjoint(skill_words.get(skill_id) or _word_set(skill["description"]))
+        ]
+        if task_embedding is None:
+            return keyword_matches[:limit]
+
+        scores = embeddings @ task_embedding
+        top = np.argpartition(scores, -limit)[-limit:] if len(scores) > limit else np.arange(len(scores))
+        ranked = sorted(top, key=lambda index: scores[index], reverse=True)
+        similar = [
+            skills[skill_ids[index]] for index in ranked
+            if scores[index] >= SKILL_SIMILARITY_THRESHOLD
+        ]
+        return (similar + keyword_matches)[:limit]
 
     def _generate_adaptive_prompt(self, task: str) -> str:
         """Generate an adaptive system prompt for a novel task."""
@@ -258,11 +372,21 @@ Be flexible, creative, and thorough in your approach."""
 
     def get_learned_skills(self) -> Dict[str, Dict[str, Any]]:
         """Get all learned skills."""
-        return self.learned_skills.copy()
+        with self._skills_lock:
+            return self.learned_skills.copy()
 
     def forget_skill(self, skill_id: str) -> bool:
         """Remove a learned skill."""
-        if skill_id in self.learned_skills:
-            del self.learned_skills[skill_id]
-            return True
-        return False
\ No newline at end of file
+        with self._skills_lock:
+            self._drop_skill_embedding(skill_id)
+            self._skill_words.pop(skill_id, None)
+            return self.learned_skills.pop(skill_id, None) is not None
+
+    def _drop_skill_embedding(self, skill_id: str) -> None:
+        """Remove a skill's embedding row, if it has one (caller holds _skills_lock)."""
+        if skill_id in self._skill_ids:
+            index = self._skill_ids.index(skill_id)
+            del self._skill_ids[index]
+            self._skill_embeddings = np.delete(self._skill_embeddings, index, axis=0)
+            if not self._skill_ids:
+                self._skill_embeddings = None
\ No newline at end of file
@@ -4,10 +4,57 @@ Researcher Agent implementation.
 Specialized agent for research tasks, information gathering, and contextual analysis.
 """
 
-from typing import Dict, Any, List
-from langchain_openai import ChatOpenAI
-from langchain_core.messages import SystemMessage, HumanMessage
-import os
+from typing import Dict, Any, Iterator, List
+
+from langchain_core.messages import BaseMessage
+
+from ._llm_cache import prompt_messages
+from ._llm_pool import get_chat_llm
+
+
+# Fixed system prompts, kept byte-identical across calls so providers can cache them
+# (they carry each request's fixed instructions, so the user message only holds the input)
+_RESEARCH_SYSTEM_PROMPT = """You are a thorough research specialist with expertise in:
+- Literature review and source synthesis
+- Contextual analysis and background research
+- Identifying authoritative sources
+- Presenting balanced, well-researched perspectives
+
+Always cite sources when available, acknowledge limitations, and present multiple viewpoints.
+Be precise and evidence-based in all claims.
+
+In your research, include:
+1. Background and context
+2. Current status and key findings
+3. Different perspectives
+4. Relevant examples
+5. Potential limitations or considerations"""
+
+_COMPARISON_SYSTEM_PROMPT = """You are an expert researcher. Provide detailed comparative analysis
+of different concepts, approaches, or theories.
+
+Provide:
+1. Key similarities
+2. Important differences
+3. Pros and cons of each
+4. Use cases and applicability
+5. Recommendations for choosing between them"""
+
+_INVESTIGATION_SYSTEM_PROMPT = """You are an investigative researcher. Thoroughly investigate the question
+and provide evidence-based findings with citations when possible.
+
+Provide:
+1. Direct answer to the question
+2. Supporting evidence and reasoning
+3. Different interpretations or perspectives
+4. Related considerations or implications
+5. Sources and further reading recommendations"""
+
+_DEPTH_INSTRUCTIONS = {
+    "quick": "Provide a brief overview of the key points.",
+    "standard": "Provide a balanced overview covering main aspects.",
+    "comprehensive": "Provide thorough coverage including background, current state, and nuances."
+}
 
 
 class ResearcherAgent:
@@ -31,16 +78,8 @@ class ResearcherAgent:
         """
         self.model = model
         
-        # Check for OpenRouter API key first, fallback to OpenAI
-        if os.getenv("OPENROUTER_API_KEY"):
-            self.llm = ChatOpenAI(
-                model=model,
-                temperature=0.6,
-                openai_api_key=os.getenv("OPENROUTER_API_KEY"),
-                openai_api_base="https://openrouter.ai/api/v1"
-            )
-        else:
-            self.llm = ChatOpenAI(model=model, temperature=0.6)
+        # Shared client (OpenRouter when OPENROUTER_API_KEY is set, otherwise OpenAI)
+        self.llm = get_chat_llm(model, 0.6)
     
     def conduct_research(self, topic: str, depth: str = "comprehensive") -> Dict[str, Any]:
         """
@@ -53,36 +92,7 @@ class ResearcherAgent:
         Returns:
             Dictionary containing research findings
         """
-        system_prompt = """You are a thorough research specialist with expertise in:
-- Literature review and source synthesis
-- Contextual analysis and background research
-- Identifying authoritative sources
-- Presenting balanced, well-researched perspectives
-
-Always cite sources when available, acknowledge limitations, and present multiple viewpoints.
-Be precise and evidence-based in all claims."""
-        
-        depth_instructions = {
-            "quick": "Provide a brief overview of the key points.",
-            "standard": "Provide a balanced overview covering main aspects.",
-            "comprehensive": "Provide thorough coverage including background, current state, and nuances."
-        }
-        
-        prompt = f"""Research the following topic ({depth} depth): {topic}
-
-{depth_instructions.get(depth, depth_instructions['standard'])}
-
-Include:
-1. Background and context
-2. Current status and key findings
-3. Different perspectives
-4. Relevant examples
-5. Potential limitations or considerations"""
-        
-        messages = [
-            SystemMessage(content=system_prompt),
-            HumanMessage(content=prompt)
-        ]
+        messages = self._research_messages(topic, depth)
         
         response = self.llm.invoke(messages)
         
@@ -93,6 +103,28 @@ Include:
             "depth_level": depth
         }
     
+    def research_stream(self, topic: str, depth: str = "comprehensive") -> Iterator[str]:
+        """
+        Conduct research like conduct_research, yielding the findings as they are generated.
+        
+        Args:
+            topic: Research topic
+            depth: Depth of research (quick, standard, comprehensive)
+            
+        Yields:
+            Research text chunks
+        """
+        for chunk in self.llm.stream(self._research_messages(topic, depth)):
+            yield chunk.content
+    
+    def _research_messages(self, topic: str, depth: str) -> List[BaseMessage]:
+        """Build the messages for a research request."""
+        prompt = f"""Research the following topic ({depth} depth): {topic}
+
+{_DEPTH_INSTRUCTIONS.get(depth, _DEPTH_INSTRUCTIONS['standard'])}"""
+        
+        return prompt_messages(self.llm, _RESEARCH_SYSTEM_PROMPT, prompt)
+    
     def compare_concepts(self, concepts: List[str]) -> str:
         """
         Compare multiple concepts or approaches.
@@ -105,24 +137,11 @@ Include:
         """
         concepts_str = "\n".join([f"- {c}" for c in concepts])
         
-        system_prompt = """You are an expert researcher. Provide detailed comparative analysis
-of different concepts, approaches, or theories."""
+        system_prompt = _COMPARISON_SYSTEM_PROMPT
         
-        prompt = f"""Compare the following concepts:
-
-{concepts_str}
-
-Provide:
-1. Key similarities
-2. Important differences
-3. Pros and cons of each
-4. Use cases and applicability
-5. Recommendations for choosing between them"""
+        prompt = f"Compare the following concepts:\n\n{concepts_str}"
         
-        messages = [
-            SystemMessage(content=system_prompt),
-            HumanMessage(content=prompt)
-        ]
+        messages = prompt_messages(self.llm, system_prompt, prompt)
         
         response = self.llm.invoke(messages)
         return response.content
@@ -137,22 +156,11 @@ Provide:
         Returns:
             Investigation findings
         """
-        system_prompt = """You are an investigative researcher. Thoroughly investigate the question
-and provide evidence-based findings with citations when possible."""
+        system_prompt = _INVESTIGATION_SYSTEM_PROMPT
         
-        prompt = f"""Investigate the following question: {question}
-
-Provide:
-1. Direct answer to the question
-2. Supporting evidence and reasoning
-3. Different interpretations or perspectives
-4. Related considerations or implications
-5. Sources and further reading recommendations"""
+        prompt = f"Investigate the following question: {question}"
         
-        messages = [
-            SystemMessage(content=system_prompt),
-            HumanMessage(content=prompt)
-        ]
+        messages = prompt_messages(self.llm, system_prompt, prompt)
         
         response = self.llm.invoke(messages)
         return response.content
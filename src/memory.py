@@ -5,31 +5,139 @@ Provides persistent memory capabilities using vector databases and LangGraph
 state persistence for maintaining context across sessions.
 """
 
+import operator
 import os
+import queue
+import sys
 import json
-from typing import Dict, List, Any, Optional, Union
+import hashlib
+import threading
+import time
+from collections import OrderedDict, defaultdict, deque
+from concurrent.futures import Future
+from functools import lru_cache
+from itertools import count, islice
+from typing import Callable, Dict, List, Any, Optional, Tuple, Union
 from abc import ABC, abstractmethod
 from datetime import datetime
 from dataclasses import dataclass, field
 
+import numpy as np
+
 try:
     import chromadb
     from chromadb.config import Settings
+    from chromadb.utils import embedding_functions
     CHROMA_AVAILABLE = True
 except ImportError:
     CHROMA_AVAILABLE = False
 
+try:
+    import faiss
+    FAISS_AVAILABLE = True
+except ImportError:
+    FAISS_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 from langgraph.checkpoint.memory import MemorySaver
-from langchain_core.documents import Document
-from langchain_community.vectorstores import Chroma
-from langchain_openai import OpenAIEmbeddings
+from langchain_core.embeddings import Embeddings
 import dotenv
 
 # Load environment variables
 dotenv.load_dotenv()
 
+# Local sentence-transformers model (384-dim vectors, no API round-trip per embedding).
+# OpenAI models ("text-embedding-*") are also accepted; text-embedding-3 models can be
+# shortened with the vector_store "embedding_dimensions" option (e.g. 256).
+DEFAULT_EMBEDDING_MODEL = "all-MiniLM-L6-v2"
 
-@dataclass
+def _dumps(value: Any, sort_keys: bool = False) -> str:
+    """Serialize to a JSON string, with orjson when installed (Chroma metadata values must be str)."""
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+        return orjson.dumps(value, default=str, option=option).decode("utf-8")
+    return json.dumps(value, sort_keys=sort_keys, default=str)
+
+
+_loads = orjson.loads if ORJSON_AVAILABLE else json.loads
+
+# HNSW index settings for new collections, each overridable through an environment variable
+HNSW_SETTINGS = {
+    "hnsw:construction_ef": ("AGENTSPAWN_HNSW_CONSTRUCTION_EF", 200),
+    "hnsw:search_ef": ("AGENTSPAWN_HNSW_SEARCH_EF", 64),
+    "hnsw:M": ("AGENTSPAWN_HNSW_M", 32),
+}
+
+# Maximum number of search query embeddings kept in memory per embedding model
+QUERY_EMBEDDING_CACHE_SIZE = 1024
+
+# Most recent conversation entries per thread the Chroma provider keeps in memory
+RECENT_HISTORY_SIZE = 64
+
+# Maximum number of entries embedded and added to ChromaDB per call, so bulk ingest
+# stays within embedding API input limits and Chroma's maximum batch size
+ADD_BATCH_SIZE = 250
+
+
+# __slots__ generation for dataclasses needs Python 3.10+
+_DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+# Conversation roles ChromaDB stores as a small integer ("role_i") instead of a "role" string
+_ROLE_NAMES = ("user", "agent")
+_ROLE_CODES = {role: code for code, role in enumerate(_ROLE_NAMES)}
+
+
+def _encode_role(metadata: Dict[str, Any]) -> None:
+    """Replace a known "role" value in metadata about to be stored with its code."""
+    role = metadata.get("role")
+    if isinstance(role, str) and role in _ROLE_CODES:
+        del metadata["role"]
+        metadata["role_i"] = _ROLE_CODES[role]
+
+
+def _role_clause(role: Any) -> Dict[str, Any]:
+    """Where clause for a role, matching rows stored with its code or (written before roles were coded) the string."""
+    if isinstance(role, str) and role in _ROLE_CODES:
+        return {"$or": [{"role_i": _ROLE_CODES[role]}, {"role": role}]}
+    return {"role": role}
+
+
+def _interned_metadata(metadata: Dict[str, Any], reserved: frozenset) -> Dict[str, Any]:
+    """Copy stored metadata without reserved keys, interning the keys so entries share them."""
+    copied = {sys.intern(key): value for key, value in metadata.items() if key not in reserved}
+    role_code = copied.pop("role_i", None)
+    if role_code is not None:
+        copied["role"] = _ROLE_NAMES[role_code]
+    return copied
+
+
+def _history_order(entry: "MemoryEntry") -> Tuple[datetime, int]:
+    """
+    Sort key putting history entries in stored order.
+    
+    Both sides of a turn share a timestamp, so ties are broken by the sequence number
+    MemoryManager.new_memory_id ends ids with (entries with other ids sort first).
+    """
+    _, _, sequence = entry.id.rpartition(":")
+    try:
+        return entry.timestamp, int(sequence, 16)
+    except ValueError:
+        return entry.timestamp, -1
+
+
+def _stored_timestamp(metadata: Dict[str, Any]) -> datetime:
+    """Parse a stored entry's ISO timestamp, defaulting to now only when it is missing."""
+    timestamp = metadata.get("timestamp")
+    return datetime.fromisoformat(timestamp) if timestamp else datetime.now()
+
+
+@dataclass(**_DATACLASS_SLOTS)
 class MemoryEntry:
     """Represents a single memory entry."""
     id: str
@@ -39,7 +147,7 @@ class MemoryEntry:
     memory_type: str = "conversation"  # conversation, agent_result, tool_usage, etc.
 
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class ConversationContext:
     """Context for a conversation thread."""
     thread_id: str
@@ -48,6 +156,17 @@ class ConversationContext:
     created_at: datetime = field(default_factory=datetime.now)
     last_updated: datetime = field(default_factory=datetime.now)
     metadata: Dict[str, Any] = field(default_factory=dict)
+    # Prefilled memory window: entry id -> entry, filled by MemoryManager.prefill_window
+    _hot_cache: Dict[str, MemoryEntry] = field(default_factory=dict, init=False, repr=False, compare=False)
+
+
+@dataclass
+class MemoryQuery:
+    """A single lookup in a MemoryManager.batch_query call."""
+    query: Optional[str] = None  # Semantic search text
+    thread_id: Optional[str] = None  # Conversation history thread (takes precedence)
+    limit: int = 5
+    metadata_filter: Optional[Dict] = None
 
 
 class MemoryProvider(ABC):
@@ -58,11 +177,21 @@ class MemoryProvider(ABC):
         """Store a memory entry."""
         pass
 
+    def store_memories(self, entries: List[MemoryEntry]) -> bool:
+        """Store several memory entries; providers may override to write them together."""
+        results = [self.store_memory(entry) for entry in entries]
+        return all(results)
+
     @abstractmethod
     def retrieve_memories(self, query: str, limit: int = 5, metadata_filter: Optional[Dict] = None) -> List[MemoryEntry]:
         """Retrieve relevant memories based on semantic search."""
         pass
 
+    def retrieve_memories_batch(self, queries: List[str], limit: int = 5,
+                                metadata_filter: Optional[Dict] = None) -> List[List[MemoryEntry]]:
+        """Retrieve memories for several queries; providers may override to batch them."""
+        return [self.retrieve_memories(query, limit, metadata_filter) for query in queries]
+
     @abstractmethod
     def get_conversation_history(self, thread_id: str, limit: int = 10) -> List[MemoryEntry]:
         """Get conversation history for a thread."""
@@ -78,100 +207,343 @@ class MemoryProvider(ABC):
         """Retrieve conversation context."""
         pass
 
+    def warmup(self) -> None:
+        """Open connections and load models ahead of the first real query."""
+        pass
+
+
+class _ChromaEmbeddings(Embeddings):
+    """LangChain adapter around a ChromaDB embedding function, caching query embeddings."""
+
+    def __init__(self, embedding_function, query_cache_size: int = QUERY_EMBEDDING_CACHE_SIZE):
+        self.embedding_function = embedding_function
+        # Recent query embeddings (least recently used are evicted first); each adapter
+        # wraps one embedding model, so the query text alone is the key
+        self.query_cache_size = query_cache_size
+        self._query_cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._query_lock = threading.Lock()
+
+    def embed_documents_array(self, texts: List[str]) -> np.ndarray:
+        """Embed texts as a float32 matrix with one row per text."""
+        return np.asarray(self.embedding_function(list(texts)), dtype=np.float32)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embed_documents_array(texts).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_queries_array([text])[0].tolist()
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        return self.embed_queries_array(texts).tolist()
+
+    def embed_queries_array(self, texts: List[str]) -> np.ndarray:
+        """Embed search queries as a float32 matrix, reusing cached embeddings and embedding the rest in one call."""
+        with self._query_lock:
+            cached = {text: self._query_cache[text] for text in texts if text in self._query_cache}
+            for text in cached:
+                self._query_cache.move_to_end(text)
+
+        missing = list(dict.fromkeys(text for text in texts if text not in cached))
+        if missing:
+            fetched = dict(zip(missing, self.embed_documents_array(missing)))
+            with self._query_lock:
+                self._query_cache.update(fetched)
+                while len(self._query_cache) > self.query_cache_size:
+                    self._query_cache.popitem(last=False)
+            cached.update(fetched)
+
+        return np.stack([cached[text] for text in texts])
+
+
+def create_embedding_function(model_name: str = DEFAULT_EMBEDDING_MODEL, dimensions: Optional[int] = None):
+    """
+    Create the ChromaDB embedding function for a model.
+    
+    Args:
+        model_name: OpenAI model ("text-embedding-*") or sentence-transformers model name
+        dimensions: Output size for OpenAI text-embedding-3 models (default: model native)
+        
+    Returns:
+        A ChromaDB embedding function, shared by every caller using the same model
+    """
+    api_key = os.getenv("OPENAI_API_KEY") if model_name.startswith("text-embedding-") else None
+    return _cached_embedding_function(model_name, dimensions, api_key)
+
+
+@lru_cache(maxsize=8)
+def _cached_embedding_function(model_name: str, dimensions: Optional[int], api_key: Optional[str]):
+    """Build an embedding function once per model, so providers share its loaded model or HTTP client."""
+    if model_name.startswith("text-embedding-"):
+        options = {"dimensions": dimensions} if dimensions else {}
+        return embedding_functions.OpenAIEmbeddingFunction(
+            api_key=api_key,
+            model_name=model_name,
+            **options
+        )
+    return embedding_functions.SentenceTransformerEmbeddingFunction(model_name=model_name)
+
+
+# Metadata keys the provider adds for its own bookkeeping, dropped from returned entries
+_RESERVED_HISTORY_METADATA = frozenset(("timestamp", "ts", "memory_type"))
+_RESERVED_SEARCH_METADATA = _RESERVED_HISTORY_METADATA | {"id"}
+
+# Chroma where-clause operators that FAISSMemoryProvider also applies to its entries
+_FILTER_OPERATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    "$eq": operator.eq,
+    "$ne": operator.ne,
+    "$in": lambda value, operand: value in operand,
+    "$nin": lambda value, operand: value not in operand,
+}
+
+# Display labels for the conversation roles the framework stores
+_ROLE_LABELS = {"user": "User", "agent": "Agent", "unknown": "Unknown"}
+
+
+def _role_label(role: str) -> str:
+    """Display label for a conversation role (other roles are title-cased)."""
+    label = _ROLE_LABELS.get(role)
+    return label if label is not None else role.title()
+
+
+@lru_cache(maxsize=2048)
+def _thread_where(thread_id: Optional[str], memory_type: str) -> Dict[str, Any]:
+    """
+    Chroma where clause for a thread's entries of one memory type.
+    
+    Clauses are shared between calls, so callers must not modify them. A thread_id
+    of None matches on memory type alone (for collections holding a single thread).
+    """
+    if thread_id is None:
+        return {"memory_type": memory_type}
+    return {"$and": [{"thread_id": thread_id}, {"memory_type": memory_type}]}
+
+
+def hnsw_collection_metadata() -> Dict[str, Any]:
+    """
+    Build the ChromaDB collection metadata that configures its HNSW index.
+    
+    Uses cosine distance with the HNSW_SETTINGS defaults, overridden by any of
+    their environment variables that are set.
+    
+    Returns:
+        Collection metadata dictionary
+    """
+    metadata: Dict[str, Any] = {"hnsw:space": "cosine"}
+    for key, (env_var, default) in HNSW_SETTINGS.items():
+        metadata[key] = int(os.getenv(env_var, default))
+    return metadata
+
 
 class ChromaMemoryProvider(MemoryProvider):
     """ChromaDB-based memory provider for vector storage."""
 
-    def __init__(self, collection_name: str = "agent_memory", persist_directory: str = "./chroma_db"):
+    def __init__(self, collection_name: str = "agent_memory", persist_directory: str = "./chroma_db",
+                 embedding_model: str = DEFAULT_EMBEDDING_MODEL, embedding_dimensions: Optional[int] = None,
+                 shard_by_thread: bool = False):
         if not CHROMA_AVAILABLE:
             raise ImportError("ChromaDB is required for ChromaMemoryProvider. Install with: pip install chromadb")
 
         self.collection_name = collection_name
         self.persist_directory = persist_directory
+        self.embedding_model = embedding_model
 
-        # Initialize embeddings
-        self.embeddings = OpenAIEmbeddings(
-            model="text-embedding-ada-002",
-            api_key=os.getenv("OPENAI_API_KEY")
-        )
+        # One embedding function for stores and searches, so both live in the same vector space
+        self.embedding_function = create_embedding_function(embedding_model, embedding_dimensions)
+        self.embeddings = _ChromaEmbeddings(self.embedding_function)
 
         # Initialize ChromaDB
         self.client = chromadb.PersistentClient(path=persist_directory)
 
-        # Create or get collection
-        try:
-            self.collection = self.client.get_collection(name=collection_name)
-        except ValueError:
-            self.collection = self.client.create_collection(name=collection_name)
-
-        # LangChain Chroma wrapper for semantic search
-        self.vectorstore = Chroma(
-            client=self.client,
-            collection_name=collection_name,
-            embedding_function=self.embeddings
+        # Create or get collection (HNSW settings only apply when the collection is created)
+        self.collection = self.client.get_or_create_collection(
+            name=collection_name,
+            embedding_function=self.embedding_function,
+            metadata=hnsw_collection_metadata()
         )
 
+        # Optionally also keep each thread's entries in its own collection, so thread-scoped
+        # searches walk a small HNSW graph instead of filtering the global one
+        self.shard_by_thread = shard_by_thread
+        self._thread_collections: Dict[str, Any] = {}
+        self._shard_lock = threading.Lock()
+
+        # Conversation entries stored through this provider, newest last, by thread_id;
+        # serves history reads without a Chroma metadata scan
+        self._recent: Dict[str, deque] = defaultdict(lambda: deque(maxlen=RECENT_HISTORY_SIZE))
+        self._recent_lock = threading.Lock()
+
     def store_memory(self, entry: MemoryEntry) -> bool:
         """Store a memory entry in ChromaDB."""
-        try:
-            # Prepare metadata
-            metadata = entry.metadata.copy()
-            metadata.update({
-                "timestamp": entry.timestamp.isoformat(),
-                "memory_type": entry.memory_type,
-                "id": entry.id
-            })
-
-            # Add to ChromaDB
-            self.collection.add(
-                documents=[entry.content],
-                metadatas=[metadata],
-                ids=[entry.id]
-            )
+        return self.store_memories([entry])
 
+    def store_memories(self, entries: List[MemoryEntry]) -> bool:
+        """Store several memory entries in ChromaDB, one add call per ADD_BATCH_SIZE entries."""
+        if not entries:
+            return True
+        try:
+            for start in range(0, len(entries), ADD_BATCH_SIZE):
+                self._add_entries(entries[start:start + ADD_BATCH_SIZE])
             return True
         except Exception as e:
             print(f"Error storing memory: {e}")
             return False
 
+    def _add_entries(self, entries: List[MemoryEntry]) -> None:
+        """Embed and add one batch of entries to the collection and their thread shards."""
+        documents = [entry.content for entry in entries]
+        # Sharded entries are embedded once for both of their collections
+        embeddings = self.embeddings.embed_documents(documents) if self.shard_by_thread else None
+        metadatas = [self._entry_metadata(entry) for entry in entries]
+        ids = [entry.id for entry in entries]
+        self.collection.add(documents=documents, embeddings=embeddings, metadatas=metadatas, ids=ids)
+
+        if self.shard_by_thread:
+            shards: Dict[str, List[int]] = defaultdict(list)
+            for index, entry in enumerate(entries):
+                thread_id = entry.metadata.get("thread_id")
+                if thread_id is not None:
+                    shards[thread_id].append(index)
+            for thread_id, indices in shards.items():
+                self._thread_collection(thread_id).add(
+                    documents=[documents[i] for i in indices],
+                    embeddings=[embeddings[i] for i in indices],
+                    metadatas=[metadatas[i] for i in indices],
+                    ids=[ids[i] for i in indices]
+                )
+
+        self._remember_recent(entries)
+
+    def _remember_recent(self, entries: List[MemoryEntry]) -> None:
+        """Record newly stored conversation entries in their thread's recent history."""
+        with self._recent_lock:
+            for entry in entries:
+                thread_id = entry.metadata.get("thread_id")
+                if entry.memory_type != "conversation" or thread_id is None:
+                    continue
+                recent = self._recent[thread_id]
+                # ChromaDB ignores adds that reuse an id, so the first stored entry stays
+                if all(stored.id != entry.id for stored in recent):
+                    recent.append(entry)
+
+    @staticmethod
+    def _entry_metadata(entry: MemoryEntry) -> Dict[str, Any]:
+        """Build the ChromaDB metadata stored alongside a memory entry."""
+        timestamp = entry.timestamp
+        # One dict display instead of copy() + update(): a single allocation per entry
+        metadata = {
+            **entry.metadata,
+            "timestamp": timestamp.isoformat(),
+            # Integer epoch seconds, for numeric range filters ($gte/$lt) on time
+            "ts": int(timestamp.timestamp()),
+            "memory_type": entry.memory_type,
+            "id": entry.id
+        }
+        _encode_role(metadata)
+        return metadata
+
+    def _thread_collection(self, thread_id: str) -> Any:
+        """Get (creating on first use) the collection holding one thread's entries."""
+        with self._shard_lock:
+            collection = self._thread_collections.get(thread_id)
+            if collection is None:
+                # Thread ids may hold characters Chroma rejects in names, so shards are named by digest
+                digest = hashlib.sha1(str(thread_id).encode("utf-8")).hexdigest()[:16]
+                collection = self.client.get_or_create_collection(
+                    name=f"{self.collection_name}_thread_{digest}",
+                    embedding_function=self.embedding_function,
+                    metadata=hnsw_collection_metadata()
+                )
+                self._thread_collections[thread_id] = collection
+            return collection
+
+    def _collection_for(self, metadata_filter: Optional[Dict]) -> Tuple[Any, Dict[str, Any]]:
+        """Pick the collection to query for a filter, returning it with the filter left to apply."""
+        metadata_filter = dict(metadata_filter or {})
+        thread_id = metadata_filter.get("thread_id")
+        if self.shard_by_thread and isinstance(thread_id, str):
+            del metadata_filter["thread_id"]
+            return self._thread_collection(thread_id), metadata_filter
+        return self.collection, metadata_filter
+
+    def _thread_query(self, thread_id: str, memory_type: str) -> Tuple[Any, Dict[str, Any]]:
+        """Pick the collection and where clause for a thread's entries of one memory type."""
+        if self.shard_by_thread and isinstance(thread_id, str):
+            return self._thread_collection(thread_id), _thread_where(None, memory_type)
+        return self.collection, _thread_where(thread_id, memory_type)
+
+    @staticmethod
+    def _where_clause(metadata_filter: Optional[Dict]) -> Dict[str, Any]:
+        """Build a Chroma where clause; equality filters on several keys need an explicit $and."""
+        metadata_filter = metadata_filter or {}
+        if not metadata_filter or any(key.startswith("$") for key in metadata_filter):
+            return metadata_filter
+        clauses = [
+            _role_clause(value) if key == "role" else {key: value}
+            for key, value in metadata_filter.items()
+        ]
+        return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
     def retrieve_memories(self, query: str, limit: int = 5, metadata_filter: Optional[Dict] = None) -> List[MemoryEntry]:
         """Retrieve relevant memories using semantic search."""
+        # Queries go straight to the collection with a (cached) query embedding, without
+        # building LangChain Documents only to unwrap them again
+        return self.retrieve_memories_batch([query], limit, metadata_filter)[0]
+
+    def retrieve_memories_batch(self, queries: List[str], limit: int = 5,
+                                metadata_filter: Optional[Dict] = None) -> List[List[MemoryEntry]]:
+        """Retrieve memories for several queries with one embedding call and one Chroma query."""
+        if not queries:
+            return []
         try:
-            # Build filter
-            where_clause = metadata_filter or {}
-
-            # Search using LangChain wrapper for better semantic search
-            docs = self.vectorstore.similarity_search(
-                query=query,
-                k=limit,
-                filter=where_clause if where_clause else None
+            collection, metadata_filter = self._collection_for(metadata_filter)
+            results = collection.query(
+                # Chroma takes float32 arrays as they are, without a round trip through Python floats
+                query_embeddings=self.embeddings.embed_queries_array(queries),
+                n_results=limit,
+                where=self._where_clause(metadata_filter) or None
             )
 
-            memories = []
-            for doc in docs:
-                metadata = doc.metadata
-                memory = MemoryEntry(
-                    id=metadata.get("id", ""),
-                    content=doc.page_content,
-                    metadata={k: v for k, v in metadata.items() if k not in ["id", "timestamp", "memory_type"]},
-                    timestamp=datetime.fromisoformat(metadata.get("timestamp", datetime.now().isoformat())),
-                    memory_type=metadata.get("memory_type", "conversation")
-                )
-                memories.append(memory)
-
-            return memories
+            return [
+                [self._search_result_entry(doc, metadata) for doc, metadata in zip(docs, metadatas)]
+                for docs, metadatas in zip(results["documents"], results["metadatas"])
+            ]
         except Exception as e:
             print(f"Error retrieving memories: {e}")
-            return []
+            return [[] for _ in queries]
+
+    def warmup(self) -> None:
+        """Touch the collection and the embedding client so first queries skip cold start."""
+        try:
+            self.collection.count()
+            self.embeddings.embed_query("warmup")
+        except Exception as e:
+            print(f"Memory warmup failed: {e}")
+
+    @staticmethod
+    def _search_result_entry(content: str, metadata: Dict[str, Any]) -> MemoryEntry:
+        """Build a memory entry from a search result document and its metadata."""
+        return MemoryEntry(
+            id=metadata.get("id", ""),
+            content=content,
+            metadata=_interned_metadata(metadata, _RESERVED_SEARCH_METADATA),
+            timestamp=_stored_timestamp(metadata),
+            memory_type=metadata.get("memory_type", "conversation")
+        )
 
     def get_conversation_history(self, thread_id: str, limit: int = 10) -> List[MemoryEntry]:
-        """Get conversation history for a thread."""
+        """Get conversation history for a thread, oldest first."""
+        # Entries stored by this process are the thread's newest, so enough of them
+        # answer the query without reading older history from ChromaDB
+        with self._recent_lock:
+            recent = list(self._recent.get(thread_id, ()))
+        if limit <= len(recent):
+            return recent[len(recent) - limit:]
+
         try:
-            # Query for conversation memories with this thread_id
-            results = self.collection.get(
-                where={"thread_id": thread_id, "memory_type": "conversation"},
-                limit=limit
-            )
+            # Query for conversation memories with this thread_id (ChromaDB returns them
+            # unordered, so the newest are picked after sorting)
+            collection, where = self._thread_query(thread_id, "conversation")
+            results = collection.get(where=where)
 
             memories = []
             for i, doc in enumerate(results["documents"]):
@@ -179,15 +551,15 @@ class ChromaMemoryProvider(MemoryProvider):
                 memory = MemoryEntry(
                     id=results["ids"][i],
                     content=doc,
-                    metadata={k: v for k, v in metadata.items() if k not in ["timestamp", "memory_type"]},
-                    timestamp=datetime.fromisoformat(metadata.get("timestamp", datetime.now().isoformat())),
+                    metadata=_interned_metadata(metadata, _RESERVED_HISTORY_METADATA),
+                    timestamp=_stored_timestamp(metadata),
                     memory_type="conversation"
                 )
                 memories.append(memory)
 
-            # Sort by timestamp
-            memories.sort(key=lambda x: x.timestamp)
-            return memories
+            # Sort by timestamp, then by id sequence within a turn
+            memories.sort(key=_history_order)
+            return memories[-limit:] if limit > 0 else []
         except Exception as e:
             print(f"Error getting conversation history: {e}")
             return []
@@ -201,7 +573,7 @@ class ChromaMemoryProvider(MemoryProvider):
                 "session_id": context.session_id,
                 "created_at": context.created_at.isoformat(),
                 "last_updated": context.last_updated.isoformat(),
-                "metadata": json.dumps(context.metadata)
+                "metadata": _dumps(context.metadata)
             }
 
             # Store as a special memory entry
@@ -220,8 +592,9 @@ class ChromaMemoryProvider(MemoryProvider):
     def get_conversation_context(self, thread_id: str) -> Optional[ConversationContext]:
         """Retrieve conversation context."""
         try:
-            results = self.collection.get(
-                where={"thread_id": thread_id, "memory_type": "context"},
+            collection, where = self._thread_query(thread_id, "context")
+            results = collection.get(
+                where=where,
                 limit=1
             )
 
@@ -235,19 +608,219 @@ class ChromaMemoryProvider(MemoryProvider):
                 session_id=metadata.get("session_id"),
                 created_at=datetime.fromisoformat(metadata["created_at"]),
                 last_updated=datetime.fromisoformat(metadata["last_updated"]),
-                metadata=json.loads(metadata.get("metadata", "{}"))
+                metadata=_loads(metadata.get("metadata", "{}"))
             )
         except Exception as e:
             print(f"Error getting conversation context: {e}")
             return None
 
 
+class FAISSMemoryProvider(MemoryProvider):
+    """
+    In-process FAISS memory provider for small, non-persistent sessions.
+    
+    Uses an exact inner-product index (IndexFlatIP) over normalized embeddings,
+    i.e. exact cosine search, with entries kept in a parallel Python list since
+    FAISS only stores vectors. Nothing is written to disk.
+    """
+
+    def __init__(self, embedding_model: str = DEFAULT_EMBEDDING_MODEL, embedding_dimensions: Optional[int] = None):
+        if not FAISS_AVAILABLE:
+            raise ImportError("FAISS is required for FAISSMemoryProvider. Install with: pip install faiss-cpu")
+        if not CHROMA_AVAILABLE:
+            raise ImportError("ChromaDB embedding functions are required. Install with: pip install chromadb")
+
+        self.embedding_model = embedding_model
+        self.embedding_function = create_embedding_function(embedding_model, embedding_dimensions)
+        self.embeddings = _ChromaEmbeddings(self.embedding_function)
+
+        self.index = None  # Created on first store, once the embedding size is known
+        self.entries: List[MemoryEntry] = []  # Row i of the index holds entries[i]
+        self.contexts: Dict[str, ConversationContext] = {}
+        self._ids = set()
+        self._lock = threading.Lock()
+
+    def _vectors(self, texts: List[str]):
+        """Embed texts as a normalized float32 matrix."""
+        vectors = self.embeddings.embed_documents_array(texts)
+        faiss.normalize_L2(vectors)
+        return vectors
+
+    def store_memory(self, entry: MemoryEntry) -> bool:
+        """Store a memory entry in the index."""
+        return self.store_memories([entry])
+
+    def store_memories(self, entries: List[MemoryEntry]) -> bool:
+        """Store several memory entries with one embedding call and one index add."""
+        try:
+            with self._lock:
+                # Like ChromaDB, ignore entries whose id is already stored
+                new_entries = [entry for entry in entries if entry.id not in self._ids]
+                if not new_entries:
+                    return True
+                vectors = self._vectors([entry.content for entry in new_entries])
+                if self.index is None:
+                    self.index = faiss.IndexFlatIP(vectors.shape[1])
+                self.index.add(vectors)
+                self.entries.extend(new_entries)
+                self._ids.update(entry.id for entry in new_entries)
+            return True
+        except Exception as e:
+            print(f"Error storing memory: {e}")
+            return False
+
+    def retrieve_memories(self, query: str, limit: int = 5, metadata_filter: Optional[Dict] = None) -> List[MemoryEntry]:
+        """Retrieve relevant memories using exact semantic search."""
+        return self.retrieve_memories_batch([query], limit, metadata_filter)[0]
+
+    def retrieve_memories_batch(self, queries: List[str], limit: int = 5,
+                                metadata_filter: Optional[Dict] = None) -> List[List[MemoryEntry]]:
+        """Retrieve memories for several queries with one embedding call and one index search."""
+        if not queries:
+            return []
+        try:
+            with self._lock:
+                if self.index is None or self.index.ntotal == 0:
+                    return [[] for _ in queries]
+                # Exact search is cheap at this scale, so rank everything when filtering
+                k = self.index.ntotal if metadata_filter else min(limit, self.index.ntotal)
+                _, rows = self.index.search(self._vectors(queries), k)
+                entries = self.entries
+
+            results = []
+            for query_rows in rows:
+                matches = (entries[row] for row in query_rows if row >= 0)
+                if metadata_filter:
+                    matches = (entry for entry in matches if self._matches(entry, metadata_filter))
+                results.append(list(islice(matches, limit)))
+            return results
+        except Exception as e:
+            print(f"Error retrieving memories: {e}")
+            return [[] for _ in queries]
+
+    @staticmethod
+    def _matches(entry: MemoryEntry, metadata_filter: Dict[str, Any]) -> bool:
+        """Check an entry against a metadata filter of equalities and {"$op": operand} conditions."""
+        fields = {**entry.metadata, "memory_type": entry.memory_type, "id": entry.id}
+        for key, condition in metadata_filter.items():
+            value = fields.get(key)
+            if isinstance(condition, dict):
+                if not all(_FILTER_OPERATORS[op](value, operand) for op, operand in condition.items()):
+                    return False
+            elif value != condition:
+                return False
+        return True
+
+    def get_conversation_history(self, thread_id: str, limit: int = 10) -> List[MemoryEntry]:
+        """Get the most recent conversation history for a thread, oldest first."""
+        if limit <= 0:
+            return []
+        with self._lock:
+            history = [
+                entry for entry in self.entries
+                if entry.memory_type == "conversation" and entry.metadata.get("thread_id") == thread_id
+            ]
+        return sorted(history, key=lambda x: x.timestamp)[-limit:]
+
+    def store_conversation_context(self, context: ConversationContext) -> bool:
+        """Store conversation context."""
+        with self._lock:
+            self.contexts[context.thread_id] = context
+        return True
+
+    def get_conversation_context(self, thread_id: str) -> Optional[ConversationContext]:
+        """Retrieve conversation context."""
+        with self._lock:
+            return self.contexts.get(thread_id)
+
+    def warmup(self) -> None:
+        """Load the embedding model so first queries skip cold start."""
+        try:
+            self.embeddings.embed_query("warmup")
+        except Exception as e:
+            print(f"Memory warmup failed: {e}")
+
+
+class BufferedMemorySaver(MemorySaver):
+    """
+    MemorySaver that holds checkpoint writes until the end of a workflow.
+    
+    put() and put_writes() are queued per thread and applied by flush(). Reads
+    for a thread flush its queue first, so resumed runs always see every write.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._pending = defaultdict(deque)
+        self._pending_lock = threading.Lock()
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        """Queue a checkpoint write and return the config it will be stored under."""
+        configurable = config["configurable"]
+        with self._pending_lock:
+            self._pending[configurable["thread_id"]].append(
+                (super().put, (config, checkpoint, metadata, new_versions))
+            )
+        return {
+            "configurable": {
+                "thread_id": configurable["thread_id"],
+                "checkpoint_ns": configurable.get("checkpoint_ns", ""),
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    def put_writes(self, config, writes, task_id, task_path=""):
+        """Queue intermediate task writes."""
+        with self._pending_lock:
+            self._pending[config["configurable"]["thread_id"]].append(
+                (super().put_writes, (config, writes, task_id, task_path))
+            )
+
+    def flush(self, thread_id: Optional[str] = None) -> int:
+        """
+        Apply queued writes in order.
+        
+        Args:
+            thread_id: Thread to flush (default: all threads)
+            
+        Returns:
+            Number of writes applied
+        """
+        with self._pending_lock:
+            thread_ids = [thread_id] if thread_id is not None else list(self._pending)
+            queued = [write for tid in thread_ids for write in self._pending.pop(tid, ())]
+            for write, args in queued:
+                write(*args)
+        return len(queued)
+
+    def get_tuple(self, config):
+        self.flush(config["configurable"].get("thread_id"))
+        return super().get_tuple(config)
+
+    def list(self, config, **kwargs):
+        self.flush(config["configurable"].get("thread_id") if config else None)
+        return super().list(config, **kwargs)
+
+
 class LangGraphMemoryProvider(MemoryProvider):
     """LangGraph-based memory provider for workflow state persistence."""
 
-    def __init__(self):
-        self.checkpointer = MemorySaver()
-        self.memory_store = {}  # Simple in-memory store for conversation contexts
+    def __init__(self, checkpoint_mode: str = "per_node", max_history: int = 256):
+        """
+        Initialize the LangGraph memory provider.
+        
+        Args:
+            checkpoint_mode: "per_node" saves after every node; "end_of_workflow"
+                buffers checkpoints until MemoryManager.flush_checkpoints()
+            max_history: Entries kept per thread; the oldest are dropped beyond this
+        """
+        if checkpoint_mode not in ("per_node", "end_of_workflow"):
+            raise ValueError(f"Unknown checkpoint mode: {checkpoint_mode}")
+        self.checkpoint_mode = checkpoint_mode
+        self.checkpointer = BufferedMemorySaver() if checkpoint_mode == "end_of_workflow" else MemorySaver()
+        # Simple in-memory store for conversation contexts, bounded per thread
+        self.max_history = max_history
+        self.memory_store: Dict[str, deque] = {}
 
     def store_memory(self, entry: MemoryEntry) -> bool:
         """Store memory entry (not directly applicable for LangGraph checkpointer)."""
@@ -270,9 +843,11 @@ class LangGraphMemoryProvider(MemoryProvider):
 
             # LangGraph MemorySaver doesn't have a direct way to list all checkpoints
             # This is a simplified implementation
-            if thread_id in self.memory_store:
-                return self.memory_store[thread_id][-limit:]
-            return []
+            history = self.memory_store.get(thread_id)
+            if not history or limit <= 0:
+                return []
+            # deques do not slice; skip to the last `limit` entries
+            return list(islice(history, max(len(history) - limit, 0), None))
         except Exception as e:
             print(f"Error getting conversation history: {e}")
             return []
@@ -281,44 +856,138 @@ class LangGraphMemoryProvider(MemoryProvider):
         """Store conversation context."""
         try:
             if context.thread_id not in self.memory_store:
-                self.memory_store[context.thread_id] = []
-            # Store context in memory
+                self.memory_store[context.thread_id] = deque(maxlen=self.max_history)
+            # Store context in memory; beyond max_history the oldest is dropped
+            self.memory_store[context.thread_id].append(context)
             return True
         except Exception as e:
             print(f"Error storing conversation context: {e}")
             return False
 
-    def get_conversation_context(self, context: ConversationContext) -> Optional[ConversationContext]:
+    def get_conversation_context(self, thread_id: str) -> Optional[ConversationContext]:
         """Retrieve conversation context."""
         try:
-            if context.thread_id in self.memory_store:
-                return self.memory_store[context.thread_id][-1]  # Return latest
+            if self.memory_store.get(thread_id):
+                return self.memory_store[thread_id][-1]  # Return latest
             return None
         except Exception as e:
             print(f"Error getting conversation context: {e}")
             return None
 
 
+class RetrievalCoalescer:
+    """
+    Coalesces concurrent semantic searches into batched provider calls.
+    
+    Searches submitted from several threads within a short window are grouped by
+    metadata filter and sent to the provider together, so each group costs one
+    embedding request and one vector store query instead of one of each per search.
+    """
+
+    def __init__(self, retrieve_batch: Callable[[List[str], int, Optional[Dict]], List[List[MemoryEntry]]],
+                 window_ms: float = 10.0, max_batch: int = 16):
+        """
+        Start the coalescer and its background dispatch thread.
+        
+        Args:
+            retrieve_batch: Runs one batch: (queries, limit, metadata_filter) -> results per query
+            window_ms: How long to wait for more searches after the first one arrives
+            max_batch: Dispatch as soon as this many searches are waiting
+        """
+        self.retrieve_batch = retrieve_batch
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self._pending: "queue.Queue" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="memory-retrieval-coalescer", daemon=True)
+        self._thread.start()
+
+    def retrieve(self, query: str, limit: int = 5, metadata_filter: Optional[Dict] = None) -> List[MemoryEntry]:
+        """Run a semantic search as part of the next batch and wait for its results."""
+        future: Future = Future()
+        self._pending.put((query, limit, metadata_filter, future))
+        return future.result()
+
+    def close(self) -> None:
+        """Stop the dispatch thread once the searches already submitted have run."""
+        self._pending.put(None)
+        self._thread.join()
+
+    def _run(self) -> None:
+        """Collect searches for one window (or until max_batch) and dispatch them, until closed."""
+        while True:
+            request = self._pending.get()
+            if request is None:
+                return
+            batch = [request]
+            deadline = time.monotonic() + self.window
+            closed = False
+            while len(batch) < self.max_batch:
+                try:
+                    request = self._pending.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                if request is None:
+                    closed = True
+                    break
+                batch.append(request)
+            self._dispatch(batch)
+            if closed:
+                return
+
+    def _dispatch(self, batch: List[Tuple[str, int, Optional[Dict], Future]]) -> None:
+        """Run a batch of searches, one provider call per metadata filter."""
+        groups: Dict[str, List[Tuple[str, int, Optional[Dict], Future]]] = {}
+        for request in batch:
+            groups.setdefault(_dumps(request[2] or {}, sort_keys=True), []).append(request)
+
+        for requests in groups.values():
+            try:
+                results = self.retrieve_batch(
+                    [query for query, _, _, _ in requests],
+                    max(limit for _, limit, _, _ in requests),
+                    requests[0][2]
+                )
+            except Exception as e:
+                for _, _, _, future in requests:
+                    future.set_exception(e)
+                continue
+            for (_, limit, _, future), memories in zip(requests, results):
+                future.set_result(memories[:limit])
+
+
 class MemoryManager:
     """Central memory management system coordinating multiple memory providers."""
 
     def __init__(self, config: Optional[Dict[str, Any]] = None):
         self.config = config or self._default_config()
         self.providers = {}
+        self._warmup_thread: Optional[threading.Thread] = None
+        # Prefilled conversation contexts by thread_id
+        self._windows: Dict[str, ConversationContext] = {}
+        # Optionally coalesce concurrent vector searches into batches (0 disables)
+        window_ms = self.config.get("vector_store", {}).get("coalesce_window_ms", 0)
+        self._coalescer = RetrievalCoalescer(self._retrieve_vector_batch, window_ms) if window_ms > 0 else None
+
+        # Memory id sequence; starting from the wall clock keeps ids unique across restarts
+        # (stored ids persist, and ChromaDB ignores adds that reuse one)
+        self._id_counter = count(time.time_ns())
 
         # Initialize providers
         self._initialize_providers()
 
-    def _default_config(self) -> Dict[str, Any]:
+    @staticmethod
+    def _default_config() -> Dict[str, Any]:
         """Get default memory configuration."""
         return {
             "vector_store": {
                 "provider": "chroma",
                 "collection_name": "agent_memory",
-                "persist_directory": "./chroma_db"
+                "persist_directory": "./chroma_db",
+                "embedding_model": DEFAULT_EMBEDDING_MODEL
             },
             "langgraph": {
-                "enabled": True
+                "enabled": True,
+                "max_history": 256
             },
             "enable_persistence": True
         }
@@ -331,59 +1000,234 @@ class MemoryManager:
             try:
                 self.providers["vector"] = ChromaMemoryProvider(
                     collection_name=vector_config.get("collection_name", "agent_memory"),
-                    persist_directory=vector_config.get("persist_directory", "./chroma_db")
+                    persist_directory=vector_config.get("persist_directory", "./chroma_db"),
+                    embedding_model=vector_config.get("embedding_model", DEFAULT_EMBEDDING_MODEL),
+                    embedding_dimensions=vector_config.get("embedding_dimensions"),
+                    shard_by_thread=vector_config.get("shard_by_thread", False)
                 )
                 print("✅ ChromaDB memory provider initialized")
             except ImportError:
                 print("⚠️ ChromaDB not available, vector memory disabled")
             except Exception as e:
                 print(f"⚠️ Failed to initialize ChromaDB: {e}")
+        elif vector_config.get("provider") == "faiss":
+            try:
+                self.providers["vector"] = FAISSMemoryProvider(
+                    embedding_model=vector_config.get("embedding_model", DEFAULT_EMBEDDING_MODEL),
+                    embedding_dimensions=vector_config.get("embedding_dimensions")
+                )
+                print("✅ FAISS memory provider initialized")
+            except ImportError as e:
+                print(f"⚠️ {e}; vector memory disabled")
+            except Exception as e:
+                print(f"⚠️ Failed to initialize FAISS: {e}")
 
         # Initialize LangGraph provider
-        if self.config.get("langgraph", {}).get("enabled", True):
-            self.providers["langgraph"] = LangGraphMemoryProvider()
+        langgraph_config = self.config.get("langgraph", {})
+        if langgraph_config.get("enabled", True):
+            self.providers["langgraph"] = LangGraphMemoryProvider(
+                checkpoint_mode=langgraph_config.get("checkpoint_mode", "per_node"),
+                max_history=langgraph_config.get("max_history", 256)
+            )
             print("✅ LangGraph memory provider initialized")
 
+    def warmup(self) -> threading.Thread:
+        """
+        Warm up all providers on a background thread (started at most once).
+        
+        Returns:
+            The warmup thread, which callers may join
+        """
+        if self._warmup_thread is None:
+            self._warmup_thread = threading.Thread(
+                target=lambda: [provider.warmup() for provider in list(self.providers.values())],
+                name="memory-warmup",
+                daemon=True
+            )
+            self._warmup_thread.start()
+        return self._warmup_thread
+
+    def _provider(self, name: str) -> Optional[MemoryProvider]:
+        """Look up a provider by name, warning when it is not available."""
+        memory_provider = self.providers.get(name)
+        if memory_provider is None:
+            print(f"⚠️ Memory provider '{name}' not available")
+        return memory_provider
+
     def store_memory(self, entry: MemoryEntry, provider: str = "vector") -> bool:
         """Store a memory entry using specified provider."""
-        if provider not in self.providers:
-            print(f"⚠️ Memory provider '{provider}' not available")
+        memory_provider = self._provider(provider)
+        if memory_provider is None:
+            return False
+
+        stored = memory_provider.store_memory(entry)
+        if stored:
+            self._update_windows([entry])
+        return stored
+
+    def store_memories_batch(self, entries: List[MemoryEntry], provider: str = "vector") -> bool:
+        """
+        Store several memory entries with one provider write.
+        
+        Args:
+            entries: Memory entries to store
+            provider: Name of the provider to store them in
+            
+        Returns:
+            True if every entry was stored
+        """
+        memory_provider = self._provider(provider)
+        if memory_provider is None:
             return False
 
-        return self.providers[provider].store_memory(entry)
+        entries = list(entries)
+        stored = memory_provider.store_memories(entries)
+        if stored:
+            self._update_windows(entries)
+        return stored
+
+    def _update_windows(self, entries: List[MemoryEntry]) -> None:
+        """Add newly stored entries to the prefilled window of their thread, if any."""
+        for entry in entries:
+            context = self._windows.get(entry.metadata.get("thread_id"))
+            if context is not None:
+                context._hot_cache[entry.id] = entry
+
+    def prefill_window(self, context: ConversationContext, top_k: int = 32,
+                       provider: str = "vector") -> int:
+        """
+        Load a thread's most recent memories into its context's in-process window.
+        
+        Later search_memories calls for the thread are answered from the window
+        when it has matches, skipping a vector store query.
+        
+        Args:
+            context: Conversation context whose window to fill
+            top_k: Maximum number of entries to load
+            provider: Memory provider to load them from
+            
+        Returns:
+            Number of entries in the window
+        """
+        context._hot_cache.clear()
+        for entry in self.get_conversation_history(context.thread_id, limit=top_k, provider=provider):
+            context._hot_cache[entry.id] = entry
+        self._windows[context.thread_id] = context
+        return len(context._hot_cache)
+
+    def search_memories(self, query: str, thread_id: Optional[str] = None, limit: int = 5,
+                        metadata_filter: Optional[Dict[str, Any]] = None,
+                        provider: str = "vector") -> List[MemoryEntry]:
+        """
+        Search memories, checking the thread's prefilled window before the vector store.
+        
+        Args:
+            query: Text to search for
+            thread_id: Restrict the search to one conversation thread
+            limit: Maximum number of memories to return
+            metadata_filter: Metadata values the memories must match
+            provider: Memory provider to search on a window miss
+            
+        Returns:
+            Matching memory entries
+        """
+        metadata_filter = dict(metadata_filter or {})
+        context = self._windows.get(thread_id) if thread_id is not None else None
+        if context is not None:
+            needle = query.casefold()
+            hits = [
+                entry for entry in context._hot_cache.values()
+                if needle in entry.content.casefold()
+                and all(entry.metadata.get(key) == value for key, value in metadata_filter.items())
+            ]
+            if hits:
+                hits.sort(key=lambda entry: entry.timestamp, reverse=True)
+                return hits[:limit]
+
+        if thread_id is not None:
+            metadata_filter["thread_id"] = thread_id
+        return self.retrieve_memories(query, limit, provider, metadata_filter or None)
 
     def retrieve_memories(self, query: str, limit: int = 5, provider: str = "vector",
                          metadata_filter: Optional[Dict] = None) -> List[MemoryEntry]:
         """Retrieve memories using specified provider."""
-        if provider not in self.providers:
-            print(f"⚠️ Memory provider '{provider}' not available")
+        memory_provider = self._provider(provider)
+        if memory_provider is None:
             return []
 
-        return self.providers[provider].retrieve_memories(query, limit, metadata_filter)
+        if provider == "vector" and self._coalescer is not None:
+            return self._coalescer.retrieve(query, limit, metadata_filter)
+        return memory_provider.retrieve_memories(query, limit, metadata_filter)
+
+    def _retrieve_vector_batch(self, queries: List[str], limit: int,
+                               metadata_filter: Optional[Dict]) -> List[List[MemoryEntry]]:
+        """Run one coalesced batch of searches on the current vector provider."""
+        return self.providers["vector"].retrieve_memories_batch(queries, limit, metadata_filter)
+
+    def batch_query(self, queries: List[MemoryQuery], provider: str = "vector") -> List[List[MemoryEntry]]:
+        """
+        Run several memory lookups, batching the semantic searches.
+        
+        Semantic queries sharing a metadata filter are sent to the provider together,
+        so they need one embedding request and one vector store query.
+        
+        Args:
+            queries: Lookups to run; a query with a thread_id fetches conversation history
+            provider: Memory provider to use
+            
+        Returns:
+            One list of memory entries per query, in the same order
+        """
+        memory_provider = self._provider(provider)
+        if memory_provider is None:
+            return [[] for _ in queries]
+
+        results: List[List[MemoryEntry]] = [[] for _ in queries]
+
+        # Group semantic searches by filter so each group is one provider call
+        groups: Dict[str, List[int]] = {}
+        for index, spec in enumerate(queries):
+            if spec.thread_id is not None:
+                results[index] = memory_provider.get_conversation_history(spec.thread_id, spec.limit)
+            elif spec.query is not None:
+                key = _dumps(spec.metadata_filter or {}, sort_keys=True)
+                groups.setdefault(key, []).append(index)
+
+        for indices in groups.values():
+            limit = max(queries[index].limit for index in indices)
+            batch = memory_provider.retrieve_memories_batch(
+                [queries[index].query for index in indices],
+                limit,
+                queries[indices[0]].metadata_filter
+            )
+            for index, memories in zip(indices, batch):
+                results[index] = memories[:queries[index].limit]
+
+        return results
 
     def get_conversation_history(self, thread_id: str, limit: int = 10, provider: str = "vector") -> List[MemoryEntry]:
         """Get conversation history for a thread."""
-        if provider not in self.providers:
-            print(f"⚠️ Memory provider '{provider}' not available")
+        memory_provider = self._provider(provider)
+        if memory_provider is None:
             return []
 
-        return self.providers[provider].get_conversation_history(thread_id, limit)
+        return memory_provider.get_conversation_history(thread_id, limit)
 
     def store_conversation_context(self, context: ConversationContext, provider: str = "vector") -> bool:
         """Store conversation context."""
-        if provider not in self.providers:
-            print(f"⚠️ Memory provider '{provider}' not available")
+        memory_provider = self._provider(provider)
+        if memory_provider is None:
             return False
 
-        return self.providers[provider].store_conversation_context(context)
+        return memory_provider.store_conversation_context(context)
 
     def get_conversation_context(self, thread_id: str, provider: str = "vector") -> Optional[ConversationContext]:
         """Retrieve conversation context."""
-        if provider not in self.providers:
-            print(f"⚠️ Memory provider '{provider}' not available")
+        memory_provider = self._provider(provider)
+        if memory_provider is None:
             return None
 
-        return self.providers[provider].get_conversation_context(thread_id)
+        return memory_provider.get_conversation_context(thread_id)
 
     def get_langgraph_checkpointer(self) -> Optional[MemorySaver]:
         """Get LangGraph checkpointer for workflow persistence."""
@@ -391,62 +1235,147 @@ class MemoryManager:
             return self.providers["langgraph"].checkpointer
         return None
 
+    def flush_checkpoints(self, thread_id: Optional[str] = None) -> int:
+        """
+        Write buffered LangGraph checkpoints (end_of_workflow checkpoint mode).
+        
+        Args:
+            thread_id: Thread to flush (default: all threads)
+            
+        Returns:
+            Number of checkpoint writes applied (0 in per_node mode)
+        """
+        checkpointer = self.get_langgraph_checkpointer()
+        if isinstance(checkpointer, BufferedMemorySaver):
+            return checkpointer.flush(thread_id)
+        return 0
+
+    def new_memory_id(self, thread_id: str, kind: str) -> str:
+        """
+        Generate a unique memory entry id.
+        
+        Args:
+            thread_id: Thread the entry belongs to
+            kind: Short label for the entry (e.g. "user", "agent")
+            
+        Returns:
+            An id of the form "<thread_id>:<kind>:<16 hex digits>", increasing per manager
+        """
+        return f"{thread_id}:{kind}:{next(self._id_counter):016x}"
+
     def store_conversation_memory(self, thread_id: str, user_input: str, agent_response: str,
                                 metadata: Optional[Dict] = None):
         """Store a conversation turn in memory."""
-        # Store user input
+        # Both sides of the turn share one timestamp; history orders them by id sequence
+        now = datetime.now()
+
+        # User input
         user_memory = MemoryEntry(
-            id=f"{thread_id}_user_{datetime.now().isoformat()}",
+            id=self.new_memory_id(thread_id, "user"),
             content=user_input,
             metadata={"thread_id": thread_id, "role": "user", **(metadata or {})},
+            timestamp=now,
             memory_type="conversation"
         )
-        self.store_memory(user_memory)
 
-        # Store agent response
+        # Agent response
         agent_memory = MemoryEntry(
-            id=f"{thread_id}_agent_{datetime.now().isoformat()}",
+            id=self.new_memory_id(thread_id, "agent"),
             content=agent_response,
             metadata={"thread_id": thread_id, "role": "agent", **(metadata or {})},
+            timestamp=now,
             memory_type="conversation"
         )
-        self.store_memory(agent_memory)
 
-    def get_relevant_context(self, thread_id: str, current_query: str, limit: int = 3) -> str:
-        """Get relevant conversation context for the current query."""
-        # Get recent conversation history
-        history = self.get_conversation_history(thread_id, limit=limit*2)
-
-        if not history:
-            return ""
+        # Store both sides of the turn in one write
+        self.store_memories_batch([user_memory, agent_memory])
+
+    def get_relevant_context(self, thread_id: str, current_query: str, limit: int = 3,
+                             include_history: bool = True) -> str:
+        """
+        Get relevant conversation context for the current query.
+        
+        Args:
+            thread_id: Conversation thread to read recent messages from
+            current_query: Query to find semantically similar past memories for
+            limit: Number of recent messages and of past memories to include
+            include_history: Whether to include recent messages; callers that manage
+                history themselves pass False to skip reading it
+            
+        Returns:
+            Formatted context, or "" when the thread has no history (or, without
+            history, when nothing similar was found)
+        """
+        history: List[MemoryEntry] = []
+        metadata_filter = None
+        if include_history:
+            # Get recent conversation history (only the messages that are shown); recent
+            # turns are normally served from the provider's in-memory history
+            history = self.get_conversation_history(thread_id, limit=limit)
+            if not history:
+                return ""
+            # The vector store skips the messages already shown, so the search returns
+            # up to `limit` new matches instead of spending results on duplicates
+            metadata_filter = {"id": {"$nin": [memory.id for memory in history]}}
 
         # Get semantically similar memories
-        relevant_memories = self.retrieve_memories(current_query, limit=limit)
+        relevant_memories = self.retrieve_memories(current_query, limit=limit, metadata_filter=metadata_filter)
 
-        # Combine and format context
+        # Combine and format context: the last N messages, then past matches not among them
         context_parts = []
-
         if history:
             context_parts.append("Recent conversation:")
-            for memory in history[-limit:]:  # Last N messages
-                role = memory.metadata.get("role", "unknown")
-                context_parts.append(f"{role.title()}: {memory.content}")
+            context_parts.extend(
+                f"{_role_label(memory.metadata.get('role', 'unknown'))}: {memory.content}"
+                for memory in history
+            )
 
-        if relevant_memories:
-            context_parts.append("\nRelevant past context:")
-            for memory in relevant_memories:
-                if memory not in history:  # Avoid duplicates
-                    context_parts.append(f"Past: {memory.content}")
+        past = [f"Past: {memory.content}" for memory in relevant_memories]
+        if past:
+            context_parts.append("\nRelevant past context:" if context_parts else "Relevant past context:")
+            context_parts.extend(past)
 
         return "\n".join(context_parts)
 
 
 # Global memory manager instance
-_memory_manager = None
-
-def get_memory_manager(config: Optional[Dict[str, Any]] = None) -> MemoryManager:
-    """Get the global memory manager instance."""
+_memory_manager: Optional[MemoryManager] = None
+_memory_manager_lock = threading.Lock()
+
+def get_memory_manager(config: Optional[Dict[str, Any]] = None, preload: bool = False,
+                       embedding_model: Optional[str] = None, persist: bool = True) -> MemoryManager:
+    """
+    Get the global memory manager instance.
+    
+    Args:
+        config: Memory configuration used when the manager is first created
+        preload: Whether to warm up the providers on a background thread
+        embedding_model: Vector store embedding model used when the manager is first
+            created (default: DEFAULT_EMBEDDING_MODEL)
+        persist: Whether vector memory outlives the process; False uses an
+            in-process FAISS index instead of ChromaDB when FAISS is installed
+        
+    Returns:
+        The global MemoryManager
+    
+    Thread-safe: concurrent first calls build a single manager (and a single set of
+    vector store clients), and later calls return it without taking the lock.
+    """
     global _memory_manager
-    if _memory_manager is None:
-        _memory_manager = MemoryManager(config)
-    return _memory_manager
\ No newline at end of file
+    manager = _memory_manager
+    if manager is None:
+        with _memory_manager_lock:
+            if _memory_manager is None:
+                if embedding_model or (not persist and FAISS_AVAILABLE):
+                    config = dict(config or MemoryManager._default_config())
+                    vector_config = dict(config.get("vector_store", {}))
+                    if embedding_model:
+                        vector_config["embedding_model"] = embedding_model
+                    if not persist and FAISS_AVAILABLE:
+                        vector_config["provider"] = "faiss"
+                    config["vector_store"] = vector_config
+                _memory_manager = MemoryManager(config)
+            manager = _memory_manager
+    if preload:
+        manager.warmup()
+    return manager
\ No newline at end of file
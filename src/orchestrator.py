@@ -6,13 +6,16 @@ specialized agents only when needed. Uses LangGraph for workflow management.
 """
 
 import os
+import math
 from typing import List, Dict, Any, Optional
-from datetime import datetime
 import json
+import shelve
+import threading
+from dataclasses import fields
+from concurrent.futures import ThreadPoolExecutor
 
-from langgraph.graph import StateGraph, END
-from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.runnables import RunnableConfig
 import dotenv
 
 from .state import (
@@ -24,13 +27,108 @@ from .utils import (
     generate_agent_id, create_agent_prompt
 )
 from .agent_registry import get_registry
-from .memory import get_memory_manager, MemoryEntry, ConversationContext
+
+# LangGraph, the OpenAI client and the memory backends are imported on first use,
+# so importing this module (or the src package) stays cheap
 
 
 # Load environment variables
 dotenv.load_dotenv()
 
 
+# Set to a file path to persist cached simple-task answers across runs (via shelve)
+TRIVIAL_CACHE_ENV = "AGENTSPAWN_TRIVIAL_CACHE"
+
+# Answers to simple tasks, keyed by model and normalized task text
+_TRIVIAL_CACHE: Dict[str, str] = {}
+_trivial_cache_lock = threading.Lock()
+
+
+def _trivial_cache_get(key: str) -> Optional[str]:
+    """Look up a cached simple-task answer in memory, then in the shelve file."""
+    with _trivial_cache_lock:
+        if key in _TRIVIAL_CACHE:
+            return _TRIVIAL_CACHE[key]
+        path = os.getenv(TRIVIAL_CACHE_ENV)
+        if not path:
+            return None
+        with shelve.open(os.path.expanduser(path)) as db:
+            answer = db.get(key)
+        if answer is not None:
+            _TRIVIAL_CACHE[key] = answer
+        return answer
+
+
+def _trivial_cache_put(key: str, answer: str) -> None:
+    """Cache a simple-task answer in memory and, if configured, in the shelve file."""
+    with _trivial_cache_lock:
+        _TRIVIAL_CACHE[key] = answer
+        path = os.getenv(TRIVIAL_CACHE_ENV)
+        if path:
+            with shelve.open(os.path.expanduser(path)) as db:
+                db[key] = answer
+
+
+# Workflow nodes in execution order, mapped to the Orchestrator method each one runs
+_WORKFLOW_NODES = (
+    ("load_memory", "load_memory_node"),
+    ("assess_complexity", "assess_complexity_node"),
+    ("decide_agents", "decide_agents_node"),
+    ("spawn_agents", "spawn_agents_node"),
+    ("aggregate_results", "aggregate_results_node"),
+    ("store_memory", "store_memory_node"),
+)
+
+# Compiled workflows shared by all orchestrators, keyed by checkpointer
+_compiled_workflows: Dict[Any, Any] = {}
+_compiled_workflows_lock = threading.Lock()
+
+
+def _dispatch_node(method_name: str):
+    """Create a workflow node that runs a method of the invoking orchestrator."""
+    def node(state: OrchestratorState, config: RunnableConfig) -> OrchestratorState:
+        orchestrator = config["configurable"]["orchestrator"]
+        return getattr(orchestrator, method_name)(state)
+    node.__name__ = method_name
+    return node
+
+
+def _get_compiled_workflow(checkpointer: Optional[Any] = None):
+    """
+    Get the compiled orchestration workflow for a checkpointer.
+    
+    The graph topology is the same for every orchestrator, so it is compiled once
+    per checkpointer and shared. Nodes look up the orchestrator to run against in
+    the invocation config (see Orchestrator.process_task).
+    
+    Args:
+        checkpointer: Optional LangGraph checkpointer for state persistence
+        
+    Returns:
+        Compiled LangGraph workflow
+    """
+    with _compiled_workflows_lock:
+        compiled_workflow = _compiled_workflows.get(checkpointer)
+        if compiled_workflow is None:
+            from langgraph.graph import StateGraph, END
+            
+            workflow = StateGraph(OrchestratorState)
+            
+            # Add workflow nodes
+            for node_name, method_name in _WORKFLOW_NODES:
+                workflow.add_node(node_name, _dispatch_node(method_name))
+            
+            # Chain the nodes in order
+            workflow.set_entry_point(_WORKFLOW_NODES[0][0])
+            for (node_name, _), (next_name, _) in zip(_WORKFLOW_NODES, _WORKFLOW_NODES[1:]):
+                workflow.add_edge(node_name, next_name)
+            workflow.add_edge(_WORKFLOW_NODES[-1][0], END)
+            
+            compiled_workflow = workflow.compile(checkpointer=checkpointer)
+            _compiled_workflows[checkpointer] = compiled_workflow
+        return compiled_workflow
+
+
 class Orchestrator:
     """
     Main orchestrator agent that analyzes task complexity and spawns sub-agents.
@@ -43,7 +141,8 @@ class Orchestrator:
     - Persistent memory for conversation continuity
     """
     
-    def __init__(self, model_name: str = "gpt-4", temperature: float = 0.7, enable_memory: bool = True):
+    def __init__(self, model_name: str = "gpt-4", temperature: float = 0.7, enable_memory: bool = True,
+                 cache_simple_tasks: bool = False):
         """
         Initialize the orchestrator.
         
@@ -51,18 +150,20 @@ class Orchestrator:
             model_name: LLM model to use (default: gpt-4)
             temperature: Temperature for LLM responses
             enable_memory: Whether to enable persistent memory
+            cache_simple_tasks: Whether to answer repeated simple tasks (no agents,
+                no thread) from a cache instead of calling the LLM again
         """
         self.model_name = model_name
         self.temperature = temperature
         self.enable_memory = enable_memory
+        self.cache_simple_tasks = cache_simple_tasks
         
-        self.llm = ChatOpenAI(
-            model=model_name,
-            temperature=temperature,
-            api_key=os.getenv("OPENROUTER_API_KEY") or os.getenv("OPENAI_API_KEY"),
-            base_url="https://openrouter.ai/api/v1" if os.getenv("OPENROUTER_API_KEY") else None
-        )
+        from .agents._llm_pool import get_chat_llm
+        from .memory import get_memory_manager
+        
+        self.llm = get_chat_llm(model_name, temperature)
         self.registry = get_registry()
+        self._usage_lock = threading.Lock()
         
         # Initialize memory manager
         self.memory_manager = get_memory_manager() if enable_memory else None
@@ -70,41 +171,22 @@ class Orchestrator:
         # Build workflow with memory support
         self.workflow = self._build_workflow()
     
-    def _build_workflow(self) -> StateGraph:
+    def _build_workflow(self):
         """
-        Build the LangGraph workflow for orchestration with memory support.
+        Get the LangGraph workflow for orchestration with memory support.
         
-        Returns:
-            Configured StateGraph with memory integration
-        """
-        workflow = StateGraph(OrchestratorState)
-        
-        # Add workflow nodes
-        workflow.add_node("load_memory", self.load_memory_node)
-        workflow.add_node("assess_complexity", self.assess_complexity_node)
-        workflow.add_node("decide_agents", self.decide_agents_node)
-        workflow.add_node("spawn_agents", self.spawn_agents_node)
-        workflow.add_node("aggregate_results", self.aggregate_results_node)
-        workflow.add_node("store_memory", self.store_memory_node)
-        
-        # Add edges with memory integration
-        workflow.set_entry_point("load_memory")
-        workflow.add_edge("load_memory", "assess_complexity")
-        workflow.add_edge("assess_complexity", "decide_agents")
-        workflow.add_edge("decide_agents", "spawn_agents")
-        workflow.add_edge("spawn_agents", "aggregate_results")
-        workflow.add_edge("aggregate_results", "store_memory")
-        workflow.add_edge("store_memory", END)
-        
-        # Compile with memory checkpointer if available
-        compiled_workflow = workflow.compile()
+        The compiled workflow is shared between orchestrators using the same
+        checkpointer, so constructing further orchestrators does not rebuild it.
         
+        Returns:
+            Compiled StateGraph with memory integration
+        """
+        # Use the memory checkpointer if available
+        checkpointer = None
         if self.memory_manager and self.enable_memory:
             checkpointer = self.memory_manager.get_langgraph_checkpointer()
-            if checkpointer:
-                compiled_workflow = workflow.compile(checkpointer=checkpointer)
         
-        return compiled_workflow
+        return _get_compiled_workflow(checkpointer)
     
     def load_memory_node(self, state: OrchestratorState) -> OrchestratorState:
         """
@@ -259,27 +341,36 @@ class Orchestrator:
         if not required_agents:
             # No agents to spawn, handle with direct LLM reasoning
             state.workflow_status = "executing"
-            response = self._direct_reasoning(task)
+            response = self._direct_reasoning(
+                task, max_tokens=state.max_response_tokens,
+                cache_key=state.prompt_cache_key, usage=state.token_usage
+            )
             state.final_response = response
             return state
         
-        # Spawn and execute each required agent
+        # Spawn all required agents up front
+        spawned = []
         for agent_type in required_agents:
             agent_id = generate_agent_id(agent_type)
-            
-            try:
-                agent = SpawnedAgent(agent_type=AgentType(agent_type), agent_id=agent_id)
-                state.add_agent(agent)
-                
-                # Execute the agent
-                agent_response = self._execute_agent(agent_type, task, state)
-                
-                state.update_agent_result(agent_id, agent_response, "completed")
-                
-            except Exception as e:
-                error_msg = f"Error executing agent {agent_type}: {str(e)}"
-                state.add_error(error_msg)
-                state.update_agent_result(agent_id, "", "failed")
+            agent = SpawnedAgent(agent_type=AgentType(agent_type), agent_id=agent_id)
+            state.add_agent(agent)
+            spawned.append((agent_type, agent_id))
+        
+        # Agents are independent LLM round-trips, so execute them concurrently
+        with ThreadPoolExecutor(max_workers=len(spawned)) as executor:
+            futures = [
+                (agent_type, agent_id, executor.submit(self._execute_agent, agent_type, task, state))
+                for agent_type, agent_id in spawned
+            ]
+            for agent_type, agent_id, future in futures:
+                try:
+                    agent_response = future.result()
+                    state.update_agent_result(agent_id, agent_response, "completed")
+                    
+                except Exception as e:
+                    error_msg = f"Error executing agent {agent_type}: {str(e)}"
+                    state.add_error(error_msg)
+                    state.update_agent_result(agent_id, "", "failed")
         
         state.workflow_status = "executed"
         return state
@@ -305,7 +396,10 @@ class Orchestrator:
         if state.spawned_agent_results:
             aggregated_response = self._aggregate_agent_results(
                 state.task_metadata.user_input,
-                state.spawned_agent_results
+                state.spawned_agent_results,
+                max_tokens=state.max_response_tokens,
+                cache_key=state.prompt_cache_key,
+                usage=state.token_usage
             )
             state.final_response = aggregated_response
         else:
@@ -327,6 +421,8 @@ class Orchestrator:
         if not self.memory_manager or not self.enable_memory:
             return state
         
+        from .memory import MemoryEntry
+        
         try:
             thread_id = state.thread_id or f"thread_{state.task_metadata.task_id}"
             user_input = state.task_metadata.user_input
@@ -346,20 +442,23 @@ class Orchestrator:
             )
             
             # Store agent results as separate memories for better retrieval
-            for agent in state.spawned_agents:
-                if agent.result:
-                    agent_memory = MemoryEntry(
-                        id=f"{thread_id}_agent_{agent.agent_id}_{datetime.now().isoformat()}",
-                        content=f"Agent {agent.agent_type.value} result: {agent.result}",
-                        metadata={
-                            "thread_id": thread_id,
-                            "agent_type": agent.agent_type.value,
-                            "agent_id": agent.agent_id,
-                            "task_id": state.task_metadata.task_id
-                        },
-                        memory_type="agent_result"
-                    )
-                    self.memory_manager.store_memory(agent_memory)
+            agent_memories = [
+                MemoryEntry(
+                    id=self.memory_manager.new_memory_id(thread_id, agent.agent_id),
+                    content=f"Agent {agent.agent_type.value} result: {agent.result}",
+                    metadata={
+                        "thread_id": thread_id,
+                        "agent_type": agent.agent_type.value,
+                        "agent_id": agent.agent_id,
+                        "task_id": state.task_metadata.task_id
+                    },
+                    memory_type="agent_result"
+                )
+                for agent in state.spawned_agents
+                if agent.result
+            ]
+            if agent_memories:
+                self.memory_manager.store_memories_batch(agent_memories)
             
             state.orchestrator_reasoning += f"\nStored conversation and results in memory for thread {thread_id}."
             
@@ -404,16 +503,15 @@ Please consider the previous context when responding to maintain continuity."""
                 SystemMessage(content=config.system_prompt),
                 HumanMessage(content=prompt)
             ]
-            response = self.llm.invoke(messages)
-            return response.content
+            return self._invoke_llm(
+                messages, cache_key=state.prompt_cache_key, usage=state.token_usage
+            )
 
         # Execute agent with tool support and memory context
         try:
             if hasattr(agent_instance, 'analyze'):
-                # Data analyst agent with memory context
+                # Data analyst agent with memory context (records its tool usage in state.tool_usage)
                 result = agent_instance.analyze(enhanced_task, tool_usage=state.tool_usage)
-                # Add tool usage to state
-                state.tool_usage.extend(result.get('tool_usage', []))
                 return result.get('analysis', 'No analysis provided')
             elif hasattr(agent_instance, 'adapt_to_task'):
                 # Meta-learning agent
@@ -426,18 +524,60 @@ Please consider the previous context when responding to maintain continuity."""
                     SystemMessage(content=config.system_prompt),
                     HumanMessage(content=prompt)
                 ]
-                response = self.llm.invoke(messages)
-                return response.content
+                return self._invoke_llm(
+                    messages, cache_key=state.prompt_cache_key, usage=state.token_usage
+                )
 
         except Exception as e:
             return f"Agent execution failed: {str(e)}"
     
-    def _direct_reasoning(self, task: str) -> str:
+    def _invoke_llm(self, messages: List[Any], max_tokens: Optional[int] = None,
+                    cache_key: Optional[str] = None,
+                    usage: Optional[Dict[str, int]] = None) -> str:
+        """
+        Invoke the orchestrator LLM, optionally capping the response length.
+        
+        Messages are always sent system prompt first, so follow-up calls share a
+        stable prefix that the provider can serve from its prompt cache.
+        
+        Args:
+            messages: Chat messages to send
+            max_tokens: Optional output token limit
+            cache_key: Optional prompt cache key (e.g. the conversation thread ID)
+            usage: Optional dict to accumulate input/cached/output token counts into
+            
+        Returns:
+            Response content
+        """
+        bind_kwargs: Dict[str, Any] = {}
+        if max_tokens:
+            bind_kwargs["max_tokens"] = max_tokens
+        if cache_key:
+            bind_kwargs["extra_body"] = {"prompt_cache_key": cache_key}
+        llm = self.llm.bind(**bind_kwargs) if bind_kwargs else self.llm
+        response = llm.invoke(messages)
+        
+        usage_metadata = getattr(response, "usage_metadata", None)
+        if usage is not None and usage_metadata:
+            cached = (usage_metadata.get("input_token_details") or {}).get("cache_read", 0)
+            with self._usage_lock:
+                usage["input_tokens"] = usage.get("input_tokens", 0) + usage_metadata.get("input_tokens", 0)
+                usage["cached_input_tokens"] = usage.get("cached_input_tokens", 0) + (cached or 0)
+                usage["output_tokens"] = usage.get("output_tokens", 0) + usage_metadata.get("output_tokens", 0)
+        
+        return response.content
+    
+    def _direct_reasoning(self, task: str, max_tokens: Optional[int] = None,
+                          cache_key: Optional[str] = None,
+                          usage: Optional[Dict[str, int]] = None) -> str:
         """
         Perform direct reasoning without spawning agents.
         
         Args:
             task: The task to reason about
+            max_tokens: Optional output token limit
+            cache_key: Optional prompt cache key
+            usage: Optional dict to accumulate token usage into
             
         Returns:
             LLM response
@@ -450,8 +590,7 @@ Focus on being direct and practical in your responses."""
             HumanMessage(content=task)
         ]
         
-        response = self.llm.invoke(messages)
-        return response.content
+        return self._invoke_llm(messages, max_tokens=max_tokens, cache_key=cache_key, usage=usage)
     
     def _is_novel_task(self, task: str, keywords: List[str]) -> bool:
         """
@@ -466,12 +605,8 @@ Focus on being direct and practical in your responses."""
         """
         # Get all registered agent capabilities
         all_capabilities = set()
-        for agent_type in self.registry.list_agents().keys():
-            try:
-                capabilities = self.registry.get_agent_capabilities(agent_type)
-                all_capabilities.update(capabilities)
-            except:
-                continue
+        for config in self.registry.list_agents().values():
+            all_capabilities.update(config.capabilities)
         
         # Check if any keywords match known capabilities
         keyword_matches = any(keyword.lower() in cap.lower() for keyword in keywords for cap in all_capabilities)
@@ -479,13 +614,19 @@ Focus on being direct and practical in your responses."""
         # If no keyword matches and task is complex, consider it novel
         return not keyword_matches
     
-    def _aggregate_agent_results(self, task: str, results: Dict[str, str]) -> str:
+    def _aggregate_agent_results(self, task: str, results: Dict[str, str],
+                                 max_tokens: Optional[int] = None,
+                                 cache_key: Optional[str] = None,
+                                 usage: Optional[Dict[str, int]] = None) -> str:
         """
         Aggregate results from multiple agents into a cohesive response.
         
         Args:
             task: Original task
             results: Dictionary of agent_id -> result
+            max_tokens: Optional output token limit
+            cache_key: Optional prompt cache key
+            usage: Optional dict to accumulate token usage into
             
         Returns:
             Aggregated final response
@@ -509,16 +650,74 @@ Provide a unified, cohesive response that leverages insights from all specialist
             HumanMessage(content=aggregation_prompt)
         ]
         
-        response = self.llm.invoke(messages)
-        return response.content
+        return self._invoke_llm(messages, max_tokens=max_tokens, cache_key=cache_key, usage=usage)
     
-    def process_task(self, task: str, thread_id: Optional[str] = None) -> Dict[str, Any]:
+    def _simple_task_cache_key(self, task: str, max_tokens: Optional[int] = None) -> Optional[str]:
+        """
+        Get the simple-task cache key for a task.
+        
+        Args:
+            task: User's task description
+            max_tokens: Output token cap the answer is generated under
+            
+        Returns:
+            Cache key, or None if the task is not simple or would spawn agents
+        """
+        keywords = extract_keywords(task)
+        if assess_task_complexity(task, keywords) != ComplexityLevel.SIMPLE:
+            return None
+        if detect_required_agents(task, keywords):
+            return None
+        return f"{self.model_name}\x00{max_tokens or ''}\x00{' '.join(task.casefold().split())}"
+    
+    def _cached_simple_result(self, task: str, answer: str) -> Dict[str, Any]:
+        """
+        Build a workflow-shaped result for a simple task answered from the cache.
+        
+        Args:
+            task: User's task description
+            answer: Cached final response
+            
+        Returns:
+            Dictionary with the same fields as a completed workflow state
+        """
+        keywords = extract_keywords(task)
+        state = OrchestratorState(
+            task_metadata=TaskMetadata(
+                task_id=generate_agent_id("task"),
+                user_input=task,
+                keywords=keywords,
+                complexity=ComplexityLevel.SIMPLE
+            )
+        )
+        state.orchestrator_reasoning = (
+            f"Assessed task complexity as {ComplexityLevel.SIMPLE.value}. "
+            f"Keywords identified: {', '.join(keywords[:5])}. "
+            "Task is straightforward and can be handled by general reasoning."
+            "\nAnswered from the simple task cache."
+        )
+        state.final_response = answer
+        state.workflow_status = "complete"
+        return {f.name: getattr(state, f.name) for f in fields(state)}
+    
+    def process_task(self, task: str, thread_id: Optional[str] = None,
+                     preview_chars: Optional[int] = None,
+                     cache_key: Optional[str] = None,
+                     max_preview_tokens: Optional[int] = None) -> Dict[str, Any]:
         """
         Process a complete task through the orchestration workflow with memory support.
         
         Args:
             task: User's task description
             thread_id: Optional thread ID for conversation continuity
+            preview_chars: Optional number of response characters the caller will
+                display. The final response (direct answer or aggregation) is capped
+                to roughly that many tokens (~3.5 characters per token) so unused
+                output is never generated; specialist agents still answer in full.
+            cache_key: Optional prompt cache key sent with every LLM call so the
+                provider can reuse the shared prompt prefix (defaults to thread_id)
+            max_preview_tokens: Optional output token cap for the final response
+                (specialist agents are not capped); takes precedence over preview_chars
             
         Returns:
             Dictionary containing:
@@ -527,7 +726,22 @@ Provide a unified, cohesive response that leverages insights from all specialist
             - spawned_agents: List of spawned agents
             - orchestrator_reasoning: Orchestrator's reasoning process
             - memory_context: Information about memory usage
+            - token_usage: Input, cached input and output token totals
         """
+        # Cap generated output to what the caller will display
+        max_response_tokens = max_preview_tokens
+        if max_response_tokens is None and preview_chars:
+            max_response_tokens = math.ceil(preview_chars / 3.5)
+        
+        # Repeated simple tasks can be answered without running the workflow
+        simple_cache_key = None
+        if self.cache_simple_tasks and not thread_id:
+            simple_cache_key = self._simple_task_cache_key(task, max_response_tokens)
+            if simple_cache_key:
+                cached_answer = _trivial_cache_get(simple_cache_key)
+                if cached_answer is not None:
+                    return self._cached_simple_result(task, cached_answer)
+        
         # Create initial state
         task_metadata = TaskMetadata(
             task_id=generate_agent_id("task"),
@@ -540,15 +754,28 @@ Provide a unified, cohesive response that leverages insights from all specialist
         if thread_id:
             initial_state.thread_id = thread_id
         
-        # Execute workflow with config for checkpointer
-        config = {}
+        initial_state.max_response_tokens = max_response_tokens
+        initial_state.prompt_cache_key = cache_key or thread_id
+        
+        # Execute workflow with config for checkpointer; the shared workflow's
+        # nodes run against the orchestrator passed in the config
+        config = {"configurable": {"orchestrator": self}}
         if thread_id:
-            config["configurable"] = {"thread_id": thread_id}
+            config["configurable"]["thread_id"] = thread_id
         elif self.memory_manager and self.enable_memory and self.memory_manager.get_langgraph_checkpointer():
             # Provide default thread_id for checkpointer when memory is enabled
-            config["configurable"] = {"thread_id": f"default_{task_metadata.task_id}"}
+            config["configurable"]["thread_id"] = f"default_{task_metadata.task_id}"
+        
+        try:
+            final_state = self.workflow.invoke(initial_state, config=config)
+        finally:
+            if self.memory_manager and "thread_id" in config["configurable"]:
+                # Persist checkpoints buffered during the run (end_of_workflow mode)
+                self.memory_manager.flush_checkpoints(config["configurable"]["thread_id"])
         
-        final_state = self.workflow.invoke(initial_state, config=config)
+        if (simple_cache_key and isinstance(final_state, dict) and final_state.get("final_response")
+                and not final_state.get("spawned_agents") and not final_state.get("error_messages")):
+            _trivial_cache_put(simple_cache_key, final_state["final_response"])
         
         # Handle case where workflow returns a dict instead of OrchestratorState object
         if isinstance(final_state, dict):
@@ -575,5 +802,6 @@ Provide a unified, cohesive response that leverages insights from all specialist
             "orchestrator_reasoning": final_state.orchestrator_reasoning,
             "workflow_status": final_state.workflow_status,
             "errors": final_state.error_messages,
-            "memory_context": final_state.get_memory_context() if hasattr(final_state, 'get_memory_context') else None
+            "memory_context": final_state.get_memory_context() if hasattr(final_state, 'get_memory_context') else None,
+            "token_usage": final_state.token_usage
         }
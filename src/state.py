@@ -88,6 +88,13 @@ class OrchestratorState:
     conversation_context: Optional[str] = None
     relevant_memories: List[Dict[str, Any]] = field(default_factory=list)
     
+    # Output token cap for orchestrator LLM calls (None = model default)
+    max_response_tokens: Optional[int] = None
+    
+    # Prompt cache key sent with LLM calls (e.g. the thread ID) and token usage totals
+    prompt_cache_key: Optional[str] = None
+    token_usage: Dict[str, int] = field(default_factory=dict)
+    
     def add_agent(self, agent: SpawnedAgent) -> None:
         """Add a spawned agent to the state."""
         self.spawned_agents.append(agent)
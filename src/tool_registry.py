@@ -102,7 +102,7 @@ class ToolRegistry:
         return self._tools.get(name)
 
     def get_available_tools(self) -> List[BaseTool]:
-        """Get all available tools."""
+        """Get all available tools as a list (safe to ``len()`` and iterate repeatedly)."""
         return [tool for tool in self._tools.values() if tool.config.is_available()]
 
     def get_tool_configs(self) -> Dict[str, ToolConfig]:
@@ -4,9 +4,11 @@ Utility functions for AgentSpawn framework.
 Includes helpers for complexity assessment, keyword detection, and common operations.
 """
 
+import functools
 import re
+import sys
 import uuid
-from typing import List, Dict, Set
+from typing import List, Dict, Set, Tuple
 from .state import ComplexityLevel
 
 
@@ -49,39 +51,125 @@ AGENT_KEYWORDS: Dict[str, List[str]] = {
 }
 
 
+def _compile_keyword_matcher(words: List[str]):
+    """
+    Compile a keyword list into a single overlapping-match regex.
+    
+    The pattern is a zero-width lookahead so every start position in the text is
+    tried, and alternatives are ordered longest-first. Any shorter keyword matching
+    at the same position is a prefix of the reported one, so it is recovered via
+    the returned prefix map.
+    
+    Args:
+        words: Keywords to match as plain substrings
+        
+    Returns:
+        Tuple of (compiled pattern, keyword -> matched keyword prefixes)
+    """
+    # Interned keywords let set/dict lookups against interned task tokens
+    # short-circuit on identity
+    ordered = sorted({sys.intern(word) for word in words}, key=len, reverse=True)
+    pattern = re.compile(r'(?=(' + '|'.join(map(re.escape, ordered)) + r'))')
+    prefixes = {
+        word: frozenset(other for other in ordered if word.startswith(other))
+        for word in ordered
+    }
+    return pattern, prefixes
+
+
+# Precompiled keyword matchers, built once at import time
+_COMPLEXITY_MATCHERS: Dict[ComplexityLevel, tuple] = {}
+_AGENT_MATCHERS: Dict[str, tuple] = {}
+
+
+def reset_keyword_cache() -> None:
+    """
+    Rebuild the precompiled keyword matchers.
+    
+    Call this after customizing COMPLEXITY_KEYWORDS or AGENT_KEYWORDS. Also
+    clears memoized complexity assessments.
+    """
+    _COMPLEXITY_MATCHERS.clear()
+    _COMPLEXITY_MATCHERS.update({
+        complexity: _compile_keyword_matcher(words)
+        for complexity, words in COMPLEXITY_KEYWORDS.items()
+    })
+    _AGENT_MATCHERS.clear()
+    _AGENT_MATCHERS.update({
+        agent_type: _compile_keyword_matcher(words)
+        for agent_type, words in AGENT_KEYWORDS.items()
+    })
+    # Memoized assessments were scored against the previous keyword tables
+    _assess_task_complexity_cached.cache_clear()
+
+
+def _match_keywords(matcher: tuple, text_lower: str, keyword_set: Set[str]) -> Set[str]:
+    """Return the keywords of a matcher found in the text or the keyword set."""
+    pattern, prefixes = matcher
+    found: Set[str] = set()
+    for match in pattern.findall(text_lower):
+        found |= prefixes[match]
+    found.update(keyword_set.intersection(prefixes))
+    return found
+
+
+@functools.lru_cache(maxsize=128)
+def _normalize_text(text: str) -> str:
+    """
+    Case-fold task text for keyword matching.
+    
+    A single task is normalized by keyword extraction, complexity assessment and
+    agent detection, so the result is cached to make that one pass per task.
+    Punctuation is kept because keywords such as "c++" and "multi-step" contain it.
+    """
+    return text.casefold()
+
+
 def generate_agent_id(agent_type: str) -> str:
     """Generate a unique agent ID."""
     unique_suffix = str(uuid.uuid4())[:8]
     return f"{agent_type}_{unique_suffix}"
 
 
+# Words never reported as keywords
+_STOPWORDS = frozenset({'the', 'and', 'or', 'is', 'are', 'a', 'an'})
+
+
 def extract_keywords(text: str) -> List[str]:
     """
     Extract relevant keywords from text.
     
+    Results are memoized per text, so repeated tasks skip re-tokenizing.
+    
     Args:
         text: Input text to analyze
         
     Returns:
         List of identified keywords
     """
+    return list(_extract_keywords_cached(text))
+
+
+@functools.lru_cache(maxsize=1024)
+def _extract_keywords_cached(text: str) -> Tuple[str, ...]:
+    """Extract keywords from text as an immutable, memoizable tuple."""
     # Convert to lowercase and split
-    text_lower = text.lower()
+    text_lower = _normalize_text(text)
     words = re.findall(r'\b\w+\b', text_lower)
     
-    # Filter for meaningful keywords
-    keywords = [
-        word for word in words
-        if len(word) > 2 and word not in {'the', 'and', 'or', 'is', 'are', 'a', 'an'}
-    ]
-    
-    return keywords
+    # Filter for meaningful keywords (interned, like the keyword tables)
+    return tuple(
+        sys.intern(word) for word in words
+        if len(word) > 2 and word not in _STOPWORDS
+    )
 
 
 def assess_task_complexity(text: str, keywords: List[str]) -> ComplexityLevel:
     """
     Assess the complexity of a task using keyword detection and pattern matching.
     
+    Results are memoized per (text, keywords) pair until reset_keyword_cache().
+    
     Args:
         text: The task description
         keywords: Pre-extracted keywords
@@ -89,7 +177,13 @@ def assess_task_complexity(text: str, keywords: List[str]) -> ComplexityLevel:
     Returns:
         ComplexityLevel indicating the task complexity
     """
-    text_lower = text.lower()
+    return _assess_task_complexity_cached(text, tuple(keywords))
+
+
+@functools.lru_cache(maxsize=512)
+def _assess_task_complexity_cached(text: str, keywords: Tuple[str, ...]) -> ComplexityLevel:
+    """Score task complexity for a hashable (text, keywords) pair."""
+    text_lower = _normalize_text(text)
     keyword_set = set(keywords)
     
     complexity_scores = {
@@ -99,10 +193,8 @@ def assess_task_complexity(text: str, keywords: List[str]) -> ComplexityLevel:
     }
     
     # Score based on keyword matches
-    for complexity, words in COMPLEXITY_KEYWORDS.items():
-        for word in words:
-            if word in keyword_set or word in text_lower:
-                complexity_scores[complexity] += 1
+    for complexity, matcher in _COMPLEXITY_MATCHERS.items():
+        complexity_scores[complexity] += len(_match_keywords(matcher, text_lower, keyword_set))
     
     # Pattern-based scoring
     # Multiple sentences or questions suggest complexity
@@ -140,7 +232,7 @@ def detect_required_agents(text: str, keywords: List[str]) -> List[str]:
     Returns:
         List of required agent types (e.g., ['data_analyst', 'researcher'])
     """
-    text_lower = text.lower()
+    text_lower = _normalize_text(text)
     keyword_set = set(keywords)
     agent_scores: Dict[str, int] = {
         "data_analyst": 0,
@@ -149,10 +241,8 @@ def detect_required_agents(text: str, keywords: List[str]) -> List[str]:
     }
     
     # Score each agent type based on keyword matches
-    for agent_type, agent_keywords in AGENT_KEYWORDS.items():
-        for agent_keyword in agent_keywords:
-            if agent_keyword in keyword_set or agent_keyword in text_lower:
-                agent_scores[agent_type] += 1
+    for agent_type, matcher in _AGENT_MATCHERS.items():
+        agent_scores[agent_type] += len(_match_keywords(matcher, text_lower, keyword_set))
     
     # Return agents with meaningful scores (threshold > 0)
     required_agents = [
@@ -202,3 +292,7 @@ Provide production-ready code or clear implementation steps."""
     }
     
     return prompts.get(agent_type, task)
+
+
+# Build the keyword matchers at import time
+reset_keyword_cache()
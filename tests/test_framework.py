@@ -8,7 +8,9 @@ import sys
 import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
+import threading
 import unittest
+from collections import defaultdict, deque
 from datetime import datetime
 
 from src.state import (
@@ -16,9 +18,11 @@ from src.state import (
 )
 from src.utils import (
     extract_keywords, assess_task_complexity, detect_required_agents,
-    generate_agent_id, create_agent_prompt
+    generate_agent_id, create_agent_prompt, reset_keyword_cache, AGENT_KEYWORDS,
+    COMPLEXITY_KEYWORDS
 )
 from src.agent_registry import AgentRegistry, get_registry, reset_registry
+from src.memory import MemoryProvider
 from src.tool_registry import get_tool_registry, reset_tool_registry
 from tool_registry import get_tool_registry, reset_tool_registry
 
@@ -134,6 +138,33 @@ class TestUtils(unittest.TestCase):
         
         self.assertIn("code_generator", agents)
     
+    def test_reset_keyword_cache_picks_up_custom_keywords(self):
+        """Test that customized agent keywords take effect after a cache reset."""
+        text = "Tune the kubernetes deployment"
+        self.assertNotIn("code_generator", detect_required_agents(text, []))
+        
+        AGENT_KEYWORDS["code_generator"].append("kubernetes")
+        try:
+            reset_keyword_cache()
+            self.assertIn("code_generator", detect_required_agents(text, []))
+        finally:
+            AGENT_KEYWORDS["code_generator"].remove("kubernetes")
+            reset_keyword_cache()
+    
+    def test_reset_keyword_cache_clears_memoized_complexity(self):
+        """Test that memoized complexity results are dropped on a cache reset."""
+        text = "Tune the kubernetes deployment"
+        keywords = extract_keywords(text)
+        self.assertEqual(assess_task_complexity(text, keywords), ComplexityLevel.SIMPLE)
+        
+        COMPLEXITY_KEYWORDS[ComplexityLevel.COMPLEX].append("kubernetes")
+        try:
+            reset_keyword_cache()
+            self.assertEqual(assess_task_complexity(text, keywords), ComplexityLevel.COMPLEX)
+        finally:
+            COMPLEXITY_KEYWORDS[ComplexityLevel.COMPLEX].remove("kubernetes")
+            reset_keyword_cache()
+    
     def test_generate_agent_id(self):
         """Test agent ID generation."""
         agent_id = generate_agent_id("data_analyst")
@@ -217,6 +248,51 @@ class TestAgentRegistry(unittest.TestCase):
         with self.assertRaises(ValueError):
             registry.get_agent_config("nonexistent_agent")
     
+    def test_register_agent_copies_shared_defaults(self):
+        """Test that registering agents never mutates the shared default configs."""
+        import dataclasses
+        from src.agent_registry import AgentConfig
+
+        registry = AgentRegistry()
+        config = registry.get_agent_config("researcher")
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            config.name = "Changed"
+
+        custom = AgentConfig(
+            agent_type=AgentType.RESEARCHER,
+            name="Custom Researcher",
+            description="Custom",
+            system_prompt="Custom",
+            capabilities=["custom_research"]
+        )
+        registry.register_agent(custom)
+
+        self.assertEqual(custom.capabilities, ("custom_research",))
+        self.assertEqual(registry.get_agent_config("researcher").name, "Custom Researcher")
+        self.assertEqual(AgentRegistry().get_agent_config("researcher").name, "Research Specialist")
+        self.assertEqual(registry.get_agent_by_capability("custom_research"), ["researcher"])
+        self.assertEqual(registry.get_agent_by_capability("literature_review"), [])
+        self.assertEqual(AgentRegistry().get_agent_by_capability("literature_review"), ["researcher"])
+
+    def test_list_agents_returns_read_only_view(self):
+        """Test that list_agents returns a read-only view and capability lookup can be iterated."""
+        registry = get_registry()
+        agents = registry.list_agents()
+
+        with self.assertRaises(TypeError):
+            agents["researcher"] = None
+        self.assertEqual(list(registry.iter_agents_by_capability("code_generation")), ["code_generator"])
+        self.assertEqual(list(registry.iter_agents_by_capability("unknown")), [])
+
+    def test_concurrent_first_calls_share_registry(self):
+        """Test that racing first get_registry calls build a single registry."""
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            registries = list(executor.map(lambda _: get_registry(), range(32)))
+
+        self.assertEqual(len({id(registry) for registry in registries}), 1)
+
     def test_singleton_pattern(self):
         """Test that registry follows singleton pattern."""
         registry1 = get_registry()
@@ -302,6 +378,652 @@ class TestToolIntegration(unittest.TestCase):
         self.assertIsInstance(tools_used, list)
         self.assertIsInstance(tool_usage, list)
 
+    def test_triggered_tools_run_concurrently_in_order(self):
+        """Test that triggered tools run at the same time and keep their trigger order."""
+        import threading
+        from unittest import mock
+        from src.agents import data_analyst
+        from src.agents.data_analyst import DataAnalystAgent
+
+        agent = DataAnalystAgent.__new__(DataAnalystAgent)
+        barrier = threading.Barrier(3, timeout=5)
+
+        def tool(name):
+            def run(task):
+                barrier.wait()  # only passes once all three tools are running
+                return name
+            return run
+
+        agent._use_database_tool = tool("database")
+        agent._use_code_execution_tool = tool("code")
+        agent._use_web_search_tool = tool("search")
+
+        with mock.patch.object(data_analyst, "_tool_intent_embeddings", return_value=None):
+            results = agent._use_tools_if_needed("Search the DATA and compute totals", [])
+        self.assertEqual(results, ["database", "code", "search"])
+
+    def test_triggered_tools_confirmed_by_task_meaning(self):
+        """Test that, with a relevance threshold set, triggered tools only run when the task matches their intent."""
+        from unittest import mock
+        import numpy as np
+        from src.agents import data_analyst
+        from src.agents.data_analyst import DataAnalystAgent
+
+        agent = DataAnalystAgent.__new__(DataAnalystAgent)
+        agent._use_database_tool = lambda task: "database"
+        agent._use_code_execution_tool = lambda task: "code"
+        agent._use_web_search_tool = lambda task: "search"
+
+        intents = {
+            "_use_database_tool": np.array([1.0, 0.0]),
+            "_use_code_execution_tool": np.array([0.0, 1.0]),
+            "_use_web_search_tool": np.array([0.0, 1.0]),
+        }
+        with mock.patch.object(data_analyst, "_tool_intent_embeddings", return_value=intents), \
+                mock.patch.object(data_analyst, "_semantic_embedder", return_value=lambda text: np.array([1.0, 0.0])):
+            # The relevance gate is opt-in: by default every keyword-triggered tool runs
+            self.assertEqual(agent._use_tools_if_needed("Search the data and compute totals", []),
+                             ["database", "code", "search"])
+            with mock.patch.object(data_analyst, "TOOL_RELEVANCE_THRESHOLD", 0.3):
+                results = agent._use_tools_if_needed("Search the data and compute totals", [])
+
+        self.assertEqual(results, ["database"])
+
+        def broken_embedder(text):
+            raise RuntimeError("embedding failed")
+
+        with mock.patch.object(data_analyst, "_tool_intent_embeddings", return_value=intents), \
+                mock.patch.object(data_analyst, "_semantic_embedder", return_value=broken_embedder), \
+                mock.patch.object(data_analyst, "TOOL_RELEVANCE_THRESHOLD", 0.3):
+            self.assertEqual(agent._use_tools_if_needed("Search the data and compute totals", []),
+                             ["database", "code", "search"])
+
+    def test_run_tool_records_success_and_failure(self):
+        """Test that tool calls are recorded with their result, or their exception as an error."""
+        from src.agents.data_analyst import DataAnalystAgent
+        from src.tool_registry import ToolResult
+
+        agent = DataAnalystAgent.__new__(DataAnalystAgent)
+        agent.agent_id = "analyst"
+
+        def fail():
+            raise RuntimeError("database is locked")
+
+        ok = agent._run_tool("database_query", {"query": "SELECT 1"}, lambda: ToolResult(True, data=[1]))
+        failed = agent._run_tool("database_query", {"query": "SELECT 1"}, fail)
+
+        self.assertEqual((ok.result, ok.success, ok.error), ([1], True, None))
+        self.assertEqual((failed.result, failed.success, failed.error), (None, False, "database is locked"))
+        self.assertEqual(failed.parameters, {"query": "SELECT 1"})
+        self.assertGreaterEqual(failed.execution_time, 0)
+
+    def test_analyze_records_tool_usage(self):
+        """Test that analyze appends the tools it ran to the caller's tool usage list."""
+        from src.agents.data_analyst import DataAnalystAgent
+        from src.state import ToolUsage
+
+        agent = DataAnalystAgent.__new__(DataAnalystAgent)
+        agent.llm = _FakeLLM(content="analysis")
+        usage = ToolUsage(tool_name="database_query", agent_id="analyst", result={"rows": 1})
+        agent._use_tools_if_needed = lambda task, tool_usage: [usage]
+
+        tracked = []
+        result = agent.analyze("Query the sales data", tool_usage=tracked)
+
+        self.assertEqual(tracked, [usage])
+        self.assertEqual(result["tools_used"], ["database_query"])
+        self.assertEqual(result["analysis"], "analysis")
+
+    def test_format_tool_results(self):
+        """Test that tool results are formatted per tool, with structured results as JSON."""
+        from src.agents.data_analyst import DataAnalystAgent
+        from src.state import ToolUsage
+
+        agent = DataAnalystAgent.__new__(DataAnalystAgent)
+        formatted = agent._format_tool_results([
+            ToolUsage(tool_name="database_query", agent_id="a", result={"rows": 2, "table": "sales"}, success=True),
+            ToolUsage(tool_name="code_execution", agent_id="a", result="42", success=True),
+            ToolUsage(tool_name="web_search", agent_id="a", error="no key"),
+        ])
+
+        self.assertEqual(formatted, "\n".join([
+            "Tool: database_query", "{", '  "rows": 2,', '  "table": "sales"', "}",
+            "Tool: code_execution", "  Result: 42",
+            "Tool: web_search - Failed: no key",
+        ]))
+        self.assertEqual(agent._format_tool_results([]), "")
+
+    def test_tool_trigger_pattern_matches_substring_checks(self):
+        """Test that the single-pass trigger pattern agrees with per-keyword substring checks."""
+        from src.agents.data_analyst import _TOOL_TRIGGERS, _TOOL_TRIGGER_PATTERN
+
+        for task in ["calculatest", "Databases", "find the latest SQL", "plain request", ""]:
+            lowered = task.lower()
+            expected = {
+                f"tool{index}" for index, (keywords, _) in enumerate(_TOOL_TRIGGERS)
+                if any(keyword in lowered for keyword in keywords)
+            }
+            found = {match.lastgroup for match in _TOOL_TRIGGER_PATTERN.finditer(lowered)}
+            self.assertEqual(found, expected, task)
+
+
+class _FakeResponse:
+    """Minimal stand-in for an LLM chat response."""
+
+    def __init__(self, content, usage_metadata=None):
+        self.content = content
+        self.usage_metadata = usage_metadata
+
+
+class _FakeLLM:
+    """Records LLM calls instead of hitting the network."""
+
+    def __init__(self, content="Paris", usage_metadata=None):
+        self.content = content
+        self.usage_metadata = usage_metadata
+        self.bound_kwargs = []
+        self.batch_sizes = []
+        self.calls = 0
+
+    def bind(self, **kwargs):
+        self.bound_kwargs.append(kwargs)
+        return self
+
+    def invoke(self, messages, **kwargs):
+        self.calls += 1
+        return _FakeResponse(self.content, self.usage_metadata)
+
+    def batch(self, inputs, config=None, **kwargs):
+        self.batch_sizes.append(len(inputs))
+        return [self.invoke(messages) for messages in inputs]
+
+    def stream(self, messages, **kwargs):
+        self.calls += 1
+        for word in self.content.split(" "):
+            yield _FakeResponse(word + " ")
+
+
+class _FakeCollection:
+    """Records ChromaDB collection calls instead of touching a database."""
+
+    def __init__(self, rows=None, matches=()):
+        """
+        Args:
+            rows: Result returned by get() (default: no rows)
+            matches: (document, metadata) pairs query() returns for every query
+        """
+        self.rows = rows or {"ids": [], "documents": [], "metadatas": []}
+        self.matches = list(matches)
+        self.adds, self.gets, self.queries = [], [], []
+
+    def add(self, documents, metadatas, ids, embeddings=None):
+        self.adds.append(ids)
+
+    def get(self, where=None, limit=None):
+        self.gets.append(where)
+        return self.rows
+
+    def query(self, query_embeddings, n_results, where=None):
+        self.queries.append((query_embeddings, n_results, where))
+        return {
+            "documents": [[document for document, _ in self.matches] for _ in query_embeddings],
+            "metadatas": [[metadata for _, metadata in self.matches] for _ in query_embeddings],
+        }
+
+
+class _StubProvider(MemoryProvider):
+    """Memory provider with no-op defaults; tests override only the methods they check."""
+
+    def store_memory(self, entry):
+        return True
+
+    def retrieve_memories(self, query, limit=5, metadata_filter=None):
+        return []
+
+    def get_conversation_history(self, thread_id, limit=10):
+        return []
+
+    def store_conversation_context(self, context):
+        return True
+
+    def get_conversation_context(self, thread_id):
+        return None
+
+
+def _make_chroma_provider(collection, shard_by_thread=False):
+    """Build a ChromaMemoryProvider around a fake collection, skipping the ChromaDB client setup."""
+    from src.memory import ChromaMemoryProvider, _ChromaEmbeddings
+
+    provider = ChromaMemoryProvider.__new__(ChromaMemoryProvider)
+    provider.collection_name, provider.client, provider.embedding_function = "agent_memory", None, None
+    provider.collection, provider.shard_by_thread = collection, shard_by_thread
+    provider.embeddings = _ChromaEmbeddings(lambda texts: [[1.0, 0.0] for _ in texts])
+    provider._thread_collections, provider._shard_lock = {}, threading.Lock()
+    provider._recent, provider._recent_lock = defaultdict(deque), threading.Lock()
+    return provider
+
+
+class TestAgentResponseCache(unittest.TestCase):
+    """Test the response cache shared by the specialized agents."""
+
+    def setUp(self):
+        """Start each test with an empty cache."""
+        from src.agents._llm_cache import clear_llm_cache
+        clear_llm_cache()
+        self.addCleanup(clear_llm_cache)
+
+    def test_repeated_prompts_reuse_response(self):
+        """Test that identical agent requests only call the LLM once."""
+        from src.agents.code_generator import CodeGeneratorAgent
+
+        agent = CodeGeneratorAgent.__new__(CodeGeneratorAgent)
+        agent.llm = _FakeLLM(content="def add(a, b): return a + b")
+
+        first = agent.generate_code("add two numbers")
+        second = agent.generate_code("add two numbers")
+        agent.generate_code("add two numbers", language="javascript")
+
+        self.assertEqual(first, second)
+        self.assertEqual(first["code"], "def add(a, b): return a + b")
+        self.assertEqual(agent.llm.calls, 2)
+
+    def test_batch_generate_sends_only_uncached_requests(self):
+        """Test that batched generation sends each uncached prompt once in one batch."""
+        from src.agents.code_generator import CodeGeneratorAgent
+
+        agent = CodeGeneratorAgent.__new__(CodeGeneratorAgent)
+        agent.llm = _FakeLLM(content="code")
+        agent.generate_code("parse dates")
+
+        results = agent.batch_generate(["parse dates", "sort users", "sort users", "merge files"])
+
+        self.assertEqual([result["code"] for result in results], ["code"] * 4)
+        self.assertEqual(agent.llm.batch_sizes, [2])
+        self.assertEqual(agent.llm.calls, 3)
+
+    def test_near_identical_analyses_share_response(self):
+        """Test that the semantic tier reuses responses to near-identical analysis prompts."""
+        from unittest import mock
+        from src.agents import _llm_cache
+        from src.agents.data_analyst import DataAnalystAgent
+
+        def embed(text):
+            # Prompts differing only in case/punctuation embed identically
+            return [1.0, 0.0] if "sales" in text.lower() else [0.0, 1.0]
+
+        agent = DataAnalystAgent.__new__(DataAnalystAgent)
+        agent.llm = _FakeLLM(content="analysis")
+        agent._use_tools_if_needed = lambda task, tool_usage: []
+
+        with mock.patch.object(_llm_cache, "_semantic_embedder", return_value=embed):
+            agent.analyze("Analyze sales trends")
+            agent.analyze("analyze SALES trends!")
+            agent.analyze("Analyze churn")
+
+        self.assertEqual(agent.llm.calls, 2)
+
+    def test_semantic_tier_failures_fall_back_to_llm(self):
+        """Test that an embedding model that fails to load or to embed only costs a cache miss."""
+        import types
+        from unittest import mock
+        from src.agents import _llm_cache
+        from src.agents._llm_cache import _semantic_embedder, invoke_cached
+
+        class BrokenModel:
+            def __init__(self, name):
+                raise OSError("model download blocked")
+
+        _semantic_embedder.cache_clear()
+        broken = types.SimpleNamespace(SentenceTransformer=BrokenModel)
+        try:
+            with mock.patch.dict(sys.modules, {"sentence_transformers": broken}):
+                self.assertIsNone(_semantic_embedder())
+        finally:
+            _semantic_embedder.cache_clear()
+
+        def embed(text):
+            raise RuntimeError("embedding failed")
+
+        llm = _FakeLLM(content="answer")
+        with mock.patch.object(_llm_cache, "_semantic_embedder", return_value=embed):
+            self.assertEqual(invoke_cached(llm, "system", "semantic failure prompt", semantic=True), "answer")
+            self.assertEqual(invoke_cached(llm, "system", "semantic failure prompt", semantic=True), "answer")
+        self.assertEqual(llm.calls, 1)
+
+    def test_prompt_messages_mark_anthropic_system_prompt_cacheable(self):
+        """Test that the static system prompt leads and is marked cacheable for Anthropic models."""
+        from src.agents._llm_cache import prompt_messages
+
+        class Model:
+            def __init__(self, model_name):
+                self.model_name = model_name
+
+        openai_messages = prompt_messages(Model("gpt-4"), "static", "task")
+        anthropic_messages = prompt_messages(Model("anthropic/claude-3.5-sonnet"), "static", "task")
+
+        self.assertEqual(openai_messages[0].content, "static")
+        self.assertIs(openai_messages[0], prompt_messages(Model("gpt-4"), "static", "other")[0])
+        self.assertEqual(anthropic_messages[0].content[0]["cache_control"], {"type": "ephemeral"})
+        self.assertEqual(anthropic_messages[1].content, "task")
+
+    def test_tool_results_follow_cacheable_prefix(self):
+        """Test that tool output is sent as a final, unmarked message after the task."""
+        from src.agents._llm_cache import prompt_messages
+        from src.agents.data_analyst import DataAnalystAgent
+        from src.state import ToolUsage
+
+        class Model:
+            model_name = "anthropic/claude-3.5-sonnet"
+
+        messages = prompt_messages(Model(), "static", "task", "Tool Results: 42")
+        self.assertEqual(messages[1].content[0]["cache_control"], {"type": "ephemeral"})
+        self.assertEqual(messages[2].content, "Tool Results: 42")
+
+        agent = DataAnalystAgent.__new__(DataAnalystAgent)
+        agent.llm = _FakeLLM(content="analysis")
+        sent = []
+        agent.llm.invoke = lambda messages: sent.append(messages) or _FakeResponse("analysis")
+        usage = ToolUsage(tool_name="code_execution", agent_id="a", result="42", success=True)
+
+        agent._use_tools_if_needed = lambda task, tool_usage: [usage]
+        agent.analyze("Compute the mean")
+        agent._use_tools_if_needed = lambda task, tool_usage: []
+        agent.analyze("Compute the mean")
+
+        self.assertEqual([message.content for message in sent[0][1:]],
+                         ["Compute the mean", "Tool Results:\nTool: code_execution\n  Result: 42"])
+        self.assertEqual(len(sent), 2)
+        self.assertEqual(sent[1][1].content, "Compute the mean")
+
+    def test_agents_share_pooled_client(self):
+        """Test that agents with the same model and temperature share one LLM client."""
+        from src.agents.code_generator import CodeGeneratorAgent
+        from src.agents.researcher import ResearcherAgent
+
+        self.assertIs(CodeGeneratorAgent().llm, CodeGeneratorAgent().llm)
+        self.assertIsNot(CodeGeneratorAgent().llm, ResearcherAgent().llm)
+
+    def test_streamed_response_is_cached_once_complete(self):
+        """Test that streams yield chunks and a fully received stream is reused."""
+        from src.agents.code_generator import CodeGeneratorAgent
+
+        agent = CodeGeneratorAgent.__new__(CodeGeneratorAgent)
+        agent.llm = _FakeLLM(content="def add(a, b)")
+
+        abandoned = agent.generate_code_stream("add two numbers")
+        self.assertEqual(next(abandoned), "def ")
+        abandoned.close()
+
+        chunks = list(agent.generate_code_stream("add two numbers"))
+        cached = list(agent.generate_code_stream("add two numbers"))
+
+        self.assertEqual(chunks, ["def ", "add(a, ", "b) "])
+        self.assertEqual(cached, ["def add(a, b) "])
+        self.assertEqual(agent.generate_code("add two numbers")["code"], "def add(a, b) ")
+        self.assertEqual(agent.llm.calls, 2)
+
+
+class TestMetaLearning(unittest.TestCase):
+    """Test the meta-learning agent's skill library."""
+
+    def test_relevant_skills_ranked_by_embedding_similarity(self):
+        """Test that skills are matched by description embedding, best first, above the threshold."""
+        from unittest import mock
+        from src.agents import meta_learner
+        from src.agents.meta_learner import MetaLearningAgent
+
+        vectors = {
+            "translate text": [1.0, 0.0, 0.0],
+            "summarize articles": [0.0, 1.0, 0.0],
+            "convert to French": [0.8, 0.6, 0.0],
+            "bake bread": [0.0, 0.0, 1.0],
+        }
+
+        agent = MetaLearningAgent(meta_learning_enabled=False)
+        agent.llm = _FakeLLM(content="skill prompt")
+
+        with mock.patch.object(meta_learner, "_semantic_embedder", return_value=vectors.__getitem__):
+            agent.learn_from_examples("translate text", [])
+            agent.learn_from_examples("summarize articles", [])
+            relevant = agent._find_relevant_skills("convert to French")
+            unrelated = agent._find_relevant_skills("bake bread")
+            self.assertTrue(agent.forget_skill("learned_0"))
+            after_forget = agent._find_relevant_skills("convert to French")
+
+        self.assertEqual([skill["description"] for skill in relevant], ["translate text", "summarize articles"])
+        self.assertEqual(unrelated, [])
+        self.assertEqual([skill["description"] for skill in after_forget], ["summarize articles"])
+
+    def test_relevant_skills_keyword_fallback_matches_whole_words(self):
+        """Test that without embeddings, skills match tasks sharing a description word."""
+        from unittest import mock
+        from src.agents import meta_learner
+        from src.agents.meta_learner import MetaLearningAgent
+
+        agent = MetaLearningAgent(meta_learning_enabled=False)
+        agent.llm = _FakeLLM(content="skill prompt")
+
+        with mock.patch.object(meta_learner, "_semantic_embedder", return_value=None):
+            agent.learn_from_examples("Translate text", [])
+            agent.learn_from_examples("Summarize articles", [])
+            relevant = agent._find_relevant_skills("Please translate: bonjour")
+            self.assertTrue(agent.forget_skill("learned_0"))
+            after_forget = agent._find_relevant_skills("Please translate: bonjour")
+
+        self.assertEqual([skill["description"] for skill in relevant], ["Translate text"])
+        self.assertEqual(after_forget, [])
+
+    def test_relevant_skills_fall_back_to_keywords_when_embedding_fails(self):
+        """Test that embedding failures route skill matching to the word-set path."""
+        from unittest import mock
+        from src.agents import meta_learner
+        from src.agents.meta_learner import MetaLearningAgent
+
+        def broken_embedder(text):
+            raise RuntimeError("embedding failed")
+
+        agent = MetaLearningAgent(meta_learning_enabled=False)
+        agent.llm = _FakeLLM(content="skill prompt")
+
+        with mock.patch.object(meta_learner, "_semantic_embedder", return_value=broken_embedder):
+            self.assertEqual(agent.learn_from_examples("Translate text", [])["status"], "learned")
+            relevant = agent._find_relevant_skills("Please translate: bonjour")
+
+        # A skill learned while embedding failed is still found once the model works
+        with mock.patch.object(meta_learner, "_semantic_embedder", return_value=lambda text: [1.0, 0.0]):
+            agent.learn_from_examples("Summarize articles", [])
+            mixed = agent._find_relevant_skills("translate and summarize")
+
+        self.assertEqual([skill["description"] for skill in relevant], ["Translate text"])
+        self.assertEqual([skill["description"] for skill in mixed], ["Summarize articles", "Translate text"])
+
+    def test_meta_learning_disabled_when_torch_import_fails(self):
+        """Test that torch is only imported by enabled agents, which fall back when it fails."""
+        from unittest import mock
+        from src.agents import meta_learner
+        from src.agents.meta_learner import MetaLearningAgent
+
+        with mock.patch.object(meta_learner, "META_LEARNING_AVAILABLE", True), \
+                mock.patch.object(meta_learner, "_meta_learning_modules", side_effect=ImportError) as load:
+            self.assertFalse(MetaLearningAgent(meta_learning_enabled=False).meta_learning_enabled)
+            load.assert_not_called()
+
+            agent = MetaLearningAgent()
+            load.assert_called_once()
+
+        self.assertFalse(agent.meta_learning_enabled)
+        self.assertIsNone(agent.meta_model)
+
+    def test_batch_adapt_to_tasks_sends_one_batch(self):
+        """Test that several novel tasks are adapted with a single batched LLM call."""
+        from src.agents.meta_learner import MetaLearningAgent
+
+        agent = MetaLearningAgent(meta_learning_enabled=False)
+        agent.llm = _FakeLLM(content="done")
+
+        results = agent.batch_adapt_to_tasks(["plan a trip", "write a haiku"])
+
+        self.assertEqual([result["response"] for result in results], ["done", "done"])
+        self.assertFalse(any(result["used_learned_skill"] for result in results))
+        self.assertEqual(agent.llm.batch_sizes, [2])
+
+
+class TestOrchestratorProcessing(unittest.TestCase):
+    """Test orchestrator task processing with a stubbed LLM."""
+
+    def setUp(self):
+        """Set up an orchestrator without memory and with a fake LLM."""
+        from src.orchestrator import Orchestrator
+        self.orchestrator = Orchestrator(enable_memory=False)
+        self.fake_llm = _FakeLLM()
+        self.orchestrator.llm = self.fake_llm
+
+    def test_simple_task_uses_direct_reasoning(self):
+        """Test that a simple task is answered without spawning agents."""
+        result = self.orchestrator.process_task("What is the capital of France?")
+
+        self.assertEqual(result["final_response"], "Paris")
+        self.assertEqual(result["spawned_agents"], [])
+        self.assertEqual(self.fake_llm.bound_kwargs, [])
+
+    def test_preview_chars_caps_response_tokens(self):
+        """Test that preview_chars is turned into an output token limit."""
+        self.orchestrator.process_task("What is the capital of France?", preview_chars=350)
+
+        self.assertIn({"max_tokens": 100}, self.fake_llm.bound_kwargs)
+
+    def test_preview_cap_applies_only_to_final_response(self):
+        """Test that specialist agents answer in full and only the aggregated response is capped."""
+        self.orchestrator.process_task(
+            "Investigate the sources and write a python function for it", preview_chars=350
+        )
+
+        self.assertGreater(self.fake_llm.calls, 1)
+        self.assertEqual(self.fake_llm.bound_kwargs, [{"max_tokens": 100}])
+
+    def test_thread_id_is_sent_as_prompt_cache_key(self):
+        """Test that follow-up calls carry a prompt cache key and report usage."""
+        self.fake_llm.usage_metadata = {
+            "input_tokens": 50,
+            "output_tokens": 5,
+            "input_token_details": {"cache_read": 32},
+        }
+        result = self.orchestrator.process_task(
+            "What is the capital of France?", thread_id="conversation_1"
+        )
+
+        self.assertIn(
+            {"extra_body": {"prompt_cache_key": "conversation_1"}},
+            self.fake_llm.bound_kwargs
+        )
+        self.assertEqual(
+            result["token_usage"],
+            {"input_tokens": 50, "cached_input_tokens": 32, "output_tokens": 5}
+        )
+
+    def test_explicit_cache_key_and_preview_tokens(self):
+        """Test that an explicit cache key and token cap reach the LLM call."""
+        self.orchestrator.process_task(
+            "What is the capital of France?", cache_key="demo", max_preview_tokens=60
+        )
+
+        self.assertIn(
+            {"max_tokens": 60, "extra_body": {"prompt_cache_key": "demo"}},
+            self.fake_llm.bound_kwargs
+        )
+
+    def test_preview_tokens_leave_specialist_agents_uncapped(self):
+        """Test that max_preview_tokens only binds the aggregation call."""
+        self.orchestrator.process_task(
+            "Investigate the sources and write a python function for it", max_preview_tokens=60
+        )
+
+        self.assertEqual(self.fake_llm.bound_kwargs, [{"max_tokens": 60}])
+
+    def test_spawned_agents_all_complete(self):
+        """Test that concurrently executed agents all record their results."""
+        result = self.orchestrator.process_task(
+            "Investigate the sources and write a python function for it"
+        )
+
+        agent_types = [agent.agent_type.value for agent in result["spawned_agents"]]
+        self.assertEqual(agent_types, ["researcher", "code_generator"])
+        for agent in result["spawned_agents"]:
+            self.assertEqual(agent.status, "completed")
+            self.assertEqual(agent.result, "Paris")
+        self.assertEqual(self.fake_llm.calls, 3)
+
+    def test_orchestrators_share_compiled_workflow(self):
+        """Test that the workflow is compiled once and runs against each caller."""
+        from src.orchestrator import Orchestrator
+        other = Orchestrator(enable_memory=False)
+        other.llm = _FakeLLM(content="Berlin")
+
+        self.assertIs(other.workflow, self.orchestrator.workflow)
+        result = other.process_task("What is the capital of Germany?")
+        self.assertEqual(result["final_response"], "Berlin")
+        self.assertEqual(self.fake_llm.calls, 0)
+
+    def test_cached_simple_task_skips_llm(self):
+        """Test that a repeated simple task is answered from the cache."""
+        from src import orchestrator as orchestrator_module
+        self.addCleanup(orchestrator_module._TRIVIAL_CACHE.clear)
+        self.orchestrator.cache_simple_tasks = True
+
+        first = self.orchestrator.process_task("What is the capital of France?")
+        second = self.orchestrator.process_task("what is the  capital of France?")
+
+        self.assertEqual(first["final_response"], "Paris")
+        self.assertEqual(second["final_response"], "Paris")
+        self.assertEqual(second["spawned_agents"], [])
+        self.assertEqual(second["workflow_status"], "complete")
+        self.assertEqual(self.fake_llm.calls, 1)
+
+
+class TestExamples(unittest.TestCase):
+    """Test example scripts for structural problems."""
+
+    def test_examples_have_single_main_guard(self):
+        """Test that each runnable example has exactly one __main__ guard."""
+        import ast
+        examples_dir = os.path.join(os.path.dirname(__file__), '..', 'examples')
+        for filename in sorted(os.listdir(examples_dir)):
+            if not filename.endswith('.py') or filename.startswith('_'):
+                continue
+            with open(os.path.join(examples_dir, filename), encoding='utf-8') as f:
+                tree = ast.parse(f.read(), filename=filename)
+            guards = [
+                node for node in tree.body
+                if isinstance(node, ast.If)
+                and isinstance(node.test, ast.Compare)
+                and isinstance(node.test.left, ast.Name)
+                and node.test.left.id == '__name__'
+            ]
+            self.assertEqual(len(guards), 1, f"{filename} has {len(guards)} __main__ guards")
+
+    def test_require_openai_key_exits_when_unset(self):
+        """Test that examples fail fast without an API key."""
+        from unittest import mock
+        from examples._common import require_openai_key
+
+        with mock.patch.dict(os.environ, {}, clear=True), \
+                mock.patch('dotenv.load_dotenv'), \
+                mock.patch('builtins.print'):
+            with self.assertRaises(SystemExit):
+                require_openai_key()
+
+        with mock.patch.dict(os.environ, {"OPENAI_API_KEY": "sk-test"}), \
+                mock.patch('dotenv.load_dotenv'):
+            require_openai_key()
+
+    def test_preview_truncates_long_text_only(self):
+        """Test that previews mark truncation and leave short text untouched."""
+        from examples._common import preview
+
+        text = "short"
+        self.assertIs(preview(text), text)
+        self.assertEqual(preview("x" * 100, 10), "x" * 10 + "...")
+
 
 class TestMemoryIntegration(unittest.TestCase):
     """Test memory integration functionality."""
@@ -395,6 +1117,513 @@ class TestMemoryIntegration(unittest.TestCase):
         context = self.memory_manager.get_relevant_context(thread_id, "test query")
         self.assertIsInstance(context, str)
 
+    def test_relevant_context_search_excludes_history(self):
+        """Test that the search is told to skip the entries already shown as history."""
+        from src.memory import MemoryManager
+
+        searches = []
+
+        class FilteringProvider(_StubProvider):
+            def retrieve_memories(self, query, limit=5, metadata_filter=None):
+                searches.append(metadata_filter)
+                return [MemoryEntry(id="past", content="earlier answer")]
+
+            def get_conversation_history(self, thread_id, limit=10):
+                return [MemoryEntry(id="turn", content="hello", metadata={"role": "user"})]
+
+        MemoryEntry = self.MemoryEntry
+        manager = MemoryManager(config={"langgraph": {"enabled": False}})
+        manager.providers["vector"] = FilteringProvider()
+
+        context = manager.get_relevant_context("thread_1", "question")
+
+        self.assertEqual(context, "Recent conversation:\nUser: hello\n\nRelevant past context:\nPast: earlier answer")
+        self.assertEqual(searches, [{"id": {"$nin": ["turn"]}}])
+
+    def test_concurrent_first_calls_build_one_memory_manager(self):
+        """Test that racing first calls to get_memory_manager share a single manager."""
+        from concurrent.futures import ThreadPoolExecutor
+        from unittest import mock
+        from src import memory
+
+        barrier = threading.Barrier(4, timeout=5)
+        built = []
+
+        class RecordingManager:
+            def __init__(self, config=None):
+                built.append(self)
+
+        def racing_call():
+            barrier.wait()
+            return memory.get_memory_manager()
+
+        with mock.patch.object(memory, "_memory_manager", None), \
+                mock.patch.object(memory, "MemoryManager", RecordingManager):
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                managers = list(executor.map(lambda _: racing_call(), range(4)))
+
+        self.assertEqual(len(built), 1)
+        self.assertTrue(all(manager is built[0] for manager in managers))
+
+    def test_langgraph_history_is_bounded(self):
+        """Test that LangGraph provider history keeps only the newest max_history entries."""
+        from src.memory import LangGraphMemoryProvider
+
+        provider = LangGraphMemoryProvider(max_history=3)
+        self.assertIsNone(provider.get_conversation_context("thread_1"))
+        contexts = [self.ConversationContext(thread_id="thread_1", session_id=f"s{i}") for i in range(5)]
+        for context in contexts:
+            self.assertTrue(provider.store_conversation_context(context))
+
+        self.assertEqual(len(provider.memory_store["thread_1"]), 3)
+        self.assertEqual(provider.get_conversation_history("thread_1", limit=2), contexts[3:])
+        self.assertEqual(provider.get_conversation_history("thread_1", limit=10), contexts[2:])
+        self.assertEqual(provider.get_conversation_history("thread_1", limit=0), [])
+        self.assertIs(provider.get_conversation_context("thread_1"), contexts[-1])
+
+    def test_concurrent_searches_are_coalesced(self):
+        """Test that searches from several threads reach the provider as one batch per filter."""
+        from concurrent.futures import ThreadPoolExecutor
+        from src.memory import MemoryManager, RetrievalCoalescer
+
+        batches = []
+
+        def retrieve_batch(queries, limit, metadata_filter):
+            batches.append((sorted(queries), limit, metadata_filter))
+            return [[MemoryEntry(id=f"{query}_{i}", content=query) for i in range(limit)] for query in queries]
+
+        MemoryEntry = self.MemoryEntry
+        coalescer = RetrievalCoalescer(retrieve_batch, window_ms=500, max_batch=3)
+        self.addCleanup(coalescer.close)
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            alpha = executor.submit(coalescer.retrieve, "alpha", 2)
+            beta = executor.submit(coalescer.retrieve, "beta", 1)
+            gamma = executor.submit(coalescer.retrieve, "gamma", 1, {"role": "user"})
+
+        self.assertEqual(sorted(batches, key=str), [
+            (["alpha", "beta"], 2, None),
+            (["gamma"], 1, {"role": "user"}),
+        ])
+        self.assertEqual([entry.id for entry in alpha.result()], ["alpha_0", "alpha_1"])
+        self.assertEqual([entry.id for entry in beta.result()], ["beta_0"])
+        self.assertEqual(len(gamma.result()), 1)
+
+        manager = MemoryManager(config={"vector_store": {"coalesce_window_ms": 1}, "langgraph": {"enabled": False}})
+        self.addCleanup(manager._coalescer.close)
+        self.assertIsNotNone(manager._coalescer)
+        self.assertIsNone(MemoryManager(config={"langgraph": {"enabled": False}})._coalescer)
+
+    def test_relevant_context_without_history_skips_history_read(self):
+        """Test that include_history=False returns only past matches without reading history."""
+        from src.memory import MemoryManager
+
+        class SearchOnlyProvider(_StubProvider):
+            def retrieve_memories(self, query, limit=5, metadata_filter=None):
+                return [MemoryEntry(id="past", content="earlier answer")][:limit]
+
+            def get_conversation_history(self, thread_id, limit=10):
+                raise AssertionError("history should not be read")
+
+        MemoryEntry = self.MemoryEntry
+        manager = MemoryManager(config={"langgraph": {"enabled": False}})
+        manager.providers["vector"] = SearchOnlyProvider()
+
+        context = manager.get_relevant_context("thread_1", "question", include_history=False)
+
+        self.assertEqual(context, "Relevant past context:\nPast: earlier answer")
+
+    def test_batch_query_groups_semantic_searches(self):
+        """Test that batch_query sends semantic searches to the provider together."""
+        from src.memory import MemoryManager, MemoryQuery
+
+        class RecordingProvider(_StubProvider):
+            def __init__(self):
+                self.batches = []
+
+            def retrieve_memories(self, query, limit=5, metadata_filter=None):
+                raise AssertionError("semantic queries should be batched")
+
+            def retrieve_memories_batch(self, queries, limit=5, metadata_filter=None):
+                self.batches.append((list(queries), limit))
+                return [[MemoryEntry(id=f"{query}_{i}", content=query) for i in range(limit)]
+                        for query in queries]
+
+            def get_conversation_history(self, thread_id, limit=10):
+                return [MemoryEntry(id=thread_id, content="history")]
+
+        MemoryEntry = self.MemoryEntry
+        manager = MemoryManager(config={"langgraph": {"enabled": False}})
+        provider = RecordingProvider()
+        manager.providers["vector"] = provider
+
+        history, first, second = manager.batch_query([
+            MemoryQuery(thread_id="thread_1", limit=5),
+            MemoryQuery(query="alpha", limit=3),
+            MemoryQuery(query="beta", limit=1),
+        ])
+
+        self.assertEqual(provider.batches, [(["alpha", "beta"], 3)])
+        self.assertEqual([entry.id for entry in history], ["thread_1"])
+        self.assertEqual(len(first), 3)
+        self.assertEqual([entry.id for entry in second], ["beta_0"])
+
+    def test_store_memories_batch_uses_one_chroma_add(self):
+        """Test that batched stores reach ChromaDB as a single add call."""
+        from src.memory import MemoryManager
+
+        provider = _make_chroma_provider(_FakeCollection())
+        manager = MemoryManager(config={"langgraph": {"enabled": False}})
+        manager.providers["vector"] = provider
+
+        entries = [self.MemoryEntry(id=f"entry_{i}", content=f"content {i}") for i in range(3)]
+        self.assertTrue(manager.store_memories_batch(entries))
+        manager.store_conversation_memory("thread_1", "question", "answer")
+
+        self.assertEqual(len(provider.collection.adds), 2)
+        self.assertEqual(provider.collection.adds[0], ["entry_0", "entry_1", "entry_2"])
+        self.assertEqual(len(provider.collection.adds[1]), 2)
+
+    def test_conversation_turn_ids_are_ordered_and_unique(self):
+        """Test that a turn's entries get increasing fixed-width ids and one shared timestamp."""
+        from src.memory import MemoryManager
+
+        manager = MemoryManager(config={"langgraph": {"enabled": False}})
+        stored = []
+        manager.store_memories_batch = lambda entries, provider="vector": stored.extend(entries) or True
+
+        manager.store_conversation_memory("thread_1", "question", "answer")
+        manager.store_conversation_memory("thread_1", "question", "answer")
+
+        ids = [entry.id for entry in stored]
+        self.assertEqual(len(set(ids)), 4)
+        self.assertEqual([entry_id.rsplit(":", 1)[0] for entry_id in ids], ["thread_1:user", "thread_1:agent"] * 2)
+        self.assertEqual([int(entry_id.rsplit(":", 1)[1], 16) for entry_id in ids],
+                         sorted(int(entry_id.rsplit(":", 1)[1], 16) for entry_id in ids))
+        self.assertTrue(all(len(entry_id.rsplit(":", 1)[1]) == 16 for entry_id in ids))
+        self.assertEqual(stored[0].timestamp, stored[1].timestamp)
+
+    def test_recent_history_served_without_chroma_scan(self):
+        """Test that history reads covered by recently stored entries skip ChromaDB."""
+        provider = _make_chroma_provider(_FakeCollection())
+
+        turns = [self.MemoryEntry(id=f"turn_{i}", content=f"message {i}", metadata={"thread_id": "thread_1"})
+                 for i in range(3)]
+        provider.store_memories(turns + [self.MemoryEntry(id="turn_0", content="duplicate",
+                                                          metadata={"thread_id": "thread_1"})])
+
+        self.assertEqual([entry.id for entry in provider.get_conversation_history("thread_1", limit=2)],
+                         ["turn_1", "turn_2"])
+        self.assertEqual(provider.collection.gets, [])
+
+        provider.get_conversation_history("thread_1", limit=10)
+        self.assertEqual(len(provider.collection.gets), 1)
+
+    def test_stored_history_keeps_turn_order(self):
+        """Test that a turn's user and agent entries, sharing a timestamp, read back in stored order."""
+        from src.memory import MemoryManager
+
+        manager = MemoryManager(config={"langgraph": {"enabled": False}})
+        user_id, agent_id = manager.new_memory_id("t1", "user"), manager.new_memory_id("t1", "agent")
+        stored = {"timestamp": "2024-01-01T12:00:00", "thread_id": "t1"}
+
+        # ChromaDB returns rows unordered
+        provider = _make_chroma_provider(_FakeCollection(rows={
+            "ids": [agent_id, user_id], "documents": ["answer", "question"],
+            "metadatas": [{**stored, "role_i": 1}, {**stored, "role_i": 0}],
+        }))
+
+        history = provider.get_conversation_history("t1", limit=10)
+        self.assertEqual([entry.metadata["role"] for entry in history], ["user", "agent"])
+
+    def test_bulk_store_is_split_into_capped_adds(self):
+        """Test that large stores reach ChromaDB in adds of at most ADD_BATCH_SIZE entries."""
+        from unittest import mock
+        from src import memory
+
+        provider = _make_chroma_provider(_FakeCollection())
+
+        entries = [self.MemoryEntry(id=f"entry_{i}", content=f"content {i}") for i in range(5)]
+        with mock.patch.object(memory, "ADD_BATCH_SIZE", 2):
+            self.assertTrue(provider.store_memories(entries))
+
+        self.assertEqual([len(ids) for ids in provider.collection.adds], [2, 2, 1])
+        self.assertEqual(sum(provider.collection.adds, []), [entry.id for entry in entries])
+
+    def test_retrieve_memories_queries_collection_directly(self):
+        """Test that searches send a cached query embedding straight to the collection."""
+        from src.memory import _ChromaEmbeddings
+
+        embedded = []
+        provider = _make_chroma_provider(_FakeCollection(matches=[("stored", {"id": "entry_1", "role_i": 0})]))
+        provider.embeddings = _ChromaEmbeddings(lambda texts: embedded.extend(texts) or [[1.0, 0.0] for _ in texts])
+
+        first = provider.retrieve_memories("question", limit=3, metadata_filter={"role": "user"})
+        provider.retrieve_memories("question", limit=3)
+
+        self.assertEqual([(entry.id, entry.content, entry.metadata) for entry in first],
+                         [("entry_1", "stored", {"role": "user"})])
+        self.assertEqual(
+            [(embeddings.tolist(), n_results, where) for embeddings, n_results, where in provider.collection.queries],
+            [([[1.0, 0.0]], 3, {"$or": [{"role_i": 0}, {"role": "user"}]}), ([[1.0, 0.0]], 3, None)]
+        )
+        self.assertEqual(embedded, ["question"])
+
+    def test_thread_shards_serve_thread_scoped_queries(self):
+        """Test that sharded stores write each thread's collection and thread queries read only it."""
+        class FakeClient:
+            def __init__(self):
+                self.collections = {}
+
+            def get_or_create_collection(self, name, **kwargs):
+                return self.collections.setdefault(name, _FakeCollection())
+
+        provider = _make_chroma_provider(_FakeCollection(), shard_by_thread=True)
+        provider.client = FakeClient()
+
+        self.assertTrue(provider.store_memories([
+            self.MemoryEntry(id="a", content="x", metadata={"thread_id": "t1"}),
+            self.MemoryEntry(id="b", content="y", metadata={"thread_id": "t2"}),
+        ]))
+        self.assertEqual(provider.collection.adds, [["a", "b"]])
+        self.assertEqual(provider._thread_collections["t1"].adds, [["a"]])
+
+        provider.retrieve_memories("x", metadata_filter={"thread_id": "t1", "role": "user"})
+        self.assertEqual([where for _, _, where in provider._thread_collections["t1"].queries],
+                         [{"$or": [{"role_i": 0}, {"role": "user"}]}])
+        self.assertEqual(provider.collection.queries, [])
+
+    def test_thread_history_reuses_where_clause(self):
+        """Test that history reads share one precompiled where clause per thread and memory type."""
+        provider = _make_chroma_provider(_FakeCollection())
+
+        provider.get_conversation_history("t1", limit=5)
+        provider.get_conversation_history("t1", limit=5)
+        provider.get_conversation_context("t1")
+
+        first, second, context = provider.collection.gets
+        self.assertEqual(first, {"$and": [{"thread_id": "t1"}, {"memory_type": "conversation"}]})
+        self.assertIs(first, second)
+        self.assertEqual(context, {"$and": [{"thread_id": "t1"}, {"memory_type": "context"}]})
+
+    def test_roles_stored_as_integer_codes(self):
+        """Test that known roles are stored as role_i codes and read back as role names."""
+        from src.memory import ChromaMemoryProvider
+
+        entry = self.MemoryEntry(id="m1", content="hi", metadata={"thread_id": "t1", "role": "agent"})
+        stored = ChromaMemoryProvider._entry_metadata(entry)
+        self.assertEqual((stored["role_i"], "role" in stored), (1, False))
+        self.assertEqual(ChromaMemoryProvider._search_result_entry("hi", stored).metadata,
+                         {"thread_id": "t1", "role": "agent"})
+
+        # Other roles, and rows written before the encoding, keep the string
+        custom = self.MemoryEntry(id="m2", content="hi", metadata={"role": "system"})
+        self.assertEqual(ChromaMemoryProvider._entry_metadata(custom)["role"], "system")
+        self.assertEqual(ChromaMemoryProvider._search_result_entry("hi", {"role": "user"}).metadata, {"role": "user"})
+
+        # Role filters match both the coded rows and rows written with the role string
+        self.assertEqual(ChromaMemoryProvider._where_clause({"thread_id": "t1", "role": "agent"}),
+                         {"$and": [{"thread_id": "t1"}, {"$or": [{"role_i": 1}, {"role": "agent"}]}]})
+
+    def test_search_result_entries_share_interned_keys(self):
+        """Test that entries rebuilt from stored metadata are slotted and share interned keys."""
+        from src.memory import ChromaMemoryProvider
+
+        # Build the key at runtime so it is not the compiler's interned constant
+        key = "".join(["thread", "_id"])
+        entry = ChromaMemoryProvider._search_result_entry(
+            "text", {key: "t1", "id": "entry_1", "memory_type": "conversation"}
+        )
+
+        self.assertEqual(entry.metadata, {"thread_id": "t1"})
+        self.assertIs(next(iter(entry.metadata)), sys.intern("thread_id"))
+        if sys.version_info >= (3, 10):
+            self.assertFalse(hasattr(entry, "__dict__"))
+
+    def test_metadata_serialization_round_trip(self):
+        """Test that metadata serializes to a sorted JSON string and loads back."""
+        from src.memory import _dumps, _loads
+
+        encoded = _dumps({"topic": "sales", "count": 2, "tags": ["a"]}, sort_keys=True)
+
+        self.assertIsInstance(encoded, str)
+        self.assertEqual(encoded.replace(" ", ""), '{"count":2,"tags":["a"],"topic":"sales"}')
+        self.assertEqual(_loads(encoded), {"topic": "sales", "count": 2, "tags": ["a"]})
+
+    def test_chroma_embeddings_adapter(self):
+        """Test that the LangChain adapter delegates to the Chroma embedding function."""
+        from src.memory import _ChromaEmbeddings
+
+        calls = []
+
+        def embedding_function(texts):
+            calls.append(texts)
+            return [[float(len(text)), 1] for text in texts]
+
+        embeddings = _ChromaEmbeddings(embedding_function)
+        self.assertEqual(embeddings.embed_documents(["ab", "abc"]), [[2.0, 1.0], [3.0, 1.0]])
+        self.assertEqual(embeddings.embed_query("abcd"), [4.0, 1.0])
+        self.assertEqual(calls, [["ab", "abc"], ["abcd"]])
+
+    def test_query_embeddings_are_cached(self):
+        """Test that repeated queries are embedded once and only new queries hit the model."""
+        import numpy as np
+        from src.memory import _ChromaEmbeddings
+
+        calls = []
+
+        def embedding_function(texts):
+            calls.append(texts)
+            return [[float(len(text)), 1] for text in texts]
+
+        embeddings = _ChromaEmbeddings(embedding_function, query_cache_size=2)
+        self.assertEqual(embeddings.embed_query("ab"), [2.0, 1.0])
+        self.assertEqual(embeddings.embed_queries(["ab", "abc", "abc"]), [[2.0, 1.0], [3.0, 1.0], [3.0, 1.0]])
+        embeddings.embed_query("abcd")  # evicts "ab", the least recently used
+        embeddings.embed_queries(["abc", "ab"])
+
+        self.assertEqual(calls, [["ab"], ["abc"], ["abcd"], ["ab"]])
+
+        matrix = embeddings.embed_queries_array(["ab", "abc"])
+        self.assertEqual(matrix.dtype, np.float32)
+        self.assertEqual(matrix.tolist(), [[2.0, 1.0], [3.0, 1.0]])
+        self.assertEqual(len(calls), 4)
+
+    def test_hnsw_collection_metadata_env_overrides(self):
+        """Test HNSW collection settings and their environment overrides."""
+        from unittest import mock
+        from src.memory import hnsw_collection_metadata
+
+        with mock.patch.dict(os.environ, {"AGENTSPAWN_HNSW_SEARCH_EF": "128"}):
+            metadata = hnsw_collection_metadata()
+
+        self.assertEqual(metadata["hnsw:space"], "cosine")
+        self.assertEqual(metadata["hnsw:search_ef"], 128)
+        self.assertEqual(metadata["hnsw:construction_ef"], 200)
+        self.assertEqual(metadata["hnsw:M"], 32)
+
+    def test_end_of_workflow_checkpoints_flush_once(self):
+        """Test that buffered checkpoints are written on flush and visible to reads."""
+        from typing import TypedDict
+        from langgraph.graph import StateGraph, END
+        from src.memory import MemoryManager
+
+        class CounterState(TypedDict):
+            count: int
+
+        manager = MemoryManager(config={"langgraph": {"enabled": True, "checkpoint_mode": "end_of_workflow"}})
+        checkpointer = manager.get_langgraph_checkpointer()
+
+        graph = StateGraph(CounterState)
+        graph.add_node("first", lambda state: {"count": state["count"] + 1})
+        graph.add_node("second", lambda state: {"count": state["count"] + 1})
+        graph.set_entry_point("first")
+        graph.add_edge("first", "second")
+        graph.add_edge("second", END)
+        app = graph.compile(checkpointer=checkpointer)
+
+        config = {"configurable": {"thread_id": "buffered"}}
+        app.invoke({"count": 0}, config=config)
+        self.assertFalse(any(checkpointer.storage.get("buffered", {}).values()))
+
+        self.assertGreater(manager.flush_checkpoints("buffered"), 0)
+        self.assertEqual(manager.flush_checkpoints("buffered"), 0)
+        self.assertEqual(app.get_state(config).values["count"], 2)
+
+    def test_faiss_provider_exact_search(self):
+        """Test FAISS provider storage, filtered search and history."""
+        import threading
+        from src.memory import FAISS_AVAILABLE, FAISSMemoryProvider, _ChromaEmbeddings
+        if not FAISS_AVAILABLE:
+            self.skipTest("FAISS not installed")
+
+        vocabulary = ["sales", "code", "memory"]
+
+        def embedding_function(texts):
+            return [[float(word in text) for word in vocabulary] for text in texts]
+
+        provider = FAISSMemoryProvider.__new__(FAISSMemoryProvider)
+        provider.embeddings = _ChromaEmbeddings(embedding_function)
+        provider.index, provider.entries, provider.contexts = None, [], {}
+        provider._ids, provider._lock = set(), threading.Lock()
+
+        entries = [
+            self.MemoryEntry(id="a", content="sales report", metadata={"thread_id": "t1"}),
+            self.MemoryEntry(id="b", content="code review", metadata={"thread_id": "t2"}),
+            self.MemoryEntry(id="c", content="sales code", metadata={"thread_id": "t2"}),
+        ]
+        self.assertTrue(provider.store_memories(entries))
+        self.assertTrue(provider.store_memory(entries[0]))  # duplicate id is ignored
+        self.assertEqual(len(provider.entries), 3)
+
+        self.assertEqual([e.id for e in provider.retrieve_memories("sales", limit=1)], ["a"])
+        filtered = provider.retrieve_memories("sales", limit=5, metadata_filter={"thread_id": "t2"})
+        self.assertEqual([e.id for e in filtered], ["c", "b"])
+        excluded = provider.retrieve_memories("sales", limit=1, metadata_filter={"id": {"$nin": ["a"]}})
+        self.assertEqual([e.id for e in excluded], ["c"])
+        self.assertEqual([e.id for e in provider.get_conversation_history("t2")], ["b", "c"])
+
+        # Only the newest turns are returned when the thread has more than limit
+        start = datetime(2024, 1, 1)
+        provider.store_memories([
+            self.MemoryEntry(id=f"turn_{i}", content="memory", metadata={"thread_id": "t3"},
+                             timestamp=start.replace(minute=i))
+            for i in range(4)
+        ])
+        self.assertEqual([e.id for e in provider.get_conversation_history("t3", limit=2)], ["turn_2", "turn_3"])
+        self.assertEqual(provider.get_conversation_history("t3", limit=0), [])
+
+    def test_warmup_runs_once_in_background(self):
+        """Test that provider warmup is started on a single background thread."""
+        from src.memory import MemoryManager, LangGraphMemoryProvider
+
+        calls = []
+
+        class WarmingProvider(LangGraphMemoryProvider):
+            def warmup(self):
+                calls.append(1)
+
+        manager = MemoryManager(config={"langgraph": {"enabled": False}})
+        manager.providers["vector"] = WarmingProvider()
+
+        thread = manager.warmup()
+        self.assertIs(manager.warmup(), thread)
+        thread.join(timeout=5)
+        self.assertEqual(calls, [1])
+
+    def test_search_memories_uses_prefilled_window(self):
+        """Test that thread searches are answered from the prefilled window before the vector store."""
+        from src.memory import MemoryManager
+
+        history = [
+            self.MemoryEntry(id="a", content="Sales data analysis", metadata={"thread_id": "t1"}),
+            self.MemoryEntry(id="b", content="Code review notes", metadata={"thread_id": "t1"}),
+        ]
+        searches = []
+
+        class RecordingProvider(_StubProvider):
+            def retrieve_memories(self, query, limit=5, metadata_filter=None):
+                searches.append((query, metadata_filter))
+                return []
+
+            def get_conversation_history(self, thread_id, limit=10):
+                return history[:limit]
+
+        manager = MemoryManager(config={"langgraph": {"enabled": False}})
+        manager.providers["vector"] = RecordingProvider()
+        context = self.ConversationContext(thread_id="t1")
+
+        self.assertEqual(manager.prefill_window(context, top_k=32), 2)
+        self.assertEqual([e.id for e in manager.search_memories("data ANALYSIS", thread_id="t1")], ["a"])
+        self.assertEqual(searches, [])
+
+        # Entries stored after the prefill join the window
+        manager.store_memory(self.MemoryEntry(id="c", content="More data analysis", metadata={"thread_id": "t1"}))
+        self.assertEqual(len(context._hot_cache), 3)
+
+        # A window miss falls through to the vector store, scoped to the thread
+        self.assertEqual(manager.search_memories("deployment", thread_id="t1"), [])
+        self.assertEqual(searches, [("deployment", {"thread_id": "t1"})])
+
     def test_orchestrator_memory_integration(self):
         """Test orchestrator integration with memory."""
         from src.orchestrator import Orchestrator